@@ -10,6 +10,7 @@ from PIL import Image, ImageTk
 from config import ConfigManager
 from utils.helpers import get_resource_path
 from utils.logger import get_logger
+from utils.tracing import tracer
 
 logger = get_logger()
 # ASSETS_DIR = os.path.join(os.path.dirname(__file__), "resources/assets")
@@ -54,7 +55,13 @@ class DESHApplication:
     
     def run(self):
         logger.info("Application started")
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.settings_controller.close()
+            self.chat_controller.close()  # flush pending chat messages before exit
+            self.config_manager.flush()
+            self.llm_handler.close()
 
 
 def parse_args():
@@ -73,10 +80,26 @@ def parse_args():
     api_group.add_argument("--top-p", type=float, help="Top-p setting")
     api_group.add_argument("--max-tokens", type=int, help="Max tokens")
     api_group.add_argument("--stream", type=bool, help="Stream response")
+    server_group = parser.add_argument_group('server')
+    server_group.add_argument("--serve", action="store_true", help="Run the HTTP service instead of the desktop app")
+    server_group.add_argument("--host", help="Address the HTTP service listens on")
+    server_group.add_argument("--port", type=int, help="Port the HTTP service listens on")
+    server_group.add_argument("--workers", type=int, help="Worker threads for document parsing")
+    queue_group = parser.add_argument_group('batch_queue')
+    queue_group.add_argument("--enqueue-batch", metavar="DIRECTORY", help="Split a CV directory into shards on the batch queue and exit")
+    queue_group.add_argument("--batch-worker", action="store_true", help="Process shards from the batch queue until interrupted")
+    queue_group.add_argument("--exit-when-idle", action="store_true", help="Stop the batch worker once the queue is empty")
+    queue_group.add_argument("--batch-status", metavar="JOB_ID", help="Show a queued job's progress and save its results once finished")
+    queue_group.add_argument("--queue-path", help="Batch queue database, on shared storage for workers on several machines")
+    queue_group.add_argument("--shared-root", help="Shared storage holding the CVs, as mounted on this machine; queued CV paths are stored relative to it")
+    queue_group.add_argument("--shard-size", type=int, help="CVs per shard")
+    queue_group.add_argument("--lease-seconds", type=int, help="Seconds a worker holds a shard without renewing its lease")
     args = parser.parse_args()
     args_dict = {
         'app_settings': {},
-        'api_config': {}
+        'api_config': {},
+        'server': {},
+        'batch_queue': {}
     }
 
     for key in ['theme', 'font_size','font_style','width','height']:
@@ -87,15 +110,55 @@ def parse_args():
         attr_name = key.replace('-', '_')
         if hasattr(args, attr_name) and getattr(args, attr_name) is not None:
             args_dict['api_config'][key] = getattr(args, attr_name)
+    for key in ['host', 'port', 'workers']:
+        if getattr(args, key) is not None:
+            args_dict['server'][key] = getattr(args, key)
+    for key, attr_name in [('path', 'queue_path'), ('shared_root', 'shared_root'), ('shard_size', 'shard_size'), ('lease_seconds', 'lease_seconds')]:
+        if getattr(args, attr_name) is not None:
+            args_dict['batch_queue'][key] = getattr(args, attr_name)
 
-    return args_dict
+    return args_dict, args
+
+
+def run_batch_queue(config_manager, args):
+    from src.controllers.batch_queue_controller import BatchQueueController
+    llm_handler = LLMHandler(config_manager)
+    controller = BatchQueueController(config_manager, llm_handler)
+    try:
+        if args.enqueue_batch:
+            controller.enqueue(args.enqueue_batch)
+        if args.batch_worker:
+            controller.work(exit_when_idle=args.exit_when_idle)
+        if args.batch_status:
+            controller.report(args.batch_status)
+    finally:
+        controller.close()
+        config_manager.flush()
+        llm_handler.close()
 
 
 def main():
-    args_dict = parse_args()
-    logger.debug(f"CLI args: {args_dict}")
+    args_dict, args = parse_args()
+    logger.debug("CLI args: %s", args_dict)
     config_manager = ConfigManager()
     config_manager.apply_cli_args(args_dict)
+    logger.configure(**config_manager.get('logging'))
+    config_manager.subscribe(lambda changes: logger.configure(**changes['logging']), section='logging')
+    tracer.configure(**config_manager.get('tracing'))
+    config_manager.subscribe(lambda changes: tracer.configure(**changes['tracing']), section='tracing')
+    if args.enqueue_batch or args.batch_worker or args.batch_status:
+        run_batch_queue(config_manager, args)
+        return
+    if args.serve:
+        from src.controllers.server_controller import ServerController
+        logger.info("Initializing Data Engineering Staffing Helper (DESH) server")
+        llm_handler = LLMHandler(config_manager)
+        try:
+            ServerController(config_manager, llm_handler).run()
+        finally:
+            config_manager.flush()
+            llm_handler.close()
+        return
     logger.info("Initializing Data Engineering Staffing Helper (DESH) application")
     app = DESHApplication(config=config_manager)
     app.run()
@@ -0,0 +1,50 @@
+"""Compare the OOXML streaming extractor against the python-pptx object model.
+
+Run from the repository root:
+    python -m benchmarks.bench_pptx_extraction [--repeat 20] [--directory resources/test_data/one_pagers]
+"""
+import argparse
+import logging
+import os
+import statistics
+import time
+import zipfile
+from utils.logger import get_logger
+from utils.pptx_reader import read_frames_ooxml, read_frames_python_pptx
+
+def _time_reader(reader, files, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for file_path in files:
+            reader(file_path)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def _count_frames(reader, files):
+    return sum(len(frames) for file_path in files for frames in reader(file_path))
+
+def main():
+    parser = argparse.ArgumentParser(description="PPTX text extraction benchmark")
+    parser.add_argument("--directory", default="resources/test_data/one_pagers")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    get_logger().set_log_level(logging.WARNING)  # per-slide debug output would dominate the timings
+
+    files = [os.path.join(args.directory, f) for f in sorted(os.listdir(args.directory))
+             if f.endswith(".pptx") and zipfile.is_zipfile(os.path.join(args.directory, f))]
+    if not files:
+        raise SystemExit(f"No .pptx files found in {args.directory}")
+
+    print(f"{len(files)} decks, {args.repeat} rounds")
+    print(f"{'reader':<14}{'frames':>8}{'median ms':>12}{'min ms':>10}{'ms/deck':>10}")
+    medians = {}
+    for name, reader in (("python-pptx", read_frames_python_pptx), ("ooxml", read_frames_ooxml)):
+        timings = _time_reader(reader, files, args.repeat)
+        medians[name] = statistics.median(timings)
+        print(f"{name:<14}{_count_frames(reader, files):>8}{medians[name] * 1000:>12.2f}"
+              f"{min(timings) * 1000:>10.2f}{medians[name] * 1000 / len(files):>10.2f}")
+    print(f"speedup: {medians['python-pptx'] / medians['ooxml']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Generated inputs for the micro-benchmarks.
+
+The decks and the PDF are seeded, so every machine benchmarks the same bytes. They are cached
+in the fixtures directory and rebuilt when FIXTURE_VERSION changes. Chat logs are dated relative
+to today, so they are regenerated for every run.
+"""
+import json
+import os
+import random
+import zlib
+from datetime import datetime, timedelta
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from src.models.chat_log_rotation import ChatLogRotator
+
+FIXTURE_VERSION = 1
+SEED = 20240601
+
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "Kafka", "Docker", "Kubernetes", "Azure", "AWS", "dbt",
+          "Snowflake", "Databricks", "Terraform", "pandas", "Power BI", "Scala", "Git", "CI/CD"]
+WORDS = ("data pipeline warehouse model stream batch quality governance migration platform customer "
+         "reporting dashboard latency throughput ingestion transformation lineage catalogue orchestration "
+         "designed built maintained migrated optimised delivered automated monitored reduced improved").split()
+# Misspellings the spell pre-pass should flag, so the stubbed corrector still sees work
+TYPOS = ["experiance", "managment", "developement", "enviroment", "succesfully", "responsable", "relevent"]
+SENDERS = ["You", "Agent", "System", "Review"]
+
+def _sentence(rng, words=14, typo_rate=0.05):
+    chosen = [rng.choice(TYPOS) if rng.random() < typo_rate else rng.choice(WORDS) for _ in range(words)]
+    chosen.insert(rng.randrange(len(chosen)), rng.choice(SKILLS))
+    return " ".join(chosen).capitalize() + "."
+
+def make_pptx(path, slides=60, frames_per_slide=6, seed=SEED):
+    """A long one-pager-style deck: a repeated header and footer on every slide plus varied body text"""
+    rng = random.Random(seed)
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # blank
+    for index in range(slides):
+        slide = presentation.slides.add_slide(layout)
+        texts = ["DESH Consulting | Data Engineering", f"Candidate {index % 12:02d} - Senior Data Engineer"]
+        texts += [" ".join(_sentence(rng) for _ in range(rng.randint(1, 4))) for _ in range(frames_per_slide - 3)]
+        texts.append("Confidential - for internal use only")
+        for position, text in enumerate(texts):
+            box = slide.shapes.add_textbox(Inches(0.5), Inches(0.3 + position * 1.1), Inches(9), Inches(1))
+            box.text_frame.text = text
+            box.text_frame.paragraphs[0].font.size = Pt(11)
+    presentation.save(path)
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _table_page(rng, rows, columns):
+    """Content stream of one page holding a ruled table, which pdfplumber finds by its lines"""
+    left, top, width, row_height = 40, 750, 530, 24
+    column_width = width / columns
+    commands = ["0.5 w"]
+    for row in range(rows + 1):
+        y = top - row * row_height
+        commands.append(f"{left} {y} m {left + width} {y} l S")
+    for column in range(columns + 1):
+        x = left + column * column_width
+        commands.append(f"{x:.1f} {top} m {x:.1f} {top - rows * row_height} l S")
+    header = ["Skill", "Level", "Years", "Must have", "Notes"][:columns] + [f"Column {c}" for c in range(5, columns)]
+    for row in range(rows):
+        cells = header if row == 0 else [rng.choice(SKILLS), rng.choice(["Junior", "Medior", "Senior"]), str(rng.randint(1, 12)),
+                                         rng.choice(["yes", "no"]), " ".join(rng.choice(WORDS) for _ in range(3))][:columns]
+        cells += [rng.choice(WORDS) for _ in range(columns - len(cells))]
+        y = top - row * row_height - 16
+        for column, text in enumerate(cells):
+            commands.append(f"BT /F1 8 Tf {left + column * column_width + 4:.1f} {y} Td ({_pdf_escape(text)}) Tj ET")
+    return "\n".join(commands).encode("latin-1")
+
+def make_pdf(path, pages=10, rows=28, columns=5, seed=SEED):
+    """A listing-style PDF with one ruled table per page, written by hand so no PDF library is needed"""
+    rng = random.Random(seed)
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for page in range(pages):
+        page_id, content_id = 4 + 2 * page, 5 + 2 * page
+        stream = zlib.compress(_table_page(rng, rows, columns))
+        objects[content_id] = b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(b"%d 0 R" % page_id)
+    objects[2] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(output)
+        output += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offsets[number] for number in sorted(objects))
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(output)
+
+def make_chat_logs(directory, months=6, messages_per_day=40, seed=SEED):
+    """Daily logs for the last months, rotated the way the app rotates them: older months compacted
+    into archive segments, older days of this month compressed, the last week left as plain text"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    day = today - timedelta(days=months * 30)
+    messages = 0
+    while day <= today:
+        with open(os.path.join(directory, f"chat_log_{day.strftime('%Y%m%d')}.txt"), "w", encoding="utf-8") as f:
+            for index in range(messages_per_day):
+                sender = SENDERS[index % 2] if rng.random() < 0.9 else rng.choice(SENDERS)
+                lines = [_sentence(rng, rng.randint(6, 30), typo_rate=0) for _ in range(rng.randint(1, 6))]
+                f.write(f"<BEGIN:{sender}:[{index * 24 // messages_per_day:02d}:{index % 60:02d}:00]>\n")
+                f.write("\n".join(lines) + "\n")
+                f.write(f"<END:{sender}>\n")
+                messages += 1
+        day += timedelta(days=1)
+    ChatLogRotator(directory).run(today)
+    return messages
+
+def ensure_fixtures(directory, regenerate=False):
+    """Paths of the cached fixtures, building any that are missing or from an older FIXTURE_VERSION"""
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, "manifest.json")
+    fixtures = {"pptx": os.path.join(directory, "large_deck.pptx"), "pdf": os.path.join(directory, "tables.pdf")}
+    try:
+        with open(manifest_path) as f:
+            current = json.load(f).get("version") == FIXTURE_VERSION
+    except (OSError, ValueError):
+        current = False
+    if regenerate or not current or not all(os.path.exists(path) for path in fixtures.values()):
+        print(f"Generating fixtures in {directory}")
+        make_pptx(fixtures["pptx"])
+        make_pdf(fixtures["pdf"])
+        with open(manifest_path, "w") as f:
+            json.dump({"version": FIXTURE_VERSION, "seed": SEED}, f)
+    return fixtures
@@ -0,0 +1,91 @@
+"""Load-test a running DESH server (python app.py --serve).
+
+Run from the repository root:
+    python -m benchmarks.load_test_server [--url http://127.0.0.1:8080] [--endpoint chat|review] [--clients 20] [--requests 200]
+        [--cv resources/test_data/one_pagers/Candidate_One.pptx]
+
+Each client sends its requests one after another; the report shows throughput and latency
+percentiles (time to first streamed line for chat, full response otherwise) plus how many
+reviews were answered from the server's cache.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import aiohttp
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+async def _chat(session, url, index):
+    start = time.perf_counter()
+    first = None
+    async with session.post(f"{url}/api/chat", json={"message": f"Load test message {index}: name three data engineering skills."}) as response:
+        response.raise_for_status()
+        async for _ in response.content:
+            first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start, False
+
+async def _review(session, url, index, file_id):
+    start = time.perf_counter()
+    async with session.post(f"{url}/api/review", json={"file_id": file_id, "listing_type": "generic"}) as response:
+        response.raise_for_status()
+        body = await response.json()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, body["cached"]
+
+async def _upload(session, url, path):
+    form = aiohttp.FormData()
+    form.add_field("file", open(path, "rb"), filename=os.path.basename(path))
+    async with session.post(f"{url}/api/upload", data=form) as response:
+        response.raise_for_status()
+        return (await response.json())["files"][0]["file_id"]
+
+async def _run(args):
+    timeout = aiohttp.ClientTimeout(total=None)
+    connector = aiohttp.TCPConnector(limit=args.clients)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        if args.endpoint == "review":
+            file_id = await _upload(session, args.url, args.cv)
+            call = lambda index: _review(session, args.url, index, file_id)
+        else:
+            call = lambda index: _chat(session, args.url, index)
+
+        counter = iter(range(args.requests))
+        samples, errors = [], 0
+        async def client():
+            nonlocal errors
+            for index in counter:
+                try:
+                    samples.append(await call(index))
+                except Exception as e:
+                    errors += 1
+                    print(f"request {index} failed: {e}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(args.clients)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.endpoint}: {len(samples)} ok, {errors} failed, {args.clients} clients, {elapsed:.1f} s, {len(samples) / elapsed:.1f} req/s")
+    if samples:
+        for label, values in (("first byte", [s[0] for s in samples if s[0] is not None]), ("total", [s[1] for s in samples])):
+            if values:
+                print(f"{label:<11} p50 {_percentile(values, 50) * 1000:8.0f} ms  p95 {_percentile(values, 95) * 1000:8.0f} ms"
+                      f"  p99 {_percentile(values, 99) * 1000:8.0f} ms  mean {statistics.mean(values) * 1000:8.0f} ms")
+        if args.endpoint == "review":
+            print(f"cached reviews: {sum(s[2] for s in samples)} of {len(samples)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="DESH server load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--endpoint", choices=("chat", "review"), default="chat")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cv", default="resources/test_data/one_pagers/Candidate_One.pptx")
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    main()
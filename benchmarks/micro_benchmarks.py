@@ -0,0 +1,280 @@
+"""Micro-benchmarks of the hot paths that make no LLM calls, compared against stored baselines.
+
+Run from the repository root:
+    python -m benchmarks.micro_benchmarks [--only NAME ...] [--repeat 7] [--threshold 0.25]
+        [--save-baseline] [--regenerate] [--fixtures-dir benchmarks/.fixtures]
+
+Each benchmark times `number` calls per round for `repeat` rounds and reports the median and
+fastest per-call time. Regressions are judged on the fastest round, which shared machines
+disturb least: one more than threshold (default 25%) above the baseline in
+benchmarks/baselines.json is reported as a regression, and the run exits with status 1. The
+baselines only mean something on the machine that recorded them, so re-record them with
+--save-baseline whenever the machine changes.
+
+The chat_view benchmarks need a display. Without DISPLAY set, they start Xvfb when it is
+installed and are skipped otherwise. A skipped benchmark, or one without a stored baseline,
+fails the run like a regression: record baselines on a machine with a display (or Xvfb) so
+every check can run.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from benchmarks.fixtures import ensure_fixtures, make_chat_logs
+from utils.logger import get_logger
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+BENCHMARKS = {}
+
+def benchmark(name, number=1):
+    """Register a context-manager benchmark: setup, yield the callable to time, then tear down"""
+    def register(function):
+        BENCHMARKS[name] = (contextmanager(function), number)
+        return function
+    return register
+
+def _config_manager(directory):
+    from config import ConfigManager
+    config = ConfigManager(os.path.join(directory, "config.json"))
+    # Nothing may leave the machine: any LLM call would fail fast instead of timing a network
+    config.update_from_ui('api_config', 'base_url', "http://127.0.0.1:9/v1")
+    config.update_from_ui('api_config', 'api_key', "benchmark")
+    return config
+
+@benchmark("config_get", number=200000)
+def config_get(fixtures, workdir):
+    config = _config_manager(workdir)
+    yield lambda: config.get('processing', 'max_concurrent_llm_calls')
+
+@benchmark("config_get_section", number=200000)
+def config_get_section(fixtures, workdir):
+    config = _config_manager(workdir)
+    yield lambda: config.get('api_config')
+
+@benchmark("extract_text_from_pptx")
+def extract_text_from_pptx(fixtures, workdir):
+    from src.models.llm_handler import LLMHandler
+    handler = LLMHandler(_config_manager(workdir))
+    handler.spell_prepass.available  # build the dictionary index outside the timings
+    async def corrector(text):
+        return text
+    handler.frame_deduplicator.acorrector = corrector
+    def run():
+        handler.frame_deduplicator.clear()  # every round corrects from scratch
+        return handler.extract_text_from_pptx(fixtures["pptx"])
+    try:
+        yield run
+    finally:
+        handler.close()
+
+@benchmark("extract_tables")
+def extract_tables(fixtures, workdir):
+    from utils.helpers import extract_tables
+    yield lambda: extract_tables(fixtures["pdf"])
+
+@benchmark("chat_model_get_all_messages")
+def chat_model_get_all_messages(fixtures, workdir):
+    from src.models.chat_model import ChatModel
+    from src.models.file_handler import FileHandler
+    logs = os.path.join(workdir, "chats_data")
+    make_chat_logs(logs)
+    chat_model = ChatModel(_config_manager(workdir), FileHandler(storage_directory=logs))
+    try:
+        yield chat_model._get_all_messages
+    finally:
+        chat_model.close()
+
+class _StubLLMHandler:
+    async def achat(self, user_message):
+        return ""
+
+@benchmark("intent_routing_1000")
+def intent_routing(fixtures, workdir):
+    from benchmarks.fixtures import SKILLS, WORDS
+    from src.models.intent_processor import IntentProcessor
+    processor = IntentProcessor(_StubLLMHandler(), None)
+    async def handled(*args):
+        return ""
+    # Only the routing is timed; every handler returns at once
+    processor.intent_handlers = {keyword: handled for keyword in processor.intent_handlers}
+    keywords = list(processor.intent_handlers) + [None] * len(processor.intent_handlers)
+    messages = []
+    for index in range(1000):
+        words = [WORDS[(index * 7 + offset) % len(WORDS)] for offset in range(20 + index % 60)]
+        words.insert(index % len(words), SKILLS[index % len(SKILLS)])
+        keyword = keywords[index % len(keywords)]
+        if keyword:
+            words.insert(len(words) // 2, keyword.title())
+        messages.append(" ".join(words))
+    loop = asyncio.new_event_loop()
+    async def route_all():
+        for message in messages:
+            await processor.process_intent(message)
+    try:
+        yield lambda: loop.run_until_complete(route_all())
+    finally:
+        loop.close()
+
+@contextmanager
+def _virtual_display():
+    """Yield True when Tk can open a window, starting Xvfb for the duration if needed"""
+    if os.environ.get("DISPLAY"):
+        yield True
+        return
+    if not shutil.which("Xvfb"):
+        yield False
+        return
+    display = f":{os.getpid() % 400 + 100}"
+    server = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    try:
+        time.sleep(0.5)
+        yield server.poll() is None
+    finally:
+        del os.environ["DISPLAY"]
+        server.terminate()
+        server.wait()
+
+def _chat_view(workdir):
+    import ttkbootstrap as ttk
+    from src.views.chat_view import ChatView
+    config = _config_manager(workdir)
+    root = ttk.Window(themename=config.get('app_settings', 'theme'))
+    root.withdraw()
+    notebook = ttk.Notebook(root)
+    notebook.pack()
+    noop = lambda *args, **kwargs: None
+    view = ChatView(notebook, config, upload_callback=noop, send_callback=noop)
+    return root, view
+
+def _synthetic_messages(count):
+    from benchmarks.fixtures import WORDS
+    return [{"id": index, "sender": ("You", "Agent")[index % 2], "timestamp": f"[{index % 24:02d}:00:00]",
+             "content": [" ".join(WORDS[(index + line) % len(WORDS)] for _ in range(12)) for line in range(1 + index % 5)]}
+            for index in range(count)]
+
+@benchmark("chat_view_render_300")
+def chat_view_render(fixtures, workdir):
+    root, view = _chat_view(workdir)
+    messages = _synthetic_messages(300)
+    def run():
+        view.render_messages(messages)
+        root.update_idletasks()
+    try:
+        yield run
+    finally:
+        root.destroy()
+
+@benchmark("chat_view_add_message", number=200)
+def chat_view_add_message(fixtures, workdir):
+    root, view = _chat_view(workdir)
+    view.render_messages(_synthetic_messages(300))
+    text = " ".join(["streamed agent reply"] * 40)
+    def run():
+        view.add_message_to_history(text, sender="Agent")
+        root.update_idletasks()
+    try:
+        yield run
+    finally:
+        root.destroy()
+
+def _time(run, number, repeat):
+    run()  # warm-up: imports, caches, first-call setup
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        timings.append((time.perf_counter() - start) / number)
+    return {"median_s": statistics.median(timings), "min_s": min(timings), "number": number, "repeat": repeat}
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def _load_baselines():
+    try:
+        with open(BASELINES_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"results": {}}
+
+def run_benchmarks(names, fixtures, repeat):
+    results, skipped = {}, []
+    with tempfile.TemporaryDirectory(prefix="desh_bench_") as workdir, _virtual_display() as has_display:
+        for name in names:
+            if name.startswith("chat_view") and not has_display:
+                skipped.append(name)
+                continue
+            factory, number = BENCHMARKS[name]
+            benchmark_dir = os.path.join(workdir, name)
+            os.makedirs(benchmark_dir)
+            with factory(fixtures, benchmark_dir) as run:
+                results[name] = _time(run, number, repeat)
+    return results, skipped
+
+def main():
+    parser = argparse.ArgumentParser(description="DESH micro-benchmarks")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=None, help="allowed slowdown over the baseline (default: the baseline's, else 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run's results as the new baselines")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the cached fixtures")
+    parser.add_argument("--fixtures-dir", default=os.path.join("benchmarks", ".fixtures"))
+    args = parser.parse_args()
+    get_logger().set_log_level(logging.ERROR)  # per-call logging would dominate the timings
+
+    fixtures = ensure_fixtures(args.fixtures_dir, regenerate=args.regenerate)
+    results, skipped = run_benchmarks(args.only or list(BENCHMARKS), fixtures, args.repeat)
+
+    baselines = _load_baselines()
+    threshold = args.threshold if args.threshold is not None else baselines.get("threshold", 0.25)
+    regressions = []
+    print(f"{'benchmark':<30}{'median':>12}{'min':>12}{'base min':>12}{'change':>9}")
+    for name, result in results.items():
+        baseline = baselines["results"].get(name)
+        change, flag = "", ""
+        if baseline:
+            ratio = result["min_s"] / baseline["min_s"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > threshold:
+                flag = "  REGRESSION"
+                regressions.append(name)
+        print(f"{name:<30}{_format_seconds(result['median_s']):>12}{_format_seconds(result['min_s']):>12}"
+              f"{_format_seconds(baseline['min_s']) if baseline else '-':>12}{change:>9}{flag}")
+    for name in skipped:
+        print(f"{name:<30}  skipped: no display (set DISPLAY or install Xvfb)")
+    unchecked = skipped + [name for name in results if name not in baselines["results"]]
+
+    if args.save_baseline:
+        baselines.setdefault("results", {}).update(results)
+        baselines.update({"threshold": threshold, "machine": f"{platform.node()} ({platform.machine()}, {os.cpu_count()} CPUs)",
+                          "python": platform.python_version(), "saved": datetime.now().isoformat(timespec="seconds")})
+        with open(BASELINES_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines saved to {BASELINES_PATH}")
+        if skipped:
+            print(f"Not recorded, no display: {', '.join(skipped)}")
+        return
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) more than {threshold:.0%} slower than the baseline: {', '.join(regressions)}")
+    if unchecked:
+        print(f"{len(unchecked)} benchmark(s) not checked against a baseline (skipped or never recorded): {', '.join(unchecked)}")
+    if regressions or unchecked:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,28 @@
+import copy
 import datetime
 import json
 import os
+import threading
+from contextlib import contextmanager
+import time
+from types import MappingProxyType
 from utils.logger import get_logger
 logger = get_logger()
 
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 class ConfigManager:
-    def __init__(self, config_path="config.json"):
+    """Reads go to an immutable snapshot of the config; config.json is checked for external
+    edits at most once every reload_interval seconds instead of on every get."""
+    def __init__(self, config_path="config.json", reload_interval=1.0, save_delay=0.5):
         self.config_path = config_path
+        self.reload_interval = reload_interval
+        self.save_delay = save_delay
         self.config = {
             "app_settings": {
                 "theme": "pulse",
@@ -23,70 +39,242 @@ class ConfigManager:
                 "top_p": 1,
                 "max_tokens": 1024,
                 "stream": True
+            },
+            "processing": {
+                "fast_pptx_extraction": True,
+                "spell_prepass": True,
+                "llm_call_timeout_s": 120,
+                "request_timeout_s": 3600,
+                "progress_interval_ms": 500,
+                "max_concurrent_llm_calls": 4,
+                "max_cached_corrections": 10000,
+                "criteria_prescreen": True
+            },
+            "chat_settings": {
+                "flush_interval_ms": 500,
+                "flush_batch_size": 50,
+                "fsync_policy": "batch",
+                "compress_after_days": 7,
+                "compact_archives": True,
+                "initial_history_messages": 100,
+                "history_page_size": 50,
+                "max_rendered_messages": 300,
+                "context_token_budget": 3000,
+                "summary_token_budget": 400
+            },
+            "logging": {
+                "level": "INFO",
+                "json_file": False,
+                "max_message_length": 2000
+            },
+            "tracing": {
+                "enabled": False,
+                "directory": "traces"
+            },
+            "server": {
+                "host": "127.0.0.1",
+                "port": 8080,
+                "workers": 8,
+                "max_upload_mb": 50,
+                "data_directory": "server_data",
+                "cache_entries": 1024
+            },
+            "batch_queue": {
+                "path": "batch_queue.db",
+                "journal_mode": "WAL",
+                "shared_root": "",
+                "shard_size": 10,
+                "lease_seconds": 120,
+                "max_attempts": 3,
+                "poll_interval": 2
+            },
+            "speculation": {
+                "enabled": True,
+                "correct": True,
+                "max_files": 20,
+                "max_file_mb": 25,
+                "max_correction_frames": 40,
+                "llm_calls": 1,
+                "cache_entries": 64,
+                "timeout_s": 300
             }
         }
         self.last_file_modified_time = 0
+        self._last_reload_check = 0
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._snapshot = _freeze(self.config)
+        self._batch_depth = 0
+        self._save_timer = None
+        self._cli_overrides = {}  # (section, key) -> (value config.json keeps, value in force for this run)
         self.create_default_config() # Create default config if it doesn't exist
         self.load_from_file()
 
     def create_default_config(self):
         if not os.path.exists(self.config_path):
             self.save()
-            logger.debug(f"Created default config file at {self.config_path}")
+            logger.debug("Created default config file at %s", self.config_path)
     
     def save(self):
+        # Write a temporary file and rename it over config.json so a crash never leaves a partial config
+        temp_path = f"{self.config_path}.tmp"
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=4)
-            self.last_file_modified_time = os.path.getmtime(self.config_path)
-            logger.debug(f"Config updated at {self._normalize_unix_time(self.last_file_modified_time)}!")
+            with self._lock:
+                self._cancel_pending_save()
+                with open(temp_path, 'w') as f:
+                    json.dump(self._persisted_config(), f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.config_path)
+                self.last_file_modified_time = os.path.getmtime(self.config_path)
+            logger.debug("Config updated at %s!", self._normalize_unix_time(self.last_file_modified_time))
         except Exception as e:
-            logger.error(f"Error saving config file: {e}")
+            logger.error("Error saving config file: %s", e)
+    
+    def _schedule_save(self):
+        """Debounced save: a burst of UI edits is written once, save_delay seconds after the last one"""
+        with self._lock:
+            self._cancel_pending_save()
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def _cancel_pending_save(self):
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+    
+    def flush(self):
+        """Write a pending debounced save now"""
+        if self._save_timer is not None:
+            self.save()
 
     def _normalize_unix_time(self, unix_time):
         return datetime.datetime.fromtimestamp(unix_time).strftime('%Y-%m-%d %H:%M:%S')
 
     def load_from_file(self):
         try:
-            if os.path.exists(self.config_path):
-                current_mod_time = os.path.getmtime(self.config_path)         
-                # Only reload if file was modified since last load/save
-                if current_mod_time > self.last_file_modified_time:
-                    with open(self.config_path, 'r') as f:
-                        file_config = json.load(f)
-                    # Deep merge the config
-                    self._deep_update(self.config, file_config)
-                    self.last_file_modified_time = current_mod_time
-                    logger.info("Config reloaded from file due to external changes")
+            with self._lock:
+                # Unsaved UI edits win over the file; the pending save overwrites it shortly
+                if self._save_timer is None and os.path.exists(self.config_path):
+                    current_mod_time = os.path.getmtime(self.config_path)         
+                    # Only reload if file was modified since last load/save
+                    if current_mod_time > self.last_file_modified_time:
+                        with open(self.config_path, 'r') as f:
+                            file_config = json.load(f)
+                        # Deep merge the config; CLI overrides stay in force over the new file values
+                        self._deep_update(self.config, file_config)
+                        for (section, key), (_, value) in self._cli_overrides.items():
+                            self._cli_overrides[section, key] = (self.config[section][key], value)
+                            self.config[section][key] = value
+                        self.last_file_modified_time = current_mod_time
+                        logger.info("Config reloaded from file due to external changes")
+            self._publish()
         except Exception as e:
-            logger.error(f"Error loading config file: {e}")
+            logger.error("Error loading config file: %s", e)
+    
+    def _check_for_external_changes(self):
+        now = time.monotonic()
+        if now - self._last_reload_check >= self.reload_interval:
+            self._last_reload_check = now
+            self.load_from_file()
     
     def get(self, section, key=None):
-        self.load_from_file()  # Check for external file changes
-        if section in self.config:
+        self._check_for_external_changes()
+        snapshot = self._snapshot
+        if section in snapshot:
             if key is None:
-                return self.config[section]
-            elif key in self.config[section]:
-                return self.config[section][key]
+                return snapshot[section]
+            elif key in snapshot[section]:
+                return snapshot[section][key]
         return None
     
-    def update_from_ui(self, section, key, value):
-        if section in self.config and key in self.config[section]:
+    def snapshot(self):
+        """The whole config as a read-only mapping that never changes after it is returned"""
+        self._check_for_external_changes()
+        return self._snapshot
+    
+    def subscribe(self, callback, section=None):
+        """Call callback(changes) whenever values change, with changes mapping section -> {key: new value}
+        (only section's changes when given). Callbacks run on the thread that made or detected the
+        change, so views must hop to the Tk thread themselves. Returns a function that unsubscribes."""
+        subscriber = (callback, section)
+        self._subscribers.append(subscriber)
+        return lambda: self._subscribers.remove(subscriber)
+    
+    def _publish(self):
+        with self._lock:
+            previous, self._snapshot = self._snapshot, _freeze(self.config)
+        changes = {}
+        for section, values in self._snapshot.items():
+            old_values = previous.get(section, {})
+            changed = {key: value for key, value in values.items() if key not in old_values or old_values[key] != value}
+            if changed:
+                changes[section] = changed
+        if not changes:
+            return
+        logger.debug("Config changed: %s", ', '.join(f'{section}.{key}' for section, values in changes.items() for key in values))
+        for callback, section in list(self._subscribers):
+            selected = changes if section is None else {section: changes[section]} if section in changes else None
+            if selected:
+                try:
+                    callback(selected)
+                except Exception as e:
+                    logger.error("Config subscriber failed: %s", e)
+    
+    def update_from_ui(self, section, key, value, debounce=False):
+        with self._lock:
+            if section not in self.config or key not in self.config[section]:
+                return
             self.config[section][key] = value
-            self.save()
+            self._cli_overrides.pop((section, key), None)  # set in the UI, so it is saved after all
+            if self._batch_depth:
+                return  # saved and published once when the batch ends
+            if debounce:
+                self._schedule_save()
+            else:
+                self.save()
+        self._publish()
+    
+    @contextmanager
+    def batch_update(self):
+        """Apply several update_from_ui calls as one change: the file is written and subscribers
+        are notified once at the end, and nothing is applied if the block raises"""
+        with self._lock:
+            backup = (copy.deepcopy(self.config), dict(self._cli_overrides)) if self._batch_depth == 0 else None
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                if backup is not None:
+                    self.config, self._cli_overrides = backup
+                raise
+            finally:
+                self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.save()
+        if backup is not None:
+            self._publish()
     
     def apply_cli_args(self, args_dict):
-        # Process app_settings args
-        if hasattr(args_dict, 'app_settings') and args_dict.app_settings:
-            for key, value in args_dict.app_settings.items():
-                if value is not None and key in self.config["app_settings"]:
-                    self.config["app_settings"][key] = value
-        # Process api_config args
-        if hasattr(args_dict, 'api_config') and args_dict.api_config:
-            for key, value in args_dict.api_config.items():
-                if value is not None and key in self.config["api_config"]:
-                    self.config["api_config"][key] = value
-        self.save()
+        """Override settings for this run only: config.json keeps its values, also when other changes are saved"""
+        with self._lock:
+            for section, values in args_dict.items():
+                for key, value in values.items():
+                    if value is not None and key in self.config.get(section, {}):
+                        saved = self._cli_overrides.get((section, key), (self.config[section][key],))[0]
+                        self._cli_overrides[section, key] = (saved, value)
+                        self.config[section][key] = value
+        self._publish()
+
+    def _persisted_config(self):
+        """The config as config.json should hold it, without this run's CLI overrides"""
+        if not self._cli_overrides:
+            return self.config
+        persisted = copy.deepcopy(self.config)
+        for (section, key), (saved, _) in self._cli_overrides.items():
+            persisted[section][key] = saved
+        return persisted
 
     def _deep_update(self, target, source):
         for key, value in source.items():
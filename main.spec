@@ -6,6 +6,7 @@ block_cipher = None
 # Collect all necessary data files
 added_files = [
     ('resources/assets', 'resources/assets'),  # Include the assets folder and all its contents
+    ('resources/dictionaries', 'resources/dictionaries'),  # Word lists for the local spell pre-pass
 ]
 
 a = Analysis(
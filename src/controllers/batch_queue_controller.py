@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from config import ConfigManager
+from src.models.batch_queue import BatchQueue
+from src.models.llm_handler import LLMHandler
+from utils.cancellation import CancellationToken, OperationCancelled, cancellation_scope
+from utils.logger import get_logger
+from utils.tracing import tracer
+
+logger = get_logger()
+
+class BatchQueueController:
+    """Command-line side of the sharded batch queue: enqueue a CV directory as a job, run a
+    worker that processes shards until stopped, and report or collect a job's results.
+
+    Start as many workers as the hardware and the LLM quota allow, on this host or on others
+    sharing the queue database; each processes its shards through the normal LLMHandler batch
+    pipeline and renews its lease while it works.
+    """
+    def __init__(self, config_manager: ConfigManager, llm_handler: LLMHandler):
+        self.config_manager = config_manager
+        self.llm_handler = llm_handler
+        settings = self.config_manager.get('batch_queue')
+        self.shard_size = settings['shard_size']
+        self.lease_seconds = settings['lease_seconds']
+        self.poll_interval = settings['poll_interval']
+        self.queue = BatchQueue(settings['path'], journal_mode=settings['journal_mode'], max_attempts=settings['max_attempts'],
+                                shared_root=settings.get('shared_root'))
+        self.worker = BatchQueue.worker_id()
+
+    def close(self):
+        self.queue.close()
+
+    def enqueue(self, directory):
+        """Create the job's listings once, so every shard is reviewed against the same ones"""
+        cv_files = self.llm_handler._get_cv_files(directory)
+        if not cv_files:
+            raise ValueError(f"No valid CV files found in {directory}")
+        listings = self.llm_handler.create_default_listings(directory)
+        job_id = self.queue.create_job(directory, cv_files, listings, self.shard_size)
+        print(f"Queued job {job_id}: {len(cv_files)} CVs in shards of {self.shard_size}")
+        return job_id
+
+    def _heartbeat(self, shard, token, done):
+        """Renew the lease every third of its length; losing it cancels the shard's work"""
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.queue.renew(shard["job_id"], shard["shard"], self.worker, self.lease_seconds)
+            except Exception as e:
+                logger.error("Error renewing lease of shard %s/%s: %s", shard['job_id'], shard['shard'], e)
+                continue
+            if not renewed:
+                logger.warning("Lost the lease of shard %s/%s", shard['job_id'], shard['shard'])
+                token.cancel()
+                return
+
+    def process_shard(self, shard):
+        token = CancellationToken(timeout=self.config_manager.get('processing', 'request_timeout_s'), name=f"shard {shard['job_id']}/{shard['shard']}")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(shard, token, done), name="LeaseHeartbeat", daemon=True)
+        heartbeat.start()
+        logger.info("Processing shard %s/%s (%s CVs, attempt %s)", shard['job_id'], shard['shard'], len(shard['files']), shard['attempt'])
+        try:
+            with tracer.trace("batch_shard", job=shard["job_id"], shard=shard["shard"]), cancellation_scope(token):
+                results, _, stats = self.llm_handler.process_cv_batch(os.path.dirname(next(iter(shard["files"].values()))), shard["listings"], cv_files=shard["files"])
+            self.queue.complete(shard["job_id"], shard["shard"], self.worker, results, stats)
+        except OperationCancelled as e:
+            logger.warning("Shard %s/%s stopped: %s", shard['job_id'], shard['shard'], e)
+            self.queue.fail(shard["job_id"], shard["shard"], self.worker, e)
+        except Exception as e:
+            logger.error("Shard %s/%s failed: %s", shard['job_id'], shard['shard'], e)
+            self.queue.fail(shard["job_id"], shard["shard"], self.worker, e)
+        finally:
+            done.set()
+
+    def work(self, exit_when_idle=False):
+        """Claim and process shards until interrupted, or until the queue is empty with exit_when_idle"""
+        logger.info("Batch worker %s polling %s", self.worker, self.queue.db_path)
+        processed = 0
+        try:
+            while True:
+                shard = self.queue.claim(self.worker, self.lease_seconds)
+                if shard is None:
+                    if exit_when_idle:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                self.process_shard(shard)
+                processed += 1
+        except KeyboardInterrupt:
+            logger.info("Batch worker %s stopping", self.worker)
+        print(f"Worker {self.worker} processed {processed} shards")
+
+    def report(self, job_id, output_directory=None):
+        """Print the job's progress; once every shard is finished, also write the merged results file"""
+        status = self.queue.status(job_id)
+        if not status["total"]:
+            raise KeyError(f"Unknown batch job {job_id}")
+        print(f"Job {job_id}: {status.get('done', 0)} done, {status.get('leased', 0)} in progress, "
+              f"{status.get('pending', 0)} pending, {status.get('failed', 0)} failed of {status['total']} shards")
+        if not status["finished"]:
+            return None
+        results, listings, errors = self.queue.results(job_id)
+        result_text = "Batch Processing Results:\n\n"
+        for cv_id, cv_results in results.items():
+            result_text += f"## {cv_id}\n"
+            for listing_name, review in cv_results.items():
+                result_text += f"- {listing_name}: {review}\n"
+            result_text += "\n"
+        for shard, error in errors.items():
+            result_text += f"Shard {shard} failed: {error}\n"
+        output_directory = output_directory or os.path.join("chats_data", "downloads")
+        os.makedirs(output_directory, exist_ok=True)
+        result_file = os.path.join(output_directory, f"batch_results_{job_id}.txt")
+        with open(result_file, "w") as f:
+            f.write(result_text)
+        print(f"Results of {len(results)} CVs saved to {result_file}")
+        return result_file
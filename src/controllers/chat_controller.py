@@ -1,12 +1,19 @@
 import asyncio
 import threading
+import time
+from datetime import datetime, timedelta
 import ttkbootstrap as ttk
 from config import ConfigManager
+from src.models.batch_progress import format_progress
 from src.models.chat_model import ChatModel
+from src.models.conversation_context import ConversationContext
 from src.models.file_handler import FileHandler
 from src.models.llm_handler import LLMHandler
 from src.views.chat_view import ChatView
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
+from utils.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled, cancellation_scope
 
 logger = get_logger()
 
@@ -18,62 +25,143 @@ class ChatController:
         self.file_handler = FileHandler(storage_directory=self.chats_storage_dir)
         self.llm_handler = llm_handler
         self.chat_model = ChatModel(self.config_manager, self.file_handler)
-        self.chat_view = ChatView(notebook, self.config_manager, upload_callback=self.handle_file_upload, send_callback=self.send_message)
+        self.chat_view = ChatView(notebook, self.config_manager, upload_callback=self.handle_file_upload, upload_folder_callback=self.handle_folder_upload, send_callback=self.send_message, search_callback=self.search_history,
+                                  load_older_callback=self._load_older_messages, load_newer_callback=self._load_newer_messages, reload_latest_callback=self._load_existing_messages,
+                                  stop_callback=self.stop_requests)
+        self._active_requests = set()
+        self._requests_lock = threading.Lock()
+        self.llm_handler.add_batch_results_listener(self.chat_model.index_review_results)
+        self.llm_handler.add_batch_progress_listener(self._on_batch_progress)
+        self.llm_handler.set_conversation_context(ConversationContext(
+            self.chat_model,
+            self.llm_handler.summarize_conversation,
+            recent_token_budget=self._chat_setting('context_token_budget', 3000),
+            summary_token_budget=self._chat_setting('summary_token_budget', 400),
+        ))
         self._load_existing_messages()
     
+    def close(self):
+        self.chat_model.close()
+    
     def handle_file_upload(self):
-        file_name, saved_path = self.chat_model.upload_file()
-        if file_name:
-            system_message = f"File uploaded: {file_name}"
-            self.chat_view.add_message_to_history(system_message, sender="System")
-            self.chat_model.save_message(system_message, sender="System")
+        self._announce_upload(self.chat_model.upload_files())
+
+    def handle_folder_upload(self):
+        self._announce_upload(self.chat_model.upload_folder())
+
+    def _announce_upload(self, files):
+        if not files:
+            return
+        self.llm_handler.speculation.schedule(list(files.values()))
+        if len(files) == 1:
+            system_message = f"File uploaded: {next(iter(files))}"
+        else:
+            system_message = f"Batch of {len(files)} files uploaded: {', '.join(files)}. Ask to batch process them."
+        message_id = self.chat_model.save_message(system_message, sender="System")
+        self.chat_view.add_message_to_history(system_message, sender="System", message_id=message_id)
+    
+    def search_history(self, query, sender=None, days=None):
+        since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d') if days is not None else None
+        start = time.perf_counter()
+        results = self.chat_model.search(query, sender=sender, since=since)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.debug("Search '%s' returned %s results in %.1f ms", query, len(results), elapsed_ms)
+        self.chat_view.show_search_results(query, results, elapsed_ms)
+    
+    def _chat_setting(self, key, default):
+        value = self.config_manager.get('chat_settings', key)
+        return value if value else default
     
     def _load_existing_messages(self):
         logger.debug("Loading existing messages")
         try:
-            existing_messages = self.chat_model.get_messages(limit=250)
+            # One extra message tells the view whether there is older history to page in
+            page_size = self._chat_setting('initial_history_messages', 100)
+            existing_messages = self.chat_model.get_messages(limit=page_size + 1)
             if not existing_messages:
                 logger.debug("No existing messages to load")
-                return
-            
-            for message_data in existing_messages:
-                sender = message_data["sender"]
-                timestamp = message_data["timestamp"]
-                content = "\n".join(message_data["content"])
-                
-                self.chat_view.add_message_to_history(content, sender=sender, timestamp=timestamp)
+            self.chat_view.render_messages(existing_messages[-page_size:], has_older=len(existing_messages) > page_size)
         except Exception as e:
-            logger.error(f"Failed to load existing messages: {e}")
+            logger.error("Failed to load existing messages: %s", e)
+    
+    def _load_older_messages(self, before_id):
+        page_size = self._chat_setting('history_page_size', 50)
+        messages = self.chat_model.get_messages_before(before_id, page_size + 1)
+        self.chat_view.prepend_messages(messages[-page_size:], has_older=len(messages) > page_size)
+    
+    def _load_newer_messages(self, after_id):
+        page_size = self._chat_setting('history_page_size', 50)
+        messages = self.chat_model.get_messages_after(after_id, page_size + 1)
+        self.chat_view.append_messages(messages[:page_size], has_newer=len(messages) > page_size)
     
     def send_message(self):
         message = self.chat_view.get_message()
-        logger.debug(f"Sending message: {message}")
+        logger.debug("Sending message: %s", message)
 
         if not message:
             return
             
         # Display user message
-        self.chat_view.add_message_to_history(message, sender="You")
-        self.chat_model.save_message(message, sender="You")
+        message_id = self.chat_model.save_message(message, sender="You")
+        self.chat_view.add_message_to_history(message, sender="You", message_id=message_id)
         self.chat_view.clear_message()
         
         # Show typing status and start async response
+        token = CancellationToken(timeout=self.config_manager.get('processing', 'request_timeout_s'), name="chat request")
+        with self._requests_lock:
+            self._active_requests.add(token)
         self.chat_view.set_typing_status("Agent is typing...")
-        threading.Thread(target=self._run_async_response, args=(message,), daemon=True).start()
+        self.chat_view.set_stop_enabled(True)
+        threading.Thread(target=self._run_async_response, args=(message, token), daemon=True).start()
+    
+    def stop_requests(self):
+        with self._requests_lock:
+            tokens = list(self._active_requests)
+        for token in tokens:
+            token.cancel()
+        self.llm_handler.speculation.cancel()
+        if tokens:
+            self.chat_view.set_typing_status("Stopping...")
+    
+    def _on_batch_progress(self, event):
+        # Runs on the batch thread; verdicts are saved here and only the rendering goes through after()
+        for file_name, verdicts in event["verdicts"]:
+            text = f"## {file_name}\n" + "\n".join(f"- {listing_name}: {review}" for listing_name, review in verdicts.items())
+            message_id = self.chat_model.save_message(text, sender="Agent")
+            self.chat_view.frame.after(0, lambda text=text, message_id=message_id: self.chat_view.add_message_to_history(text, "Agent", message_id=message_id))
+        if event["stage"] not in ("done", "stopped", "failed"):
+            status = format_progress(event)
+            self.chat_view.frame.after(0, lambda: self.chat_view.set_typing_status(status))
     
-    def _run_async_response(self, message):
-        logger.debug(f"Running async response for message: {message}")
+    def _run_async_response(self, message, token):
+        logger.debug("Running async response for message: %s", message)
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        loop.run_until_complete(self._async_generate_agent_response(message))
+        try:
+            with metrics.track("event_loops"), tracer.trace("chat_request", message_chars=len(message)), cancellation_scope(token):
+                loop.run_until_complete(self._async_generate_agent_response(message))
+        finally:
+            loop.close()
+            with self._requests_lock:
+                self._active_requests.discard(token)
+                idle = not self._active_requests
+            if idle:
+                self.chat_view.frame.after(0, lambda: self.chat_view.set_stop_enabled(False))
     
     async def _async_generate_agent_response(self, user_message):
-        logger.debug(f"Generating async agent response for user message: {user_message}")
+        logger.debug("Generating async agent response for user message: %s", user_message)
         
         # Process the message intent and get a response
-        response_text = await self.llm_handler._process_message_intent(user_message,self.file_handler)
+        try:
+            response_text = await self.llm_handler._process_message_intent(user_message,self.file_handler)
+        except DeadlineExceeded as e:
+            logger.warning(str(e))
+            response_text = "Request stopped: it did not finish in time."
+        except OperationCancelled:
+            response_text = "Request stopped."
+        
+        message_id = self.chat_model.save_message(response_text, sender="Agent")
         
         # Use after() to safely update UI from a non-main thread
-        self.chat_view.frame.after(0, lambda: self.chat_view.add_message_to_history(response_text, "Agent"))
-        self.chat_view.frame.after(0, lambda: self.chat_view.set_typing_status(""))
-        self.chat_view.frame.after(0, lambda: self.chat_model.save_message(response_text, sender="Agent"))
\ No newline at end of file
+        self.chat_view.frame.after(0, lambda: self.chat_view.add_message_to_history(response_text, "Agent", message_id=message_id))
+        self.chat_view.frame.after(0, lambda: self.chat_view.set_typing_status(""))
\ No newline at end of file
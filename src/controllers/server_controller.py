@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from aiohttp import web
+from config import ConfigManager
+from src.models.conversation_context import estimate_tokens
+from src.models.llm_handler import LLMHandler
+from utils.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled, cancellation_scope
+from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight
+from utils.tracing import tracer
+
+logger = get_logger()
+
+FILE_ID = re.compile(r"^[0-9a-f]{64}$")
+UPLOAD_EXTENSIONS = (".pptx", ".pdf")
+
+class _LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        return None
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class ServerController:
+    """Serves chat, upload, review and batch over HTTP from one process for the whole team.
+
+    The aiohttp server runs on the LLMHandler's event loop, so every request shares its pooled
+    connections and concurrency limit; CPU-bound parsing goes to a fixed pool of worker threads.
+    Uploads are stored by content hash, and identical extraction, listing and review work is done
+    once: concurrent duplicates join the in-flight call and finished results are cached. Batches
+    run the LLMHandler batch pipeline and bypass these caches; they share only its frame
+    correction cache with /api/review.
+    """
+    def __init__(self, config_manager: ConfigManager, llm_handler: LLMHandler):
+        self.config_manager = config_manager
+        self.llm_handler = llm_handler
+        settings = self.config_manager.get('server')
+        self.host = settings['host']
+        self.port = settings['port']
+        self.workers = settings['workers']
+        self.max_upload_bytes = settings['max_upload_mb'] * 1024 * 1024
+        self.upload_directory = os.path.join(settings['data_directory'], "uploads")
+        self.batch_directory = os.path.join(settings['data_directory'], "batches")
+        os.makedirs(self.upload_directory, exist_ok=True)
+        os.makedirs(self.batch_directory, exist_ok=True)
+
+        self.single_flight = SingleFlight()
+        self.texts = _LRUCache(settings['cache_entries'])
+        self.listings = _LRUCache(settings['cache_entries'])
+        self.reviews = _LRUCache(settings['cache_entries'])
+
+        self.app = web.Application(middlewares=[self._request_scope])
+        self.app.add_routes([
+            web.get("/api/health", self.health),
+            web.post("/api/upload", self.upload),
+            web.post("/api/chat", self.chat),
+            web.post("/api/review", self.review),
+            web.post("/api/batch", self.batch),
+        ])
+
+    def run(self):
+        """Serve until interrupted (Ctrl+C)"""
+        loop = self.llm_handler.loop
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="DESHWorker")
+        loop.call_soon_threadsafe(loop.set_default_executor, executor)
+        runner = web.AppRunner(self.app)
+        asyncio.run_coroutine_threadsafe(self._start(runner), loop).result()
+        logger.info("DESH server listening on http://%s:%s with %s workers", self.host, self.port, self.workers)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            logger.info("Stopping DESH server")
+        finally:
+            asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(timeout=30)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _start(self, runner):
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+
+    @web.middleware
+    async def _request_scope(self, request, handler):
+        token = CancellationToken(timeout=self.config_manager.get('processing', 'request_timeout_s'), name=f"{request.method} {request.path}")
+        request['cancellation'] = token
+        start = time.perf_counter()
+        with metrics.track("http_requests_in_flight"), tracer.trace("http_request", method=request.method, path=request.path), cancellation_scope(token):
+            try:
+                response = await handler(request)
+            except DeadlineExceeded as e:
+                logger.warning(str(e))
+                response = web.json_response({"error": "Request did not finish in time"}, status=504)
+            except OperationCancelled:
+                response = web.Response(status=499)
+        logger.info("HTTP request finished", operation="http_request", path=request.path, status=response.status,
+                    duration_ms=round((time.perf_counter() - start) * 1000))
+        return response
+
+    @staticmethod
+    def _error(message, status=400):
+        return web.json_response({"error": message}, status=status)
+
+    @staticmethod
+    async def _json_body(request):
+        try:
+            body = await request.json()
+        except (ValueError, UnicodeDecodeError):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Request body must be JSON"}), content_type="application/json")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Request body must be a JSON object"}), content_type="application/json")
+        return body
+
+    def _file_path(self, file_id):
+        if not isinstance(file_id, str) or not FILE_ID.match(file_id):
+            return None
+        for extension in UPLOAD_EXTENSIONS:
+            path = os.path.join(self.upload_directory, file_id + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    async def health(self, request):
+        return web.json_response({"status": "ok", "metrics": metrics.snapshot()})
+
+    def _store_upload(self, data, extension):
+        file_id = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.upload_directory, file_id + extension)
+        if not os.path.exists(path):
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        return file_id
+
+    async def upload(self, request):
+        """multipart/form-data with one or more .pptx/.pdf files; returns their content ids"""
+        try:
+            reader = await request.multipart()
+        except (AssertionError, ValueError, KeyError):
+            return self._error("Expected multipart/form-data")
+        files = []
+        while (part := await reader.next()) is not None:
+            if not part.filename:
+                continue
+            extension = os.path.splitext(part.filename)[1].lower()
+            if extension not in UPLOAD_EXTENSIONS:
+                return self._error(f"Unsupported file type: {part.filename}", status=415)
+            data = bytearray()
+            while chunk := await part.read_chunk():
+                data.extend(chunk)
+                if len(data) > self.max_upload_bytes:
+                    return self._error(f"{part.filename} is larger than {self.max_upload_bytes // (1024 * 1024)} MB", status=413)
+            file_id = await asyncio.to_thread(self._store_upload, bytes(data), extension)
+            files.append({"file_id": file_id, "name": part.filename, "bytes": len(data)})
+        if not files:
+            return self._error("No files in upload")
+        return web.json_response({"files": files})
+
+    def _chat_messages(self, message, history):
+        """The message with as much of the client-supplied history as fits the context budget"""
+        budget = self.config_manager.get('chat_settings', 'context_token_budget') or 3000
+        messages, used = [], estimate_tokens(message)
+        for entry in reversed(history or []):
+            if not isinstance(entry, dict) or entry.get("role") not in ("user", "assistant") or not isinstance(entry.get("content"), str):
+                continue
+            used += estimate_tokens(entry["content"])
+            if used > budget:
+                break
+            messages.append({"role": entry["role"], "content": entry["content"]})
+        return list(reversed(messages)) + [{"role": "user", "content": message}]
+
+    async def chat(self, request):
+        """{"message": ..., "history": [{"role", "content"}], "stream": true}; streams NDJSON {"delta": ...} lines"""
+        body = await self._json_body(request)
+        message = body.get("message")
+        if not isinstance(message, str) or not message.strip():
+            return self._error("message is required")
+        messages = self._chat_messages(message, body.get("history"))
+        if not body.get("stream", True):
+            return web.json_response({"reply": await self.llm_handler._acomplete(messages)})
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        try:
+            async with aclosing(self.llm_handler.astream(messages)) as deltas:
+                async for delta in deltas:
+                    await response.write(json.dumps({"delta": delta}).encode() + b"\n")
+            await response.write(b'{"done": true}\n')
+        except ConnectionError:
+            request['cancellation'].cancel()  # the client went away; stop generating for it
+            return response
+        except (Exception, OperationCancelled) as e:
+            # The status line is already sent, so failures are reported in the stream
+            logger.error("Error streaming chat response: %s", e)
+            await response.write(json.dumps({"error": str(e)}).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    async def _cached(self, cache, key, factory):
+        value = cache.get(key)
+        if value is None:
+            value = await self.single_flight.run(key, factory)
+            cache.put(key, value)
+        return value
+
+    async def _cv_text(self, file_id, path):
+        return await self._cached(self.texts, ("text", file_id), lambda: self.llm_handler.aextract_text_from_pptx(path))
+
+    async def _listing(self, listing_type):
+        return await self._cached(self.listings, ("listing", listing_type, self.llm_handler.model),
+                                  lambda: self.llm_handler.acreate_listing(listing_type))
+
+    async def review(self, request):
+        """{"file_id": ..., "listing": text} or {"file_id": ..., "listing_type": "generic"}"""
+        body = await self._json_body(request)
+        path = self._file_path(body.get("file_id"))
+        if path is None or not path.endswith(".pptx"):
+            return self._error("file_id must name an uploaded .pptx file", status=404)
+        if not isinstance(body.get("listing"), (str, type(None))):
+            return self._error("listing must be a string")
+        if not isinstance(body.get("listing_type"), (str, type(None))):
+            return self._error("listing_type must be a string")
+        try:
+            cv_text = await self._cv_text(body["file_id"], path)
+            listing = body.get("listing") or await self._listing(body.get("listing_type") or "generic")
+            key = ("review", body["file_id"], hashlib.sha256(listing.encode("utf-8")).hexdigest(), self.llm_handler.model)
+            cached = self.reviews.get(key) is not None
+            review = await self._cached(self.reviews, key, lambda: self.llm_handler.areview_cv(cv_text, listing))
+        except Exception as e:
+            logger.error("Error reviewing %s: %s", body['file_id'], e)
+            return self._error(f"Error processing the CV: {e}", status=502)
+        return web.json_response({"file_id": body["file_id"], "listing": listing, "review": review, "cached": cached})
+
+    def _link_batch(self, batch_id, paths):
+        directory = os.path.join(self.batch_directory, batch_id)
+        os.makedirs(directory, exist_ok=True)
+        for path in paths:
+            target = os.path.join(directory, os.path.basename(path))
+            if not os.path.exists(target):
+                try:
+                    os.link(path, target)
+                except OSError:
+                    with open(path, "rb") as source, open(target, "wb") as f:
+                        f.write(source.read())
+        return directory
+
+    async def batch(self, request):
+        """{"file_ids": [...], "listings": {name: text}}; streams NDJSON progress events, then the results.
+        The CVs are extracted and reviewed afresh, not taken from the /api/review caches; only the
+        corrections of frames seen before are reused."""
+        body = await self._json_body(request)
+        file_ids = body.get("file_ids")
+        if not isinstance(file_ids, list) or not file_ids:
+            return self._error("file_ids must be a non-empty list")
+        paths = [self._file_path(file_id) for file_id in file_ids]
+        if any(path is None or not path.endswith(".pptx") for path in paths):
+            return self._error("Every file_id must name an uploaded .pptx file", status=404)
+        listings = body.get("listings") if isinstance(body.get("listings"), dict) else None
+        batch_id = hashlib.sha256("\n".join(sorted(set(file_ids))).encode()).hexdigest()[:16]
+        directory = await asyncio.to_thread(self._link_batch, batch_id, paths)
+
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        def on_progress(event):
+            event = dict(event, verdicts={os.path.splitext(name)[0]: verdicts for name, verdicts in event["verdicts"]})
+            loop.call_soon_threadsafe(events.put_nowait, event)
+        task = asyncio.ensure_future(self.llm_handler.aprocess_cv_batch(directory, listings, progress_callback=on_progress))
+        def finished(task):
+            if not task.cancelled():
+                task.exception()  # retrieved here too, so an abandoned batch does not log "never retrieved"
+            loop.call_soon_threadsafe(events.put_nowait, None)
+        task.add_done_callback(finished)
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        try:
+            while (event := await events.get()) is not None:
+                await response.write(json.dumps({"progress": event}).encode() + b"\n")
+            results, listings, stats = await task
+            results = {os.path.splitext(name)[0]: reviews for name, reviews in results.items()}
+            await response.write(json.dumps({"results": results, "listings": listings, "stats": stats}).encode() + b"\n")
+        except ConnectionError:
+            request['cancellation'].cancel()
+            return response
+        except (Exception, OperationCancelled) as e:
+            logger.error("Error in batch processing: %s", e)
+            await response.write(json.dumps({"error": str(e)}).encode() + b"\n")
+        await response.write_eof()
+        return response
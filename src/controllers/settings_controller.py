@@ -1,8 +1,11 @@
+from src.models.model_catalog import ModelCatalog
 from src.models.settings_model import SettingsModel
 from src.views.settings_view import SettingsView
 from src.models.llm_handler import LLMHandler
 from config import ConfigManager
 from utils.logger import get_logger
+from utils.resource_monitor import ResourceMonitor
+import tkinter as tk
 import tkinter.messagebox as messagebox
 import ttkbootstrap as ttk
 
@@ -15,9 +18,54 @@ class SettingsController:
         self.llm_handler = llm_handler
 
         self.model = SettingsModel(self.config_manager)
-        self.view = SettingsView(notebook,self.config_manager,save_callback=self.save_settings,reload_model_callback=self.llm_handler.run_init_prompt)
+        self.model_catalog = ModelCatalog()
+        self.view = SettingsView(notebook,self.config_manager,save_callback=self.save_settings,reload_model_callback=self.llm_handler.run_init_prompt,model_options_callback=self.model_catalog.get_models)
         self.apply_changes = apply_changes
         self._load_initial_settings()
+        self.config_manager.subscribe(self._on_config_changed)
+        
+        # The System Info table follows live resource usage instead of a one-off probe
+        self.resource_monitor = ResourceMonitor()
+        self.resource_monitor.add_listener(lambda sample: self.notebook.after(0, lambda: self.view.update_system_info(sample)))
+        self.resource_monitor.start()
+
+    def close(self):
+        self.resource_monitor.stop()
+
+    def _variables(self):
+        return {
+            ("api_config", "base_url"): self.view.base_url_var,
+            ("api_config", "api_key"): self.view.api_key_var,
+            ("api_config", "model"): self.view.model_var,
+            ("api_config", "temperature"): self.view.temperature_var,
+            ("api_config", "top_p"): self.view.top_p_var,
+            ("api_config", "max_tokens"): self.view.max_tokens_var,
+            ("api_config", "stream"): self.view.stream_var,
+            ("app_settings", "theme"): self.view.theme_var,
+            ("app_settings", "font_size"): self.view.font_size_var,
+            ("app_settings", "font_style"): self.view.font_style_var,
+            ("app_settings", "width"): self.view.width_var,
+            ("app_settings", "height"): self.view.height_var,
+        }
+
+    def _on_config_changed(self, changes):
+        # May be called from any thread; edits made in this tab already match their variables
+        self.notebook.after(0, lambda: self._refresh_variables(changes))
+
+    def _refresh_variables(self, changes):
+        variables = self._variables()
+        for section, values in changes.items():
+            for key, value in values.items():
+                var = variables.get((section, key))
+                if var is None or value is None:
+                    continue
+                try:
+                    if var.get() == value:
+                        continue
+                except tk.TclError:
+                    pass  # the field holds text that is not a valid number yet
+                logger.debug("Settings field %s.%s updated from config", section, key)
+                var.set(value)
 
     def _load_initial_settings(self):
         api_config = self.model.get_api_config()
@@ -57,17 +105,18 @@ class SettingsController:
                 "height": self.view.height_var.get(),
             }
             
-            # Update the configuration using update_from_ui method
-            for key, value in api_config.items():
-                self.config_manager.update_from_ui("api_config", key, value)
-                
-            for key, value in app_settings.items():
-                self.config_manager.update_from_ui("app_settings", key, value)
+            # Update the configuration using update_from_ui method, written to disk once
+            with self.config_manager.batch_update():
+                for key, value in api_config.items():
+                    self.config_manager.update_from_ui("api_config", key, value)
+                    
+                for key, value in app_settings.items():
+                    self.config_manager.update_from_ui("app_settings", key, value)
             
             messagebox.showinfo("Success", "Settings saved successfully!")
             self.apply_changes()
         except Exception as e:
-            logger.error(f"Failed to save settings: {e}")
+            logger.error("Failed to save settings: %s", e)
             messagebox.showerror("Error", str(e))
 
     def _apply_theme(self, theme_name,font_style,font_size):
@@ -77,5 +126,5 @@ class SettingsController:
             style.configure('.', font=(font_style, font_size))
             self.notebook.update_idletasks()
         except Exception as e:
-            logger.error(f"Theme error: {e}")
+            logger.error("Theme error: %s", e)
             messagebox.showerror("Theme Error", str(e))
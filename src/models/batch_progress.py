@@ -0,0 +1,108 @@
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class BatchProgress:
+    """Progress of one process_cv_batch run, reported to listeners as plain dict events.
+
+    Updates are throttled to one event per min_interval seconds; verdicts of CVs finished in
+    between are buffered and delivered with the next event, so a fast batch does not flood the
+    UI. Stage changes and the final event are always delivered.
+    """
+    def __init__(self, listeners, files_total, min_interval=0.5):
+        self.listeners = listeners
+        self.min_interval = min_interval
+        self.stage = "extracting"
+        self.files_total = files_total
+        self.files_extracted = 0
+        self.reviews_total = 0
+        self.reviews_done = 0
+        self.failures = 0
+        self._verdicts = []
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._review_started = None
+        self._last_emit = 0.0
+
+    def file_extracted(self):
+        with self._lock:
+            self.files_extracted += 1
+        self._emit()
+
+    def start_stage(self, stage, reviews_total=None):
+        with self._lock:
+            self.stage = stage
+            if reviews_total is not None:
+                self.reviews_total = reviews_total
+                self._review_started = time.monotonic()
+        self._emit(force=True)
+
+    def review_done(self, failed=False):
+        with self._lock:
+            self.reviews_done += 1
+            self.failures += failed
+        self._emit()
+
+    def cv_done(self, file_name, verdicts):
+        with self._lock:
+            self._verdicts.append((file_name, dict(verdicts)))
+        self._emit()
+
+    def finish(self, stage="done"):
+        with self._lock:
+            self.stage = stage
+        self._emit(force=True)
+
+    def _throughput(self, now):
+        """Reviews per minute since the review stage started"""
+        if not self._review_started or not self.reviews_done:
+            return None
+        return self.reviews_done * 60 / max(now - self._review_started, 1e-6)
+
+    def snapshot(self):
+        now = time.monotonic()
+        throughput = self._throughput(now)
+        remaining = self.reviews_total - self.reviews_done
+        return {
+            "stage": self.stage,
+            "files_extracted": self.files_extracted,
+            "files_total": self.files_total,
+            "reviews_done": self.reviews_done,
+            "reviews_total": self.reviews_total,
+            "failures": self.failures,
+            "elapsed_s": round(now - self._started, 1),
+            "reviews_per_minute": round(throughput, 1) if throughput else None,
+            "eta_s": round(remaining * 60 / throughput) if throughput and remaining > 0 else None,
+        }
+
+    def _emit(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+            event = self.snapshot()
+            event["verdicts"], self._verdicts = self._verdicts, []
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error("Batch progress listener failed: %s", e)
+
+def format_progress(event):
+    """One-line status text for a progress event"""
+    if event["stage"] == "extracting":
+        return f"Reading CVs: {event['files_extracted']}/{event['files_total']}"
+    if event["stage"] == "correcting":
+        return f"Correcting text of {event['files_total']} CVs..."
+    text = f"Reviews: {event['reviews_done']}/{event['reviews_total']}"
+    if event["failures"]:
+        text += f", {event['failures']} failed"
+    if event["reviews_per_minute"]:
+        text += f" - {event['reviews_per_minute']:.1f}/min"
+    if event["eta_s"] is not None:
+        minutes, seconds = divmod(event["eta_s"], 60)
+        text += f", about {minutes}m {seconds:02d}s left"
+    return text
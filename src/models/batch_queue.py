@@ -0,0 +1,186 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class BatchQueue:
+    """Durable SQLite queue of CV batch shards shared by a coordinator and any number of workers.
+
+    A job is a directory of CVs split into shards of shard_size files. Workers claim one shard
+    at a time under a lease that they renew while working; a shard whose lease expires (the
+    worker died or lost its connection) goes back to whoever claims next, up to max_attempts.
+    Results are written back per shard and merged when the job is read.
+
+    Workers on one host can share the default WAL database. Across machines, put the database
+    on shared storage with working file locks and use journal_mode "DELETE", since WAL needs
+    shared memory on a single host. The CVs must be on shared storage too: with shared_root set,
+    jobs store CV paths relative to it and each worker resolves them against its own
+    shared_root, so the storage may be mounted at a different path on every machine. Without
+    it, paths are stored as absolute paths on the coordinator.
+    """
+    def __init__(self, db_path="batch_queue.db", journal_mode="WAL", max_attempts=3, shared_root=None):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.shared_root = os.path.abspath(shared_root) if shared_root else None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; claims open an explicit BEGIN IMMEDIATE so two workers never take the same shard
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    directory TEXT NOT NULL,
+                    listings TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS shards (
+                    job_id TEXT NOT NULL,
+                    shard INTEGER NOT NULL,
+                    files TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    results TEXT,
+                    stats TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, shard)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS shards_claimable ON shards (status, lease_expires)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _stored_path(self, path):
+        path = os.path.abspath(path)
+        if not self.shared_root:
+            return path
+        relative = os.path.relpath(path, self.shared_root)
+        if relative == ".." or relative.startswith(".." + os.sep) or os.path.isabs(relative):
+            raise ValueError(f"{path} is outside the shared root {self.shared_root}")
+        return relative.replace(os.sep, "/")
+
+    def _local_path(self, path):
+        if self.shared_root and not os.path.isabs(path):
+            return os.path.join(self.shared_root, *path.split("/"))
+        return path
+
+    @staticmethod
+    def worker_id():
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def create_job(self, directory, cv_files, listings, shard_size=10):
+        """cv_files maps file names to paths, under shared_root when it is set; returns the new job id"""
+        job_id = uuid.uuid4().hex[:12]
+        names = sorted(cv_files)
+        shards = [names[start:start + shard_size] for start in range(0, len(names), shard_size)]
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO jobs (id, directory, listings, created_at) VALUES (?, ?, ?, ?)",
+                         (job_id, self._stored_path(directory), json.dumps(listings), now))
+            conn.executemany("INSERT INTO shards (job_id, shard, files, updated_at) VALUES (?, ?, ?, ?)",
+                             [(job_id, index, json.dumps({name: self._stored_path(cv_files[name]) for name in shard}), now)
+                              for index, shard in enumerate(shards)])
+        logger.info("Queued batch job %s: %s CVs in %s shards", job_id, len(names), len(shards))
+        return job_id
+
+    def claim(self, worker, lease_seconds):
+        """Lease the next pending or abandoned shard to worker; None when there is nothing to do"""
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute("""
+                    SELECT s.job_id, s.shard, s.files, s.attempts, s.worker, j.listings FROM shards s JOIN jobs j ON j.id = s.job_id
+                    WHERE s.status = 'pending' OR (s.status = 'leased' AND s.lease_expires < ?)
+                    ORDER BY j.created_at, s.shard LIMIT 1""", (now,)).fetchone()
+                if row is None:
+                    return None
+                job_id, shard, files, attempts, previous_worker, listings = row
+                if attempts < self.max_attempts:
+                    break
+                # Its last worker died holding it; give up on the shard rather than retrying forever
+                conn.execute("UPDATE shards SET status = 'failed', worker = NULL, error = COALESCE(error, 'lease expired'), updated_at = ? WHERE job_id = ? AND shard = ?",
+                             (now, job_id, shard))
+                logger.warning("Shard %s/%s failed after %s attempts", job_id, shard, attempts)
+            conn.execute("UPDATE shards SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE job_id = ? AND shard = ?",
+                         (worker, now + lease_seconds, now, job_id, shard))
+        if previous_worker:
+            logger.warning("Reclaimed shard %s/%s from %s after its lease expired", job_id, shard, previous_worker)
+        files = {name: self._local_path(path) for name, path in json.loads(files).items()}
+        return {"job_id": job_id, "shard": shard, "files": files, "listings": json.loads(listings), "attempt": attempts + 1}
+
+    def renew(self, job_id, shard, worker, lease_seconds):
+        """Extend the lease; False when the shard is no longer leased to worker"""
+        with self._transaction() as conn:
+            updated = conn.execute("UPDATE shards SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND shard = ? AND status = 'leased' AND worker = ?",
+                                   (time.time() + lease_seconds, time.time(), job_id, shard, worker)).rowcount
+        return updated == 1
+
+    def complete(self, job_id, shard, worker, results, stats=None):
+        with self._transaction() as conn:
+            updated = conn.execute("""
+                UPDATE shards SET status = 'done', results = ?, stats = ?, error = NULL, lease_expires = NULL, updated_at = ?
+                WHERE job_id = ? AND shard = ? AND status = 'leased' AND worker = ?""",
+                (json.dumps(results), json.dumps(stats or {}), time.time(), job_id, shard, worker)).rowcount
+        if not updated:
+            logger.warning("Discarding results of shard %s/%s: the lease was lost", job_id, shard)
+        return updated == 1
+
+    def fail(self, job_id, shard, worker, error):
+        """Release the shard for another attempt, or mark it failed once max_attempts is used up"""
+        with self._transaction() as conn:
+            conn.execute("""
+                UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    worker = NULL, lease_expires = NULL, error = ?, updated_at = ?
+                WHERE job_id = ? AND shard = ? AND status = 'leased' AND worker = ?""",
+                (self.max_attempts, str(error), time.time(), job_id, shard, worker))
+
+    def status(self, job_id):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM shards WHERE job_id = ? GROUP BY status", (job_id,)).fetchall())
+        counts["total"] = sum(counts.values())
+        counts["finished"] = counts["total"] > 0 and counts.get("done", 0) + counts.get("failed", 0) == counts["total"]
+        return counts
+
+    def results(self, job_id):
+        """Merged (results, listings, errors) of a job's finished shards"""
+        with self._lock:
+            job = self._conn.execute("SELECT listings FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            rows = self._conn.execute("SELECT shard, status, results, error FROM shards WHERE job_id = ? ORDER BY shard", (job_id,)).fetchall()
+        if job is None:
+            raise KeyError(f"Unknown batch job {job_id}")
+        results, errors = {}, {}
+        for shard, status, shard_results, error in rows:
+            if status == 'done':
+                results.update(json.loads(shard_results))
+            elif status == 'failed':
+                errors[shard] = error
+        return results, json.loads(job[0]), errors
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
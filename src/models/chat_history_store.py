@@ -0,0 +1,201 @@
+import os
+import re
+import sqlite3
+import threading
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class ChatHistoryStore:
+    """SQLite index of chat messages so the latest N can be read without scanning every log file.
+    Messages and batch review results are also kept in FTS5 indexes maintained by triggers."""
+    def __init__(self, storage_directory, db_name="chat_history.db"):
+        self.db_path = os.path.join(storage_directory, db_name)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+        logger.debug("Chat history store opened at %s", self.db_path)
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    log_date TEXT NOT NULL,
+                    sender TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    content TEXT NOT NULL
+                )""")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS review_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    log_date TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    cv_name TEXT NOT NULL,
+                    listing_name TEXT NOT NULL,
+                    listing TEXT NOT NULL,
+                    review TEXT NOT NULL
+                )""")
+        self.full_text_search = self._create_fts_schema()
+
+    def _create_fts_schema(self):
+        try:
+            with self._lock, self._conn:
+                existing = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id')")
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+                        INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+                    END""")
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+                        INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                    END""")
+                self._conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS review_results_fts
+                    USING fts5(cv_name, listing_name, listing, review, content='review_results', content_rowid='id')""")
+                self._conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS review_results_fts_insert AFTER INSERT ON review_results BEGIN
+                        INSERT INTO review_results_fts (rowid, cv_name, listing_name, listing, review)
+                        VALUES (new.id, new.cv_name, new.listing_name, new.listing, new.review);
+                    END""")
+                if "messages_fts" not in existing:
+                    # Index messages stored before full-text search existed
+                    self._conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite FTS5 unavailable, chat search falls back to substring matching: %s", e)
+            return False
+
+    def add_messages(self, rows, meta=None):
+        """rows are (log_date, sender, timestamp, content) tuples, inserted in order in one transaction
+        together with the optional meta key/value pairs"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (log_date, sender, timestamp, content) VALUES (?, ?, ?, ?)", rows)
+            if meta:
+                self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+
+    def get_latest(self, limit=250):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, log_date, sender, timestamp, content FROM messages ORDER BY id DESC LIMIT ?",
+                (limit if limit else -1,)).fetchall()
+        return [self._to_message(row) for row in reversed(rows)]
+
+    def add_numbered_messages(self, rows):
+        """rows are (id, log_date, sender, timestamp, content) tuples with ids allocated by the caller"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (id, log_date, sender, timestamp, content) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def max_id(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+
+    def get_before(self, message_id, limit):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, log_date, sender, timestamp, content FROM messages WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (message_id, limit)).fetchall()
+        return [self._to_message(row) for row in reversed(rows)]
+
+    def get_after(self, message_id, limit):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, log_date, sender, timestamp, content FROM messages WHERE id > ? ORDER BY id LIMIT ?",
+                (message_id, limit)).fetchall()
+        return [self._to_message(row) for row in rows]
+
+    def add_review_results(self, rows):
+        """rows are (log_date, timestamp, cv_name, listing_name, listing, review) tuples"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO review_results (log_date, timestamp, cv_name, listing_name, listing, review) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def search(self, query, sender=None, since=None, until=None, limit=50):
+        """Ranked matches across messages and review results, best first.
+        sender "Review" restricts the search to review results; since/until are inclusive YYYY-MM-DD dates."""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        hits = []
+        with self._lock:
+            if sender != "Review":
+                hits.extend(self._search_messages(terms, sender, since, until, limit))
+            if sender in (None, "Review"):
+                hits.extend(self._search_reviews(terms, since, until, limit))
+        hits.sort(key=lambda hit: hit["rank"])
+        return hits[:limit]
+
+    def _date_filters(self, column, since, until):
+        clauses, params = [], []
+        if since:
+            clauses.append(f"{column} >= ?")
+            params.append(since)
+        if until:
+            clauses.append(f"{column} <= ?")
+            params.append(until)
+        return clauses, params
+
+    @staticmethod
+    def _match_expression(terms):
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def _search_messages(self, terms, sender, since, until, limit):
+        clauses, params = self._date_filters("m.log_date", since, until)
+        if sender:
+            clauses.append("m.sender = ?")
+            params.append(sender)
+        if self.full_text_search:
+            sql = ("SELECT m.id, m.log_date, m.sender, m.timestamp, snippet(messages_fts, 0, '[', ']', '...', 12), bm25(messages_fts) "
+                   "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid WHERE messages_fts MATCH ?")
+            params.insert(0, self._match_expression(terms))
+        else:
+            sql = "SELECT m.id, m.log_date, m.sender, m.timestamp, substr(m.content, 1, 120), 0 FROM messages m WHERE 1"
+            for term in reversed(terms):
+                clauses.insert(0, "m.content LIKE ?")
+                params.insert(0, f"%{term}%")
+        sql += "".join(f" AND {clause}" for clause in clauses) + (" ORDER BY 6, m.id DESC LIMIT ?" if self.full_text_search else " ORDER BY m.id DESC LIMIT ?")
+        rows = self._conn.execute(sql, (*params, limit)).fetchall()
+        return [{"kind": "message", "id": row[0], "date": row[1], "sender": row[2], "timestamp": row[3], "snippet": row[4], "rank": row[5]} for row in rows]
+
+    def _search_reviews(self, terms, since, until, limit):
+        clauses, params = self._date_filters("r.log_date", since, until)
+        if self.full_text_search:
+            sql = ("SELECT r.id, r.log_date, r.timestamp, r.cv_name, r.listing_name, snippet(review_results_fts, 3, '[', ']', '...', 12), bm25(review_results_fts) "
+                   "FROM review_results_fts JOIN review_results r ON r.id = review_results_fts.rowid WHERE review_results_fts MATCH ?")
+            params.insert(0, self._match_expression(terms))
+        else:
+            sql = "SELECT r.id, r.log_date, r.timestamp, r.cv_name, r.listing_name, substr(r.review, 1, 120), 0 FROM review_results r WHERE 1"
+            for term in reversed(terms):
+                clauses.insert(0, "(r.review || ' ' || r.listing || ' ' || r.cv_name) LIKE ?")
+                params.insert(0, f"%{term}%")
+        sql += "".join(f" AND {clause}" for clause in clauses) + (" ORDER BY 7, r.id DESC LIMIT ?" if self.full_text_search else " ORDER BY r.id DESC LIMIT ?")
+        rows = self._conn.execute(sql, (*params, limit)).fetchall()
+        return [{"kind": "review", "id": row[0], "date": row[1], "sender": "Review", "timestamp": row[2],
+                 "snippet": f"{row[3]} / {row[4]}: {row[5]}", "rank": row[6]} for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_message(row):
+        message_id, log_date, sender, timestamp, content = row
+        return {"id": message_id, "date": log_date, "sender": sender, "timestamp": timestamp, "content": content.split("\n")}
@@ -0,0 +1,129 @@
+import gzip
+import os
+import re
+import shutil
+import threading
+from datetime import datetime, timedelta
+from utils.logger import get_logger
+
+logger = get_logger()
+
+DAILY_LOG = re.compile(r"^chat_log_(\d{8})\.txt$")
+COMPRESSED_LOG = re.compile(r"^chat_log_(\d{8})\.txt\.gz$")
+ARCHIVE_SEGMENT = re.compile(r"^chat_archive_(\d{6})\.txt\.gz$")
+DAY_MARKER = "<DAY:{}>"
+DAY_MARKER_LINE = re.compile(r"^<DAY:(\d{8})>$")
+
+class ChatLogRotator:
+    """Keeps chats_data bounded: daily logs older than compress_after_days are gzipped, and
+    compressed days of finished months are compacted into one chat_archive_YYYYMM.txt.gz segment.
+    Inside a segment every day starts with a <DAY:YYYYMMDD> line so message dates survive."""
+    def __init__(self, storage_directory, compress_after_days=7, compact=True):
+        self.storage_directory = storage_directory
+        self.compress_after_days = max(1, compress_after_days)  # today's file is still being appended to
+        self.compact_enabled = compact
+        self.lock = threading.Lock()  # held while rotating and while readers walk the log files
+
+    def run(self, today=None):
+        today = today or datetime.now()
+        try:
+            with self.lock:
+                compressed = self.rotate(today)
+                compacted = self.compact(today) if self.compact_enabled else 0
+            if compressed or compacted:
+                logger.info("Chat log rotation: %s logs compressed, %s archive segments written", compressed, compacted)
+        except Exception as e:
+            logger.error("Chat log rotation failed: %s", e)
+
+    def rotate(self, today):
+        cutoff = (today - timedelta(days=self.compress_after_days)).strftime("%Y%m%d")
+        compressed = 0
+        for filename in sorted(os.listdir(self.storage_directory)):
+            match = DAILY_LOG.match(filename)
+            if not match or match.group(1) >= cutoff:
+                continue
+            source = os.path.join(self.storage_directory, filename)
+            target = source + ".gz"
+            with open(source, "rb") as f_in, gzip.open(target + ".partial", "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.replace(target + ".partial", target)
+            os.remove(source)
+            compressed += 1
+        return compressed
+
+    def compact(self, today):
+        current_month = today.strftime("%Y%m")
+        filenames = os.listdir(self.storage_directory)
+        # A month is only compacted once all of its days are compressed
+        open_months = {match.group(1)[:6] for match in map(DAILY_LOG.match, filenames) if match}
+        by_month = {}
+        for filename in filenames:
+            match = COMPRESSED_LOG.match(filename)
+            if match and match.group(1)[:6] < current_month and match.group(1)[:6] not in open_months:
+                by_month.setdefault(match.group(1)[:6], []).append((match.group(1), filename))
+
+        written = 0
+        for month, days in sorted(by_month.items()):
+            segment = os.path.join(self.storage_directory, f"chat_archive_{month}.txt.gz")
+            # Days already in the segment are left over from a compaction interrupted before its
+            # cleanup; days missing from it (late, copied or restored logs) are merged in
+            archived = self._segment_days(segment) if os.path.exists(segment) else set()
+            missing = [(day, filename) for day, filename in days if day not in archived]
+            if missing:
+                self._write_segment(segment, missing)
+                written += 1
+            self._remove_days(days)
+        return written
+
+    @staticmethod
+    def _segment_days(segment):
+        with gzip.open(segment, "rt", encoding="utf-8") as f:
+            return {match.group(1) for match in map(DAY_MARKER_LINE.match, f) if match}
+
+    def _write_segment(self, segment, days):
+        """Write segment with days merged into its current content in date order, replacing it atomically"""
+        pending = iter(sorted(days))
+        next_day = next(pending, None)
+        with gzip.open(segment + ".partial", "wt", encoding="utf-8") as f_out:
+            def write_days_before(limit):
+                nonlocal next_day
+                while next_day is not None and (limit is None or next_day[0] < limit):
+                    day, filename = next_day
+                    f_out.write(DAY_MARKER.format(day) + "\n")
+                    with gzip.open(os.path.join(self.storage_directory, filename), "rt", encoding="utf-8") as f_in:
+                        shutil.copyfileobj(f_in, f_out)
+                    next_day = next(pending, None)
+            if os.path.exists(segment):
+                with gzip.open(segment, "rt", encoding="utf-8") as f_in:
+                    for line in f_in:
+                        if match := DAY_MARKER_LINE.match(line):
+                            write_days_before(match.group(1))
+                        f_out.write(line)
+            write_days_before(None)
+        os.replace(segment + ".partial", segment)
+
+    def _remove_days(self, days):
+        for _, filename in days:
+            os.remove(os.path.join(self.storage_directory, filename))
+
+    def list_log_files(self):
+        """Every log file in chronological order as (sort_key, path, is_archive) tuples, skipping
+        compressed days that were already compacted into their month's segment"""
+        filenames = os.listdir(self.storage_directory)
+        archived_months = {match.group(1) for match in map(ARCHIVE_SEGMENT.match, filenames) if match}
+        files = []
+        for filename in filenames:
+            path = os.path.join(self.storage_directory, filename)
+            if match := ARCHIVE_SEGMENT.match(filename):
+                files.append((match.group(1) + "00", path, True))
+            elif match := DAILY_LOG.match(filename):
+                files.append((match.group(1), path, False))
+            elif (match := COMPRESSED_LOG.match(filename)) and match.group(1)[:6] not in archived_months:
+                files.append((match.group(1), path, False))
+        return sorted(files)
+
+    @staticmethod
+    def open_log(path):
+        if path.endswith(".gz"):
+            return gzip.open(path, "rt", encoding="utf-8")
+        return open(path, "r", encoding="utf-8")
@@ -1,69 +1,189 @@
-import os
+import threading
 from datetime import datetime
+from .chat_history_store import ChatHistoryStore
+from .chat_log_rotation import ChatLogRotator
+from .chat_writer import ChatLogWriter
 from .file_handler import FileHandler
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
 from config import ConfigManager
 
 logger = get_logger()
 
+LOGS_IMPORTED_KEY = "logs_imported"
+
 class ChatModel:
     def __init__(self, config_manager: ConfigManager, file_handler: FileHandler):
         logger.debug("Initializing ChatModel")
         self.config_manager = config_manager
         self.file_handler = file_handler
-    
+        self.history_store = ChatHistoryStore(self.file_handler.storage_directory)
+        self.rotator = ChatLogRotator(
+            self.file_handler.storage_directory,
+            compress_after_days=self._chat_setting('compress_after_days', 7),
+            compact=self._chat_setting('compact_archives', True),
+        )
+        self._import_existing_logs()
+        # Ids are handed out at save time so views can page around messages still queued for the writer
+        self._id_lock = threading.Lock()
+        self._next_id = self.history_store.max_id() + 1
+        self.writer = ChatLogWriter(
+            self.file_handler.storage_directory,
+            self.history_store,
+            flush_interval=self._chat_setting('flush_interval_ms', 500) / 1000,
+            flush_batch_size=self._chat_setting('flush_batch_size', 50),
+            fsync_policy=self._chat_setting('fsync_policy', "batch"),
+        )
+        metrics.register_gauge("chat_write_queue", lambda: self.writer.pending)
+        # Older daily logs are compressed and compacted off the UI thread
+        threading.Thread(target=self.rotator.run, name="ChatLogRotation", daemon=True).start()
+
+    def _chat_setting(self, key, default):
+        value = self.config_manager.get('chat_settings', key) if self.config_manager else None
+        return default if value is None else value
+
     def save_message(self, message, sender="You"):
-        log_file = os.path.join(self.file_handler.storage_directory, f"chat_log_{datetime.now().strftime('%Y%m%d')}.txt")
-        timestamp = datetime.now().strftime("[%H:%M:%S]")
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(f"<BEGIN:{sender}:{timestamp}>\n")
-            f.write(f"{message}\n")
-            f.write(f"<END:{sender}>\n")
-    
+        """Queue the message for the background writer and return its id; safe to call from any thread"""
+        with self._id_lock:
+            message_id = self._next_id
+            self._next_id += 1
+            self.writer.write(message_id, sender, message, datetime.now())
+        return message_id
+
+    @tracer.traced("chat.read_history")
     def get_messages(self, limit=250):
-        all_messages = self._get_all_messages()
-        return all_messages[-limit:] if limit and len(all_messages) > limit else all_messages
+        self.writer.flush()
+        try:
+            return self.history_store.get_latest(limit)
+        except Exception as e:
+            logger.error("Error reading indexed messages, scanning logs instead: %s", e)
+            all_messages = self._get_all_messages()
+            return all_messages[-limit:] if limit and len(all_messages) > limit else all_messages
+
+    def get_messages_before(self, message_id, limit):
+        """Older page of history; pending writes are always newer, so no flush is needed"""
+        try:
+            return self.history_store.get_before(message_id, limit)
+        except Exception as e:
+            logger.error("Error reading older messages: %s", e)
+            return []
+
+    def get_messages_after(self, message_id, limit):
+        self.writer.flush()
+        try:
+            return self.history_store.get_after(message_id, limit)
+        except Exception as e:
+            logger.error("Error reading newer messages: %s", e)
+            return []
+
+    def search(self, query, sender=None, since=None, until=None, limit=50):
+        self.writer.flush()
+        try:
+            return self.history_store.search(query, sender=sender, since=since, until=until, limit=limit)
+        except Exception as e:
+            logger.error("Error searching chat history: %s", e)
+            return []
+
+    def index_review_results(self, results, listings):
+        now = datetime.now()
+        rows = [
+            (now.strftime('%Y-%m-%d'), now.strftime("[%H:%M:%S]"), cv_id, listing_name, listings.get(listing_name, ""), review)
+            for cv_id, cv_results in results.items()
+            for listing_name, review in cv_results.items()
+        ]
+        try:
+            self.history_store.add_review_results(rows)
+        except Exception as e:
+            logger.error("Error indexing review results: %s", e)
+
+    def close(self):
+        self.writer.close()
+        self.history_store.close()
+
+    def _import_existing_logs(self):
+        """One-time import of the <BEGIN:...>/<END:...> log files into the history index"""
+        if self.history_store.get_meta(LOGS_IMPORTED_KEY):
+            return
+        try:
+            rows = ((message["date"], message["sender"], message["timestamp"], "\n".join(message["content"])) for message in self._iter_messages())
+            self.history_store.add_messages(rows, meta={LOGS_IMPORTED_KEY: datetime.now().isoformat()})
+            logger.info("Imported %s messages from chat logs into the history index", self.history_store.count())
+        except Exception as e:
+            logger.error("Error importing chat logs: %s", e)
 
     def _get_all_messages(self):
         messages = []
-        current_message = {"sender": None, "timestamp": None, "content": []}
         try:
-            for filename in sorted(os.listdir(self.file_handler.storage_directory)):
-                if filename.startswith("chat_log_") and filename.endswith(".txt"):
-                    file_path = os.path.join(self.file_handler.storage_directory, filename)
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            line = line.rstrip()
-                            if line.startswith("<BEGIN:"):
-                                # If we have a previous message in progress, add it to messages
-                                if current_message["sender"] is not None:
-                                    messages.append(current_message)
-                                # Parse the begin tag: <BEGIN:sender:timestamp>
-                                parts = line[7:-1].split(":", 1)  # Remove <BEGIN: and >
-                                sender = parts[0]
-                                timestamp = parts[1] if len(parts) > 1 else ""
-                                current_message = {"sender": sender, "timestamp": timestamp, "content": []}
-                            elif line.startswith("<END:"):
-                                # Add the completed message to messages
-                                if current_message["sender"] is not None:
-                                    messages.append(current_message)
-                                    current_message = {"sender": None, "timestamp": None, "content": []}
-                            elif current_message["sender"] is not None:
-                                current_message["content"].append(line)
-            if current_message["sender"] is not None:
-                messages.append(current_message)
+            messages.extend(self._iter_messages())
         except Exception as e:
-            logger.error(f"Error while getting messages: {e}")
+            logger.error("Error while getting messages: %s", e)
         return messages
-    
+
+    def _iter_messages(self):
+        """Messages from every daily log, compressed log and archive segment, oldest first.
+        Compressed files are only decompressed as the iteration reaches them."""
+        with self.rotator.lock:
+            for sort_key, file_path, _ in self.rotator.list_log_files():
+                with self.rotator.open_log(file_path) as f:
+                    yield from self._parse_log_lines(f, self._log_date(sort_key))
+
+    @staticmethod
+    def _log_date(day):
+        try:
+            return datetime.strptime(day, "%Y%m%d").strftime("%Y-%m-%d")
+        except ValueError:
+            return ""
+
+    @classmethod
+    def _parse_log_lines(cls, lines, log_date=""):
+        current_message = {"sender": None, "timestamp": None, "content": []}
+        for line in lines:
+            line = line.rstrip()
+            if line.startswith("<DAY:") and current_message["sender"] is None:
+                # Day boundary inside an archive segment
+                log_date = cls._log_date(line[5:-1])
+            elif line.startswith("<BEGIN:"):
+                # If we have a previous message in progress, add it to messages
+                if current_message["sender"] is not None:
+                    yield current_message
+                # Parse the begin tag: <BEGIN:sender:timestamp>
+                parts = line[7:-1].split(":", 1)  # Remove <BEGIN: and >
+                sender = parts[0]
+                timestamp = parts[1] if len(parts) > 1 else ""
+                current_message = {"date": log_date, "sender": sender, "timestamp": timestamp, "content": []}
+            elif line.startswith("<END:"):
+                # Add the completed message to messages
+                if current_message["sender"] is not None:
+                    yield current_message
+                    current_message = {"sender": None, "timestamp": None, "content": []}
+            elif current_message["sender"] is not None:
+                current_message["content"].append(line)
+        if current_message["sender"] is not None:
+            yield current_message
+
     def upload_file(self):
         file_name, saved_path = self.file_handler.upload_file()
         if file_name:
-            logger.info(f"File uploaded: {file_name}")
+            logger.info("File uploaded: %s", file_name)
             self.uploaded_file_path = saved_path
             return file_name, saved_path
         return None, None
+
+    def upload_files(self):
+        files = self.file_handler.upload_files()
+        self._log_uploads(files)
+        return files
+
+    def upload_folder(self):
+        files = self.file_handler.upload_folder()
+        self._log_uploads(files)
+        return files
+
+    def _log_uploads(self, files):
+        if files:
+            logger.info("Files uploaded: %s", ', '.join(files))
+            self.uploaded_file_path = self.file_handler.get_uploaded_file_path()
     
     def download_file(self, file_path):
         return self.file_handler.download_file(file_path)
@@ -0,0 +1,113 @@
+import os
+import queue
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger()
+
+FSYNC_POLICIES = ("never", "batch", "always")
+
+class _Marker:
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = threading.Event()
+
+class ChatLogWriter:
+    """Persists chat messages on a dedicated thread, in the order they were submitted.
+
+    Messages are batched until flush_batch_size messages are pending or flush_interval seconds
+    have passed since the first one, then appended to the daily log files and the history
+    index in one go. fsync_policy is "never" (leave it to the OS), "batch" (once per file per
+    batch) or "always" (after every message).
+    """
+    def __init__(self, storage_directory, history_store, flush_interval=0.5, flush_batch_size=50, fsync_policy="batch"):
+        if fsync_policy not in FSYNC_POLICIES:
+            logger.warning("Unknown fsync policy '%s', using 'batch'", fsync_policy)
+            fsync_policy = "batch"
+        self.storage_directory = storage_directory
+        self.history_store = history_store
+        self.flush_interval = flush_interval
+        self.flush_batch_size = max(1, flush_batch_size)
+        self.fsync_policy = fsync_policy
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ChatLogWriter", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def write(self, message_id, sender, message, when):
+        if self._closed:
+            raise RuntimeError("Chat log writer is closed")
+        self._queue.put((message_id, sender, message, when))
+
+    def flush(self, timeout=None):
+        """Block until every message submitted before this call has been persisted"""
+        if self._closed:
+            return True
+        marker = _Marker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout=10):
+        if self._closed:
+            return
+        self._closed = True
+        marker = _Marker(stop=True)
+        self._queue.put(marker)
+        if not marker.done.wait(timeout):
+            logger.error("Chat log writer did not finish within %ss, %s messages may be lost", timeout, self.pending)
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        while True:
+            batch = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while not isinstance(item, _Marker):
+                batch.append(item)
+                if len(batch) >= self.flush_batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            self._persist(batch)
+            if isinstance(item, _Marker):
+                item.done.set()
+                if item.stop:
+                    return
+
+    def _persist(self, batch):
+        if not batch:
+            return
+        by_file = {}
+        for _, sender, message, when in batch:
+            log_file = os.path.join(self.storage_directory, f"chat_log_{when.strftime('%Y%m%d')}.txt")
+            by_file.setdefault(log_file, []).append((sender, message, when))
+        try:
+            for log_file, entries in by_file.items():
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    for sender, message, when in entries:
+                        timestamp = when.strftime("[%H:%M:%S]")
+                        f.write(f"<BEGIN:{sender}:{timestamp}>\n")
+                        f.write(f"{message}\n")
+                        f.write(f"<END:{sender}>\n")
+                        if self.fsync_policy == "always":
+                            f.flush()
+                            os.fsync(f.fileno())
+                    if self.fsync_policy == "batch":
+                        f.flush()
+                        os.fsync(f.fileno())
+        except Exception as e:
+            logger.error("Error writing chat log: %s", e)
+        try:
+            self.history_store.add_numbered_messages([
+                (message_id, when.strftime('%Y-%m-%d'), sender, when.strftime("[%H:%M:%S]"), message)
+                for message_id, sender, message, when in batch
+            ])
+        except Exception as e:
+            logger.error("Error indexing messages: %s", e)
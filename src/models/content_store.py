@@ -0,0 +1,75 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from utils.logger import get_logger
+
+logger = get_logger()
+
+CHUNK_SIZE = 1024 * 1024
+
+class ContentStore:
+    """Files stored once under their SHA-256: objects/<ab>/<digest><ext>.
+
+    put() hashes while it copies, so a file is read once; when the content is already stored
+    the copy is dropped and the existing object reused. Named views of an object (an upload
+    under its original name, a batch folder) are hard links, falling back to a copy on
+    filesystems without them.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # (path, size, mtime) -> digest, so re-uploading an unchanged file skips the copy entirely
+        self._known = {}
+        self._lock = threading.Lock()
+
+    def object_path(self, digest, extension=""):
+        return os.path.join(self.directory, digest[:2], f"{digest}{extension.lower()}")
+
+    def put(self, source_path):
+        """Store source_path; returns (digest, object_path, reused)"""
+        extension = os.path.splitext(source_path)[1]
+        stat = os.stat(source_path)
+        key = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._known.get(key)
+        if digest and os.path.exists(self.object_path(digest, extension)):
+            return digest, self.object_path(digest, extension), True
+
+        sha256 = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".incoming_")
+        try:
+            with open(source_path, "rb") as source, os.fdopen(fd, "wb") as target:
+                while chunk := source.read(CHUNK_SIZE):
+                    sha256.update(chunk)
+                    target.write(chunk)
+            digest = sha256.hexdigest()
+            path = self.object_path(digest, extension)
+            reused = os.path.exists(path)
+            if reused:
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            self._known[key] = digest
+        logger.debug("%s %s as %s", 'Reused' if reused else 'Stored', os.path.basename(source_path), digest[:12])
+        return digest, path, reused
+
+    def link(self, object_path, target_path):
+        """Make target_path name object_path's content; an existing link to the same object is kept"""
+        if os.path.exists(target_path):
+            if os.path.samefile(object_path, target_path):
+                return target_path
+            os.remove(target_path)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        try:
+            os.link(object_path, target_path)
+        except OSError:
+            shutil.copyfile(object_path, target_path)
+        return target_path
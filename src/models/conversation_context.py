@@ -0,0 +1,103 @@
+import json
+import logging
+import threading
+from utils.logger import get_logger
+from utils.tracing import tracer
+
+logger = get_logger()
+
+SUMMARY_META_KEY = "context_summary"
+ROLES = {"You": "user", "Agent": "assistant"}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) plus the per-message overhead"""
+    return len(text) // 4 + 4
+
+class ConversationContext:
+    """Builds the message list for a chat completion from the stored chat history.
+
+    Recent turns are sent verbatim while they fit in recent_token_budget. When they no longer
+    fit, the oldest ones are folded into a rolling summary until the verbatim tail is back to
+    half the budget, so the summarizer only runs every few turns. The summary and the id of the
+    last message it covers are cached in the history store and survive restarts.
+    """
+    def __init__(self, chat_model, summarizer, recent_token_budget=3000, summary_token_budget=400, max_history_messages=200):
+        self.chat_model = chat_model
+        self.summarizer = summarizer  # summarizer(previous_summary, transcript, max_tokens) -> str
+        self.recent_token_budget = recent_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.max_history_messages = max_history_messages
+        self._lock = threading.Lock()
+        self._summary = None
+
+    def _load_summary(self):
+        if self._summary is None:
+            stored = self.chat_model.history_store.get_meta(SUMMARY_META_KEY)
+            try:
+                self._summary = tuple(json.loads(stored)) if stored else ("", 0)
+            except (ValueError, TypeError):
+                logger.warning("Ignoring unreadable conversation summary")
+                self._summary = ("", 0)
+        return self._summary
+
+    def _store_summary(self, summary, upto_id):
+        self._summary = (summary, upto_id)
+        try:
+            self.chat_model.history_store.set_meta(SUMMARY_META_KEY, json.dumps([summary, upto_id]))
+        except Exception as e:
+            logger.error("Error storing conversation summary: %s", e)
+
+    @staticmethod
+    def _text(message):
+        return "\n".join(message["content"])
+
+    @classmethod
+    def _transcript(cls, messages):
+        return "\n".join(f"{message['sender']}: {cls._text(message)}" for message in messages)
+
+    def _fold(self, summary, messages):
+        """Fold messages into summary in one summarizer call. Normally less than half the budget
+        falls out of the window at a time; a long backlog (e.g. the first request after upgrading)
+        only contributes its newest recent_token_budget tokens."""
+        kept, kept_tokens = [], 0
+        for message in reversed(messages):
+            kept_tokens += estimate_tokens(self._text(message))
+            if kept and kept_tokens > self.recent_token_budget:
+                break
+            kept.append(message)
+        return self.summarizer(summary, self._transcript(reversed(kept)), self.summary_token_budget)
+
+    @tracer.traced("context.build_messages")
+    def build_messages(self, user_message):
+        with self._lock:
+            history = self.chat_model.get_messages(limit=self.max_history_messages)
+            # The current message is saved before the request is made
+            if history and history[-1]["sender"] == "You" and self._text(history[-1]) == user_message:
+                history = history[:-1]
+            summary, summary_upto = self._load_summary()
+            recent = [message for message in history if message["id"] > summary_upto]
+            recent_tokens = sum(estimate_tokens(self._text(message)) for message in recent)
+
+            if recent_tokens > self.recent_token_budget:
+                folded = []
+                while recent and recent_tokens > self.recent_token_budget // 2:
+                    message = recent.pop(0)
+                    recent_tokens -= estimate_tokens(self._text(message))
+                    folded.append(message)
+                try:
+                    summary = self._fold(summary, folded)
+                    self._store_summary(summary, folded[-1]["id"])
+                    logger.info("Folded %s messages into the conversation summary", len(folded))
+                except Exception as e:
+                    # Send the bounded tail without the new turns; the fold is retried on the next request
+                    logger.error("Error summarizing conversation: %s", e)
+
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        messages.extend({"role": ROLES.get(message["sender"], "system"), "content": self._text(message)} for message in recent)
+        messages.append({"role": "user", "content": user_message})
+        if logger.is_enabled_for(logging.DEBUG):
+            logger.debug("Conversation context: %s messages, about %s history tokens", len(messages), recent_tokens + estimate_tokens(summary))
+        return messages
+
@@ -1,44 +1,123 @@
+import hashlib
 import os
-from datetime import datetime
-import uuid
 import shutil
 from tkinter import filedialog, messagebox
+from .content_store import ContentStore
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
 
 logger = get_logger()
 
+FILE_TYPES = [
+    ("All files", "*.*"),
+    ("Text files", "*.txt"),
+    ("Image files", "*.png *.jpg *.jpeg *.gif"),
+    ("Document files", "*.pdf *.docx *.pptx")
+]
+BATCH_EXTENSIONS = (".pptx", ".pdf")
+
 class FileHandler:
+    """Uploads are stored once per content in a ContentStore and linked under their original
+    names: single files in uploads/<digest>/, multi-file and folder uploads as one batch
+    folder in batches/<batch id>/ that batch processing reads instead of scanning the
+    directory of the last uploaded file."""
     def __init__(self, storage_directory="files"):
         self.storage_directory = storage_directory
         os.makedirs(storage_directory, exist_ok=True)
+        self.content_store = ContentStore(os.path.join(storage_directory, "objects"))
         self.uploaded_file_path = ""
         self.downloaded_file_path = ""
-        logger.debug(f"Storage directory set to: {self.storage_directory}")
+        self.batch_directory = ""
+        self.batch_files = {}
+        logger.debug("Storage directory set to: %s", self.storage_directory)
     
     def upload_file(self):
         try:
-            filename = filedialog.askopenfilename(
-                title="Select a File",
-                filetypes=[
-                    ("All files", "*.*"),
-                    ("Text files", "*.txt"),
-                    ("Image files", "*.png *.jpg *.jpeg *.gif"),
-                    ("Document files", "*.pdf *.docx *.pptx")
-                ]
-            )
+            filename = filedialog.askopenfilename(title="Select a File", filetypes=FILE_TYPES)
             if filename:
-                file_name = os.path.basename(filename)
-                timestamp = datetime.now().strftime("%d%m%Y_%H%M%S")
-                unique_id = str(uuid.uuid4())[:5]
-                new_filename = os.path.join(self.storage_directory, f"{timestamp}_{unique_id}_{file_name}")
-                shutil.copy2(filename, new_filename)
-                self.uploaded_file_path = new_filename
-                return file_name, new_filename
+                return os.path.basename(filename), self.store_file(filename)
             return None, None
         
         except Exception as e:
             messagebox.showerror("Upload Error", str(e))
             return None, None
+
+    def upload_files(self):
+        """Select one or more files: one becomes the uploaded file, several a batch. Returns the stored {name: path}"""
+        try:
+            filenames = filedialog.askopenfilenames(title="Select Files", filetypes=FILE_TYPES)
+            if len(filenames) == 1:
+                return {os.path.basename(filenames[0]): self.store_file(filenames[0])}
+            return self.register_batch(filenames) if filenames else {}
+        except Exception as e:
+            messagebox.showerror("Upload Error", str(e))
+            return {}
+
+    def upload_folder(self):
+        """Register every CV and listing PDF of a folder as a batch"""
+        try:
+            directory = filedialog.askdirectory(title="Select a Folder")
+            if not directory:
+                return {}
+            filenames = [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                         if name.lower().endswith(BATCH_EXTENSIONS) and os.path.isfile(os.path.join(directory, name))]
+            if not filenames:
+                messagebox.showerror("Upload Error", "The folder contains no .pptx or .pdf files.")
+                return {}
+            return self.register_batch(filenames)
+        except Exception as e:
+            messagebox.showerror("Upload Error", str(e))
+            return {}
+
+    @tracer.traced("file.store")
+    def store_file(self, source_path):
+        """Store one file and make it the uploaded file; uploading the same content again reuses it"""
+        digest, object_path, reused = self.content_store.put(source_path)
+        target = os.path.join(self.storage_directory, "uploads", digest[:16], os.path.basename(source_path))
+        self.uploaded_file_path = self.content_store.link(object_path, target)
+        self.reset_batch()
+        metrics.increment("uploads_reused" if reused else "uploads_stored")
+        return self.uploaded_file_path
+
+    @tracer.traced("file.register_batch")
+    def register_batch(self, source_paths):
+        """Store several files and link them into one batch folder; returns {name: path} of the batch"""
+        stored = []
+        for source_path in source_paths:
+            digest, object_path, reused = self.content_store.put(source_path)
+            metrics.increment("uploads_reused" if reused else "uploads_stored")
+            stored.append((os.path.basename(source_path), digest, object_path))
+        # The same selection always maps to the same batch folder
+        batch_id = hashlib.sha256("\n".join(sorted({f"{digest}:{name}" for name, digest, _ in stored})).encode()).hexdigest()[:16]
+        batch_directory = os.path.join(self.storage_directory, "batches", batch_id)
+        batch_files, digests = {}, {}
+        for name, digest, object_path in stored:
+            if digests.get(name) == digest:
+                continue
+            if name in batch_files:
+                stem, extension = os.path.splitext(name)
+                name = f"{stem}_{digest[:8]}{extension}"
+            digests[name] = digest
+            batch_files[name] = self.content_store.link(object_path, os.path.join(batch_directory, name))
+        self.batch_directory, self.batch_files = batch_directory, batch_files
+        self.uploaded_file_path = ""
+        logger.info("Registered batch %s of %s files", batch_id, len(batch_files))
+        return dict(batch_files)
+
+    def batch_source(self):
+        """(directory, cv_files) for batch processing: the registered batch, else the uploaded file's directory
+        with cv_files None so it is scanned; (None, None) when nothing was uploaded"""
+        if self.batch_files:
+            return self.batch_directory, {name: path for name, path in self.batch_files.items()
+                                          if name.endswith(".pptx") and not name.startswith("corrected_")}
+        if self.uploaded_file_path:
+            return os.path.dirname(self.uploaded_file_path), None
+        return None, None
+
+    def reset_batch(self):
+        self.batch_directory = ""
+        self.batch_files = {}
    
     def download_file(self, source_file_path):
         try:
@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class FrameDeduplicator:
+    """Correct each distinct text frame once and fan the result back out to every occurrence.
+    The corrections are shared, keeping the max_entries most recently used; the frame counts are
+    returned per call, so concurrent batches each count their own."""
+    _whitespace = re.compile(r"\s+")
+
+    def __init__(self, corrector, acorrector=None, max_entries=10000):
+        self.corrector = corrector
+        self.acorrector = acorrector  # coroutine version used by acorrect_all
+        self.max_entries = max_entries
+        self._corrections = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        return cls._whitespace.sub(" ", text).strip()
+
+    @classmethod
+    def frame_key(cls, text: str) -> str:
+        return hashlib.sha1(cls.normalize(text).encode("utf-8")).hexdigest()
+
+    def correct(self, text: str) -> str:
+        return self.correct_all([text])[0][0]
+
+    def _pending(self, frames: list):
+        """Split frames into corrections already known, taken now so eviction cannot lose them, and frames to correct"""
+        keys = [self.frame_key(frame) for frame in frames]
+        known, pending = {}, {}
+        with self._lock:
+            for key, frame in zip(keys, frames):
+                if key in known or key in pending:
+                    continue
+                if key in self._corrections:
+                    self._corrections.move_to_end(key)
+                    known[key] = self._corrections[key]
+                else:
+                    pending[key] = frame
+        return keys, known, pending
+
+    @staticmethod
+    def _stats(frames: list, pending: dict) -> dict:
+        return {"total_frames": len(frames), "unique_frames": len(pending), "corrections_saved": len(frames) - len(pending)}
+
+    def _remember(self, corrections: dict):
+        with self._lock:
+            for key, corrected in corrections.items():
+                self._corrections[key] = corrected
+                self._corrections.move_to_end(key)
+            while len(self._corrections) > self.max_entries:
+                self._corrections.popitem(last=False)
+
+    def correct_all(self, frames: list):
+        """Returns (corrected frames, this call's frame counts)"""
+        keys, known, pending = self._pending(frames)
+        for key, frame in pending.items():
+            known[key] = self.corrector(frame)
+            self._remember({key: known[key]})
+        return [known[key] for key in keys], self._stats(frames, pending)
+
+    async def acorrect_all(self, frames: list):
+        """correct_all with the unique frames corrected concurrently"""
+        keys, known, pending = self._pending(frames)
+        corrections = dict(zip(pending, await asyncio.gather(*(self.acorrector(frame) for frame in pending.values()))))
+        self._remember(corrections)
+        known.update(corrections)
+        return [known[key] for key in keys], self._stats(frames, pending)
+
+    def clear(self):
+        with self._lock:
+            self._corrections.clear()
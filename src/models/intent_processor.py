@@ -1,9 +1,11 @@
+import asyncio
 import os
 from datetime import datetime
-from models.chat_model import ChatModel
-from models.llm_handler import LLMHandler
+from .chat_model import ChatModel
+from .llm_handler import LLMHandler
 from utils.logger import get_logger
-from utils.helpers import create_file, extract_tables
+from utils.helpers import create_file
+from utils.tracing import tracer
 
 logger = get_logger()
 
@@ -25,6 +27,7 @@ class IntentProcessor:
             "analyze table": self._handle_table_analysis
         }
     
+    @tracer.traced("intent.process")
     async def process_intent(self, user_message):
         user_message_lower = user_message.lower()
         for keyword, handler in self.intent_handlers.items():
@@ -34,7 +37,7 @@ class IntentProcessor:
     
     async def _handle_listing_creation(self, user_message_lower):
         listing_type = "highly experienced (senior)" if any(term in user_message_lower for term in ["senior", "experienced"]) else "generic"
-        return self.llm_handler.create_listing(listing_type)
+        return await self.llm_handler.acreate_listing(listing_type)
     
     async def _handle_cv_review(self, *args):
         uploaded_file = self.chat_model.file_handler.get_uploaded_file_path()
@@ -42,40 +45,40 @@ class IntentProcessor:
             return "Please upload a CV file first."
         
         try:
-            cv_text = self.llm_handler.extract_text_from_pptx(uploaded_file)
-            listing = self.llm_handler.create_listing("generic")
-            result = self.llm_handler.review_cv(cv_text, listing)
+            cv_text, doc_stats = await self.llm_handler.aextract_text_and_stats(uploaded_file)
+            listing = await self.llm_handler.acreate_listing("generic")
+            result = await self.llm_handler.areview_cv(cv_text, listing)
             self.chat_model.file_handler.reset_uploaded_file_path()
-            return result
+            return result + self.llm_handler._format_document_stats(doc_stats)
         except Exception as e:
-            logger.error(f"Error processing CV: {str(e)}")
+            logger.error("Error processing CV: %s", e)
             return f"Error processing the CV: {str(e)}"
     
     async def _handle_batch_processing(self, *args):
-        uploaded_file = self.chat_model.file_handler.get_uploaded_file_path()
-        if not uploaded_file:
+        directory, cv_files = self.chat_model.file_handler.batch_source()
+        if not directory:
             return "Please upload at least one CV file first."
             
-        directory = os.path.dirname(uploaded_file)
         try:
-            results, listings = self.llm_handler.process_cv_batch(directory)
-            return self._save_batch_results(results)
+            results, listings, stats = await self.llm_handler.aprocess_cv_batch(directory, cv_files=cv_files)
+            return await asyncio.to_thread(self._save_batch_results, results, stats)
         except Exception as e:
-            logger.error(f"Error in batch processing: {str(e)}")
+            logger.error("Error in batch processing: %s", e)
             return f"Error in batch processing: {str(e)}"
     
-    def _save_batch_results(self, results):
+    def _save_batch_results(self, results, stats):
         result_text = "Batch Processing Results:\n\n"
         for cv_id, cv_results in results.items():
             result_text += f"## {cv_id}\n"
             for listing_name, review in cv_results.items():
                 result_text += f"- {listing_name}: {review}\n"
             result_text += "\n"
+        result_text += self.llm_handler._format_batch_stats(stats)
         
         download_dir = self.chat_model.file_handler.storage_directory+os.sep+"downloads"
         os.makedirs(download_dir, exist_ok=True)
         result_file = os.path.join(download_dir, f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-        with open(result_file, "w") as f:
+        with tracer.span("file.write_batch_results"), open(result_file, "w") as f:
             f.write(result_text)
         
         return f"Batch processing completed. Results saved to {os.path.basename(result_file)}"
@@ -86,15 +89,15 @@ class IntentProcessor:
             return "Please upload a CV file first."
             
         try:
-            cv_text = self.llm_handler.extract_text_from_pptx(uploaded_file)
-            result = self.llm_handler.spelling_and_grammar_check(cv_text)
-            created = create_file(f"outputs/gen_{uploaded_file}", result)
+            cv_text, doc_stats = await self.llm_handler.aextract_text_and_stats(uploaded_file)
+            result = await self.llm_handler.aspelling_and_grammar_check(cv_text)
+            created = await asyncio.to_thread(create_file, f"outputs/gen_{uploaded_file}", result)
             if created:
                 self.chat_model.download_file(f"outputs/gen_{uploaded_file}")
             self.chat_model.file_handler.reset_uploaded_file_path()
-            return result
+            return result + self.llm_handler._format_document_stats(doc_stats)
         except Exception as e:
-            logger.error(f"Error processing CV: {str(e)}")
+            logger.error("Error processing CV: %s", e)
             return f"Error processing the CV: {str(e)}"
     
     async def _handle_table_analysis(self, *args):
@@ -103,15 +106,15 @@ class IntentProcessor:
             return "Please upload a PDF file containing tables first."
             
         try:
-            tables = extract_tables(uploaded_file)
+            tables = await self.llm_handler.aextract_pdf_tables(uploaded_file)
             if not tables:
                 return "No tables found in the uploaded PDF."
                 
-            analysis = self.llm_handler.table_analysis(tables)
+            analysis = await self.llm_handler.atable_analysis(tables)
             return analysis
         except Exception as e:
-            logger.error(f"Error analyzing tables: {str(e)}")
+            logger.error("Error analyzing tables: %s", e)
             return f"Error analyzing tables: {str(e)}"
     
     async def _handle_general_response(self, user_message):
-        return self.llm_handler.response(user_message)
\ No newline at end of file
+        return await self.llm_handler.achat(user_message)
\ No newline at end of file
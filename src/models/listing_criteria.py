@@ -0,0 +1,158 @@
+import functools
+import json
+import os
+import re
+import pandas as pd
+from utils.helpers import get_resource_path
+from utils.logger import get_logger
+
+logger = get_logger()
+
+SYNONYMS_PATH = os.path.join("resources", "dictionaries", "skill_synonyms.json")
+_MUST_HEADER = re.compile(r"\b(must|required|requirements?|mandatory)\b", re.IGNORECASE)
+_SHOULD_HEADER = re.compile(r"\b(should|nice[ -]to[ -]have|preferred|bonus|plus|desirable)\b", re.IGNORECASE)
+_YEARS = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*•·]|\d+[.)])\s*")
+
+@functools.lru_cache(maxsize=1)
+def _synonyms() -> dict:
+    """{"hard": {skill: aliases}, "soft": {skill: aliases}} from the synonyms file"""
+    path = get_resource_path(SYNONYMS_PATH)
+    try:
+        with open(path, encoding="utf-8") as f:
+            synonyms = json.load(f)
+        return {"hard": dict(synonyms.get("hard", {})), "soft": dict(synonyms.get("soft", {}))}
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning("Skill synonyms not loaded from %s, criteria pre-screen disabled: %s", path, e)
+        return {"hard": {}, "soft": {}}
+
+@functools.lru_cache(maxsize=1)
+def skill_patterns() -> dict:
+    """Skill name -> regex matching any of its synonyms as a whole word"""
+    synonyms = _synonyms()
+    return {
+        skill: r"(?<!\w)(?:" + "|".join(re.escape(alias.lower()) for alias in sorted(aliases, key=len, reverse=True)) + r")(?!\w)"
+        for skill, aliases in {**synonyms["hard"], **synonyms["soft"]}.items()
+    }
+
+def hard_skills() -> frozenset:
+    """Technical skills a CV names when it has them. Soft entries (languages, degrees, ways of
+    working) are often implied rather than written, so they only ever add to the score."""
+    return frozenset(_synonyms()["hard"])
+
+class Criterion:
+    """One listing line: the skills it names, the years it asks for and whether any skill will do"""
+    def __init__(self, text, required, skills, min_years=None, any_of=False, hard_skills=()):
+        self.text = text
+        self.required = required
+        self.skills = skills
+        self.min_years = min_years
+        self.any_of = any_of
+        self.hard_skills = [skill for skill in skills if skill in hard_skills]
+
+    @property
+    def checkable(self):
+        return bool(self.skills)
+
+    @property
+    def can_deny(self):
+        """A must line denies only on hard skills; with "or" a soft alternative may be the one the candidate has"""
+        if not self.required or not self.hard_skills:
+            return False
+        return not self.any_of or len(self.hard_skills) == len(self.skills)
+
+class ListingCriteria:
+    """A listing compiled into machine-checkable 'must' and 'should' criteria.
+
+    Only must criteria naming hard skills can deny a CV without an LLM review, and only on those
+    skills. Soft entries, lines the compiler does not understand and years of experience only
+    count towards the score: CVs state experience as date ranges more often than as "N years",
+    so "5+ years Python" denies a CV without Python but never one short of five years.
+    """
+    def __init__(self, criteria):
+        self.criteria = criteria
+
+    @property
+    def skills(self):
+        return sorted({skill for criterion in self.criteria for skill in criterion.skills})
+
+    @classmethod
+    def compile(cls, listing_text: str) -> "ListingCriteria":
+        patterns = skill_patterns()
+        hard = hard_skills()
+        criteria, required = [], None
+        for line in listing_text.splitlines():
+            text = _BULLET.sub("", line).strip(" *_#\t")
+            if not text:
+                continue
+            # "Must:" / "Should have:" headers switch the section; text after the colon is a criterion too
+            head, _, rest = text.partition(":")
+            if len(head) <= 40 and (_MUST_HEADER.search(head) or _SHOULD_HEADER.search(head)):
+                required = bool(_MUST_HEADER.search(head)) and not _SHOULD_HEADER.search(head)
+                text = rest.strip()
+                if not text:
+                    continue
+            if required is None:
+                continue
+            lowered = text.lower()
+            skills = [skill for skill, pattern in patterns.items() if re.search(pattern, lowered)]
+            years = _YEARS.search(text)
+            criteria.append(Criterion(text, required, skills, int(years.group(1)) if years else None,
+                                      any_of=" or " in lowered or "/" in lowered.replace("ci/cd", ""), hard_skills=hard))
+        return cls(criteria)
+
+    def screen(self, cv_texts: dict) -> dict:
+        """Check every CV against the criteria in one vectorized pass per skill. The hard skills of
+        must criteria decide auto_denied; every criterion, with its years of experience, adds to the score.
+
+        Returns {cv_name: {"auto_denied", "must_missing", "must_met", "should_met", "score", "years"}}.
+        """
+        names = list(cv_texts)
+        if not names:
+            return {}
+        texts = pd.Series([cv_texts[name] for name in names], index=names, dtype="object").str.lower()
+        patterns = skill_patterns()
+        hits = pd.DataFrame({skill: texts.str.contains(patterns[skill], regex=True) for skill in self.skills}, index=names)
+        years = texts.str.extractall(_YEARS)[0].astype(int).groupby(level=0).max().reindex(names, fill_value=0)
+
+        def skills_met(skills, any_of):
+            columns = hits[skills]
+            return columns.any(axis=1) if any_of else columns.all(axis=1)
+
+        met, deny_met = {}, {}
+        for index, criterion in enumerate(self.criteria):
+            if not criterion.checkable and not criterion.min_years:
+                continue
+            met[index] = pd.Series(True, index=names)
+            if criterion.checkable:
+                met[index] &= skills_met(criterion.skills, criterion.any_of)
+            if criterion.min_years:
+                met[index] &= years >= criterion.min_years
+            if criterion.can_deny:
+                deny_met[index] = skills_met(criterion.hard_skills, criterion.any_of)
+        met = pd.DataFrame(met, index=names, dtype=bool)
+
+        must = [index for index in met.columns if self.criteria[index].required]
+        should = [index for index in met.columns if index not in must]
+        must_failed = ~pd.DataFrame(deny_met, index=names, dtype=bool)
+        # An empty text means extraction found nothing, not that the candidate lacks the skills
+        auto_denied = (must_failed.any(axis=1) if deny_met else pd.Series(False, index=names)) & (texts.str.strip() != "")
+        score = (met[must].sum(axis=1) if must else 0) + 0.5 * (met[should].sum(axis=1) if should else 0)
+        score = pd.Series(score, index=names)
+
+        return {
+            name: {
+                "auto_denied": bool(auto_denied[name]),
+                "must_missing": [self.criteria[index].text for index in deny_met if must_failed.at[name, index]],
+                "must_met": f"{int(met.loc[name, must].sum()) if must else 0}/{len(must)}",
+                "should_met": [self.criteria[index].text for index in should if met.at[name, index]],
+                "score": float(score[name]),
+                "years": int(years[name]),
+            }
+            for name in names
+        }
+
+@functools.lru_cache(maxsize=64)
+def compile_listing(listing_text: str) -> ListingCriteria:
+    """Compiled once per distinct listing text"""
+    return ListingCriteria.compile(listing_text)
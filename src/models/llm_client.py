@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from openai import AsyncOpenAI
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger()
+
+class _ClientGeneration:
+    def __init__(self, client, base_url):
+        self.client = client
+        self.base_url = base_url
+        self.in_flight = 0
+        self.retired = False
+
+class ReconfigurableClient:
+    """Holds the AsyncOpenAI client and swaps it when the endpoint or key changes.
+
+    Clients (and their connection pools) belong to one event loop, the LLM loop passed in;
+    every request made through acquire() must run on it.
+
+    A replacement is built and pre-warmed on a background thread (debounced, so typing a URL
+    does not build a client per keystroke) and only then becomes current. Calls that already
+    acquired the old client keep using it; it is closed when the last of them finishes.
+    """
+    def __init__(self, base_url, api_key, loop, reconfigure_delay=1.0, warmup_timeout=10):
+        self.loop = loop
+        self.reconfigure_delay = reconfigure_delay
+        self.warmup_timeout = warmup_timeout
+        self._lock = threading.Lock()
+        self._current = _ClientGeneration(AsyncOpenAI(base_url=base_url, api_key=api_key), base_url)
+        self._timer = None
+        self._requested = (base_url, api_key)
+
+    @property
+    def client(self):
+        return self._current.client
+
+    @asynccontextmanager
+    async def acquire(self):
+        """The current client, kept open until the block (including reading a stream) ends"""
+        with self._lock:
+            generation = self._current
+            generation.in_flight += 1
+        try:
+            with metrics.track("llm_requests_in_flight"):
+                yield generation.client
+        finally:
+            with self._lock:
+                generation.in_flight -= 1
+                close = generation.retired and generation.in_flight == 0
+            if close:
+                self._close(generation)
+
+    def reconfigure(self, base_url, api_key):
+        with self._lock:
+            self._requested = (base_url, api_key)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.reconfigure_delay, self._build, args=(base_url, api_key))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _build(self, base_url, api_key):
+        try:
+            client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+        except Exception as e:
+            logger.error("Could not create LLM client for %s: %s", base_url, e)
+            return
+        try:
+            # Opens the connection (DNS, TLS) before the first real request needs it
+            asyncio.run_coroutine_threadsafe(self._warm_up(client), self.loop).result()
+            logger.info("LLM client for %s is ready", base_url)
+        except Exception as e:
+            logger.warning("LLM client warm-up for %s failed, switching anyway: %s", base_url, e)
+        with self._lock:
+            if self._requested != (base_url, api_key):
+                stale, previous = True, None  # a newer configuration arrived while warming up
+            else:
+                stale, previous = False, self._current
+                self._current = _ClientGeneration(client, base_url)
+                previous.retired = True
+                self._timer = None
+            close_previous = previous is not None and previous.in_flight == 0
+        if stale:
+            self._close(_ClientGeneration(client, base_url))
+            return
+        logger.info("Switched LLM endpoint from %s to %s, %s calls draining on the old client", previous.base_url, base_url, previous.in_flight)
+        if close_previous:
+            self._close(previous)
+
+    async def _warm_up(self, client):
+        await client.with_options(timeout=self.warmup_timeout, max_retries=0).models.list()
+
+    def _close(self, generation):
+        """Close the client on the LLM loop; returns the concurrent future of the close"""
+        async def close():
+            try:
+                await generation.client.close()
+                logger.debug("Closed LLM client for %s", generation.base_url)
+            except Exception as e:
+                logger.error("Error closing LLM client: %s", e)
+        return asyncio.run_coroutine_threadsafe(close(), self.loop)
+
+    def close(self, timeout=5):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            generation = self._current
+            generation.retired = True
+            close = generation.in_flight == 0
+        if close:
+            try:
+                self._close(generation).result(timeout)
+            except Exception as e:
+                logger.error("Error closing LLM client: %s", e)
@@ -1,65 +1,108 @@
-import datetime
+from datetime import datetime
 import os
 import asyncio
 import threading
-from openai import OpenAI
-from pptx import Presentation
+import time
 from .file_handler import FileHandler
+from .frame_deduplicator import FrameDeduplicator
+from .batch_progress import BatchProgress
+from .listing_criteria import compile_listing
+from .llm_client import ReconfigurableClient
+from .spell_prepass import SpellPrepass
+from .speculative_preprocessor import SpeculativePreprocessor
 from utils.logger import get_logger
+from utils.tracing import tracer
+from utils.cancellation import DeadlineExceeded, OperationCancelled, check_cancelled, current_token
 from utils.helpers import create_file, extract_tables, get_resource_path
+from utils.pptx_reader import read_pptx_frames
 from config import ConfigManager
 
 logger = get_logger()
 
 class LLMHandler:
+    REQUEST_PARAMETERS = ('model', 'temperature', 'top_p', 'max_tokens', 'stream')
+
     def __init__(self, config_manager: ConfigManager):
         logger.debug("Initializing LLMHandler")
         self.config_manager = config_manager
         
         # Initialize API configuration
-        api_config = {
-            'base_url': self.config_manager.get('api_config', 'base_url'),
-            'api_key': self.config_manager.get('api_config', 'api_key'),
-            'model': self.config_manager.get('api_config', 'model'),
-            'temperature': self.config_manager.get('api_config', 'temperature'),
-            'top_p': self.config_manager.get('api_config', 'top_p'),
-            'max_tokens': self.config_manager.get('api_config', 'max_tokens'),
-            'stream': self.config_manager.get('api_config', 'stream')
-        }
+        api_config = self.config_manager.get('api_config')
         
         # Store API parameters
-        for key, value in api_config.items():
-            setattr(self, key, value)
+        for key in ('base_url', 'api_key') + self.REQUEST_PARAMETERS:
+            setattr(self, key, api_config.get(key))
+        self.config_manager.subscribe(self._on_api_config_changed, section='api_config')
             
-        # Initialize OpenAI client
-        self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+        # Completions run on a dedicated event loop that owns the AsyncOpenAI client and its connections;
+        # async callers on other loops hop onto it per request, sync callers block on it
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name="LLMEventLoop", daemon=True)
+        self._loop_thread.start()
+        self._llm_slots = asyncio.Semaphore(self.config_manager.get('processing', 'max_concurrent_llm_calls') or 4)
+        
+        # Initialize OpenAI client; endpoint or key changes swap it without a restart
+        self.clients = ReconfigurableClient(self.base_url, self.api_key, self.loop)
+
+        # Template boilerplate (headers, taglines, footers) is corrected once per unique frame
+        self.frame_deduplicator = FrameDeduplicator(self.spelling_and_grammar_check, self.aspelling_and_grammar_check,
+                                                    max_entries=self.config_manager.get('processing', 'max_cached_corrections') or 10000)
+        self.batch_results_listeners = []
+        self.batch_progress_listeners = []
+        
+        # Frames without likely spelling errors skip the LLM; the dictionary index is built in the background
+        self.spell_prepass = SpellPrepass()
+        threading.Thread(target=lambda: self.spell_prepass.available, daemon=True).start()
+
+        # Uploads are extracted (and corrected) in the background before the user asks for anything
+        self.speculation = SpeculativePreprocessor(self)
+        
+        # Set by the chat controller so general messages are answered with the conversation so far
+        self.conversation_context = None
         
         # Log configuration (excluding sensitive data)
-        logger.debug(f"Model: {self.model} Temperature: {self.temperature} Top P: {self.top_p} Max Tokens: {self.max_tokens} Stream: {self.stream}")
+        logger.debug("Model: %s Temperature: %s Top P: %s Max Tokens: %s Stream: %s", self.model, self.temperature, self.top_p, self.max_tokens, self.stream)
+
+    @property
+    def client(self):
+        return self.clients.client
+
+    def _on_api_config_changed(self, changes):
+        # Request parameters are read per call, so they apply from the next request on
+        changed = changes['api_config']
+        for key, value in changed.items():
+            if key in self.REQUEST_PARAMETERS:
+                setattr(self, key, value)
+        if 'base_url' in changed or 'api_key' in changed:
+            self.base_url = changed.get('base_url', self.base_url)
+            self.api_key = changed.get('api_key', self.api_key)
+            self.clients.reconfigure(self.base_url, self.api_key)
+        if changed.keys() & {'base_url', 'api_key', 'model'}:
+            # Corrections from another client or model are not reused, neither cached nor prepared ahead
+            self.frame_deduplicator.clear()
+            self.speculation.invalidate()
+        logger.debug("Model: %s Temperature: %s Top P: %s Max Tokens: %s Stream: %s", self.model, self.temperature, self.top_p, self.max_tokens, self.stream)
+
+    def close(self):
+        self.speculation.cancel()
+        self.clients.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _run(self, coro):
+        """Sync API: run coro on the LLM loop and wait for its result"""
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("Blocking LLMHandler call made on the LLM event loop; await the async method instead")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
 
     async def _call_api(self, prompt, messages=None,role="user"):
         if messages is None:
             messages = [{"role": role, "content": prompt}]
             
         try:
-            completion = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=messages,
-                temperature=self.temperature,
-                top_p=self.top_p,
-                max_tokens=self.max_tokens,
-                stream=self.stream
-            )
-            
-            response = ""
-            for chunk in completion:
-                if chunk.choices[0].delta.content is not None:
-                    response += chunk.choices[0].delta.content
-
-            return response
+            return await self._acomplete(messages)
         except Exception as e:
-            logger.error(f"Error calling API: {str(e)}")
+            logger.error("Error calling API: %s", e)
             raise
 
     async def fetch_intent_prompt(self):
@@ -71,7 +114,7 @@ class LLMHandler:
                     content = await asyncio.to_thread(file.read)
                     return content
         except Exception as e:
-            logger.error(f"Error reading intent prompt: {str(e)}")
+            logger.error("Error reading intent prompt: %s", e)
             raise
 
     async def init_prompt(self):
@@ -82,46 +125,163 @@ class LLMHandler:
             response = await self._call_api(intent_prompt)
             return response
         except Exception as e:
-            logger.error(f"Error initializing prompt: {str(e)}")
+            logger.error("Error initializing prompt: %s", e)
             raise
 
     def run_init_prompt(self):
-        loop = asyncio.new_event_loop()
-        threading.Thread(target=lambda: loop.run_until_complete(self.init_prompt()), daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.init_prompt(), self.loop)
 
     def response(self, text):
-        logger.info(f"Calling LLM endpoint {self.base_url}")
-        logger.debug(f"Requesting completion for text: {text}")
-        
-        # Create synchronous version for backward compatibility
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": text}],
-            temperature=self.temperature,
-            top_p=self.top_p,
-            max_tokens=self.max_tokens,
-            stream=self.stream
-        )
-        
-        response = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content is not None:
-                response += chunk.choices[0].delta.content
+        return self._run(self.aresponse(text))
+
+    async def aresponse(self, text):
+        logger.debug("Requesting completion for text: %s", text)
+        return await self._acomplete([{"role": "user", "content": text}])
+
+    def _complete(self, messages, max_tokens=None):
+        return self._run(self._acomplete(messages, max_tokens))
+
+    async def _acomplete(self, messages, max_tokens=None):
+        # One consistent set of parameters per request, even if the settings change mid-call
+        parameters = {key: getattr(self, key) for key in self.REQUEST_PARAMETERS}
+        if max_tokens:
+            parameters['max_tokens'] = max_tokens
+        check_cancelled()
+        if asyncio.get_running_loop() is self.loop:
+            return await self._request(messages, parameters)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._request(messages, parameters), self.loop))
+
+    async def _request(self, messages, parameters):
+        """Runs on the LLM loop, at most max_concurrent_llm_calls at a time"""
+        async with self._llm_slots:
+            # Each call is bounded by its own timeout and by what is left of the request's deadline
+            token = current_token()
+            check_cancelled()
+            call_timeout = self.config_manager.get('processing', 'llm_call_timeout_s')
+            timeout = token.remaining(call_timeout) if token else call_timeout
+            
+            start = time.perf_counter()
+            with tracer.span("llm.completion", model=parameters['model'], messages=len(messages)):
+                request = asyncio.ensure_future(self._read_completion(messages, parameters, timeout))
+                if token is None:
+                    response = await request
+                else:
+                    # Stop or the deadline cancels the HTTP request (or closes the stream) right away,
+                    # without waiting for the client's retries
+                    deadline = self.loop.call_later(token.remaining(), request.cancel, "deadline") if token.deadline else None
+                    with token.on_cancel(lambda: self.loop.call_soon_threadsafe(request.cancel)):
+                        try:
+                            response = await request
+                        except asyncio.CancelledError as e:
+                            token.check()
+                            if e.args == ("deadline",):
+                                raise DeadlineExceeded(f"{token.name} exceeded its {token.timeout}s deadline")
+                            raise
+                        except Exception:
+                            check_cancelled()
+                            raise
+                        finally:
+                            if deadline:
+                                deadline.cancel()
                 
-        logger.debug(f"Received response: {response}")
+        logger.info("LLM completion finished", operation="llm_completion", model=parameters['model'],
+                    duration_ms=round((time.perf_counter() - start) * 1000), response_chars=len(response))
+        logger.debug("Received response: %s", response)
         return response
 
+    async def astream(self, messages, max_tokens=None):
+        """Yield the completion in pieces as they arrive. Streaming needs the LLM loop (server mode);
+        elsewhere the whole answer is yielded at once."""
+        if asyncio.get_running_loop() is not self.loop:
+            yield await self._acomplete(messages, max_tokens)
+            return
+        parameters = {key: getattr(self, key) for key in self.REQUEST_PARAMETERS}
+        parameters['stream'] = True
+        if max_tokens:
+            parameters['max_tokens'] = max_tokens
+        token = current_token()
+        call_timeout = self.config_manager.get('processing', 'llm_call_timeout_s')
+        start, response_chars = time.perf_counter(), 0
+        async with self._llm_slots, self.clients.acquire() as client:
+            check_cancelled()
+            completion = await client.chat.completions.create(messages=messages, timeout=token.remaining(call_timeout) if token else call_timeout, **parameters)
+            async with completion:
+                async for chunk in completion:
+                    check_cancelled()
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        response_chars += len(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+        logger.info("LLM completion finished", operation="llm_stream", model=parameters['model'],
+                    duration_ms=round((time.perf_counter() - start) * 1000), response_chars=response_chars)
+
+    async def _read_completion(self, messages, parameters, timeout):
+        async with self.clients.acquire() as client:
+            logger.debug("Calling LLM endpoint %s", client.base_url, sample=10)
+            completion = await client.chat.completions.create(messages=messages, timeout=timeout, **parameters)
+            
+            if not parameters['stream']:
+                return completion.choices[0].message.content or ""
+            response = ""
+            async with completion:
+                async for chunk in completion:
+                    if chunk.choices and chunk.choices[0].delta.content is not None:
+                        response += chunk.choices[0].delta.content
+            return response
+
+    def set_conversation_context(self, conversation_context):
+        self.conversation_context = conversation_context
+
+    def chat(self, user_message):
+        return self._run(self.achat(user_message))
+
+    @tracer.traced("llm.chat")
+    async def achat(self, user_message):
+        """Answer user_message with the recent conversation and the rolling summary of older turns"""
+        if self.conversation_context is None:
+            return await self.aresponse(user_message)
+        try:
+            # Reads the history and may summarize it through the sync API, so it runs in a worker thread
+            messages = await asyncio.to_thread(self.conversation_context.build_messages, user_message)
+        except Exception as e:
+            logger.error("Error building conversation context, sending the message alone: %s", e)
+            return await self.aresponse(user_message)
+        return await self._acomplete(messages)
+
+    @tracer.traced("llm.summarize_conversation")
+    def summarize_conversation(self, summary, transcript, max_tokens):
+        logger.debug("Updating conversation summary")
+        
+        prompt = """
+            You maintain a running summary of a conversation between a recruiter and the DESH assistant.
+            Current summary:
+            ---{}---
+            New conversation turns:
+            ---{}---
+            Return the updated summary in less than {} words. Keep candidate names, listings, decisions and
+            open questions; drop small talk. Return ONLY the summary.
+        """.format(summary or "(empty)", transcript, int(max_tokens * 0.75))
+        
+        return self._complete([{"role": "user", "content": prompt}], max_tokens=max_tokens).strip()
+
     def create_listing(self, listing_type):
-        logger.info(f"Creating {listing_type} listing")
+        return self._run(self.acreate_listing(listing_type))
+
+    @tracer.traced("llm.create_listing")
+    async def acreate_listing(self, listing_type):
+        logger.info("Creating %s listing", listing_type)
         
         prompt = """
             Create a request listing for a {} data engineer. The list must have 
             'must' and 'should' criteria. Make the listing 500 characters or less.
         """.format(listing_type)
         
-        return self.response(prompt)
+        return await self.aresponse(prompt)
 
     def review_cv(self, cv_text, listing):
+        return self._run(self.areview_cv(cv_text, listing))
+
+    @tracer.traced("llm.review_cv")
+    async def areview_cv(self, cv_text, listing):
         logger.info("Reviewing CV against listing")
         
         # Handle both string and list input for cv_text
@@ -139,33 +299,138 @@ class LLMHandler:
             3. Explain your decision with less than 100 characters.
         """.format(cv_text, listing)
         
-        return self.response(prompt)
+        return await self.aresponse(prompt)
     
-    def process_cv_batch(self, cv_files_directory, listings=None):
-        logger.info(f"Processing CV batch from {cv_files_directory}")
-        results = {}
+    def process_cv_batch(self, cv_files_directory, listings=None, progress_callback=None, cv_files=None):
+        return self._run(self.aprocess_cv_batch(cv_files_directory, listings, progress_callback, cv_files))
+    
+    @tracer.traced("llm.process_cv_batch")
+    async def aprocess_cv_batch(self, cv_files_directory, listings=None, progress_callback=None, cv_files=None):
+        """Returns (results, listings, stats) with this batch's frame and pre-screen stats.
+        progress_callback(event) receives this batch's progress in addition to the registered listeners.
+        cv_files ({name: path}) restricts the batch to those files, e.g. one shard of a queued job."""
+        logger.info("Processing CV batch from %s", cv_files_directory)
         
         # Get CV files
-        cv_files = self._get_cv_files(cv_files_directory)
+        if cv_files is None:
+            cv_files = await asyncio.to_thread(self._get_cv_files, cv_files_directory)
         if not cv_files:
             logger.warning("No valid CV files found in directory")
             raise ValueError("No valid CV files found in directory")
         
         # Create listings if not provided
         if not listings:
-            listings = self._create_default_listings(cv_files_directory)
+            listings = await self._acreate_default_listings(cv_files_directory)
         
-        # Process each CV
-        for file_name, file_path in cv_files.items():
-            logger.debug(f"Processing CV file: {file_name}")
-            cv_text = self.extract_text_from_pptx(file_path)
-            results[file_name] = {}
-            
-            for listing_name, listing_text in listings.items():
-                logger.debug(f"Reviewing {file_name} against {listing_name} listing")
-                results[file_name][listing_name] = self.review_cv(cv_text, listing_text)
+        listeners = self.batch_progress_listeners + ([progress_callback] if progress_callback else [])
+        progress = BatchProgress(listeners, len(cv_files),
+                                 min_interval=(self.config_manager.get('processing', 'progress_interval_ms') or 500) / 1000)
+        try:
+            # Read every CV first so repeated frames are corrected once across the whole batch
+            async def read(file_path):
+                frames = (await self.speculation.prepared(file_path)).get("frames")
+                if frames is None:
+                    frames = await asyncio.to_thread(self._read_pptx_frames, file_path)
+                progress.file_extracted()
+                return frames
+            frames = await asyncio.gather(*(read(file_path) for file_path in cv_files.values()))
+            cv_frames = dict(zip(cv_files, frames))
+            progress.start_stage("correcting")
+            cv_texts, stats = await self._acorrect_frames_batch(cv_frames)
+            logger.info("Batch frame stats: %s frames, %s flagged by spell pre-pass, %s unique corrections", stats['total_frames'], stats['flagged_frames'], stats['unique_frames'])
+
+            # CVs plainly missing a must-have skill are denied without an LLM review; the rest are reviewed best first
+            prescreen = {}
+            if self.config_manager.get('processing', 'criteria_prescreen') is not False:
+                prescreen = await asyncio.to_thread(self._prescreen, cv_texts, listings)
+            stats["prescreen"] = prescreen
+            order = sorted(cv_texts, key=lambda name: -max((hits["score"] for hits in prescreen.get(name, {}).values()), default=0))
+
+            # Review all CVs concurrently (bounded by max_concurrent_llm_calls); a failed review is recorded and the batch moves on
+            progress.start_stage("reviewing", reviews_total=len(cv_texts) * len(listings))
+            async def review(file_name, cv_text, listing_name, listing_text):
+                check_cancelled()  # Stop skips the remaining reviews
+                hits = prescreen.get(file_name, {}).get(listing_name)
+                if hits and hits["auto_denied"]:
+                    progress.review_done()
+                    return f"Deny (pre-screen): missing must-have {'; '.join(hits['must_missing'])}"
+                logger.debug("Reviewing %s against %s listing", file_name, listing_name)
+                try:
+                    verdict = await self.areview_cv(cv_text, listing_text)
+                    progress.review_done()
+                except Exception as e:
+                    logger.error("Review of %s against %s failed: %s", file_name, listing_name, e)
+                    verdict = f"Review failed: {e}"
+                    progress.review_done(failed=True)
+                return verdict
+            async def review_all(file_name, cv_text):
+                logger.debug("Processing CV file: %s", file_name)
+                verdicts = await asyncio.gather(*(review(file_name, cv_text, name, text) for name, text in listings.items()))
+                progress.cv_done(file_name, dict(zip(listings, verdicts)))
+                return dict(zip(listings, verdicts))
+            reviews = dict(zip(order, await asyncio.gather(*(review_all(file_name, cv_texts[file_name]) for file_name in order))))
+            results = {file_name: reviews[file_name] for file_name in cv_texts}
+            progress.finish()
+        except (OperationCancelled, asyncio.CancelledError):
+            progress.finish("stopped")
+            raise
+        except BaseException:
+            progress.finish("failed")
+            raise
         
-        return results, listings
+        for listener in self.batch_results_listeners:
+            try:
+                listener(results, listings)
+            except Exception as e:
+                logger.error("Batch results listener failed: %s", e)
+        return results, listings, stats
+    
+    def add_batch_progress_listener(self, callback):
+        """callback(event) is invoked from the batch thread with throttled progress and new verdicts"""
+        self.batch_progress_listeners.append(callback)
+    
+    def add_batch_results_listener(self, callback):
+        """callback(results, listings) is invoked after every completed process_cv_batch"""
+        self.batch_results_listeners.append(callback)
+    
+    @tracer.traced("criteria.prescreen")
+    def _prescreen(self, cv_texts, listings):
+        """{cv_name: {listing_name: rule hits}} for every listing the criteria compiler understands"""
+        prescreen = {name: {} for name in cv_texts}
+        for listing_name, listing_text in listings.items():
+            criteria = compile_listing(listing_text)
+            if not criteria.skills:
+                logger.info("No checkable criteria in the %s listing, every CV goes to LLM review", listing_name)
+                continue
+            for cv_name, hits in criteria.screen(cv_texts).items():
+                prescreen[cv_name][listing_name] = hits
+        denied = sum(hits["auto_denied"] for cv_hits in prescreen.values() for hits in cv_hits.values())
+        logger.info("Criteria pre-screen denied %s of %s reviews", denied, len(cv_texts) * len(listings))
+        return prescreen
+
+    @staticmethod
+    def _format_document_stats(doc_stats):
+        """Reply footer with the LLM calls the spell pre-pass saved on one document"""
+        return (f"\n\nSpell pre-pass: {doc_stats['llm_calls_avoided']} LLM calls avoided, "
+                f"{doc_stats['flagged_frames']} of {doc_stats['frames']} text frames sent for correction")
+
+    def _format_batch_stats(self, stats):
+        if not stats:
+            return ""
+        stats_text = (f"Text frames: {stats['total_frames']} total, "
+                      f"{stats['flagged_frames']} flagged by spell pre-pass, "
+                      f"{stats['unique_frames']} unique corrections, "
+                      f"{stats['llm_calls_avoided']} LLM calls avoided\n")
+        for cv_id, doc_stats in stats["documents"].items():
+            stats_text += f"- {cv_id}: {doc_stats['llm_calls_avoided']} of {doc_stats['frames']} frames skipped by spell pre-pass\n"
+        prescreen = stats.get("prescreen")
+        if prescreen and any(prescreen.values()):
+            stats_text += "\nCriteria pre-screen:\n"
+            for cv_id, cv_hits in prescreen.items():
+                for listing_name, hits in cv_hits.items():
+                    outcome = "auto-denied" if hits["auto_denied"] else f"score {hits['score']:g}"
+                    stats_text += f"- {cv_id} / {listing_name}: must {hits['must_met']}, {len(hits['should_met'])} other criteria met, {outcome}\n"
+        return stats_text
     
     def _get_cv_files(self, directory):
         files = os.listdir(directory)
@@ -178,12 +443,16 @@ class LLMHandler:
                 
         return cv_files
     
-    def _create_default_listings(self, directory):
+    def create_default_listings(self, directory):
+        return self._run(self._acreate_default_listings(directory))
+
+    async def _acreate_default_listings(self, directory):
         logger.info("Creating default listings")
         
+        generic, experienced = await asyncio.gather(self.acreate_listing('generic'), self.acreate_listing('highly experienced (senior)'))
         listings = {
-            'generic': self.create_listing('generic'),
-            'highly_experienced': self.create_listing('highly experienced (senior)'),
+            'generic': generic,
+            'highly_experienced': experienced,
         }
         
         # Try to extract from PDF if available
@@ -192,43 +461,107 @@ class LLMHandler:
         
         if pdf_files:
             try:
-                pdf_tables = extract_tables(os.path.join(directory, pdf_files[0]))
+                pdf_tables = await asyncio.to_thread(extract_tables, os.path.join(directory, pdf_files[0]))
                 if pdf_tables:
-                    listings['pdf_based'] = self.table_analysis(pdf_tables)
+                    listings['pdf_based'] = await self.atable_analysis(pdf_tables)
             except Exception as e:
-                logger.error(f"Error processing PDF: {str(e)}")
+                logger.error("Error processing PDF: %s", e)
                 
         return listings
     
     def extract_text_from_pptx(self, pptx_path: str) -> str:
+        return self._run(self.aextract_text_from_pptx(pptx_path))
+
+    async def aextract_text_from_pptx(self, pptx_path: str) -> str:
         """Extract and correct text from a PowerPoint file"""
-        logger.info(f"Extracting text from {pptx_path}")
+        return (await self.aextract_text_and_stats(pptx_path))[0]
+
+    @tracer.traced("llm.extract_text_from_pptx")
+    async def aextract_text_and_stats(self, pptx_path: str):
+        """aextract_text_from_pptx returning (text, the document's spell pre-pass stats)"""
+        logger.info("Extracting text from %s", pptx_path)
         
         try:
-            prs = Presentation(pptx_path)
-            all_text = []
-            
-            for slide_num, slide in enumerate(prs.slides):
-                logger.debug(f"Processing slide {slide_num+1}")
-                slide_text = []
-                
-                for shape in slide.shapes:
-                    if hasattr(shape, "text_frame") and shape.text_frame is not None:
-                        text = shape.text_frame.text.strip()
-                        if text:
-                            correct_text = self.spelling_and_grammar_check(text)
-                            slide_text.append(correct_text)
-                            
-                if slide_text:
-                    all_text.append("\n".join(slide_text))
-
-            return "\n\n".join(all_text)
+            prepared = await self.speculation.prepared(pptx_path)
+            if "text" in prepared:
+                return prepared["text"], prepared["document_stats"]
+            slides = prepared.get("frames")
+            if slides is None:
+                slides = await asyncio.to_thread(self._read_pptx_frames, pptx_path)
+            texts, stats = await self._acorrect_frames_batch({pptx_path: slides})
+            return texts[pptx_path], stats["documents"][pptx_path]
         except Exception as e:
-            logger.error(f"Error extracting text from PPTX: {str(e)}")
+            logger.error("Error extracting text from PPTX: %s", e)
             raise
+
+    @tracer.traced("pptx.read_frames")
+    def _read_pptx_frames(self, pptx_path: str) -> list:
+        """Return the non-empty text frames of each slide, uncorrected"""
+        check_cancelled()
+        fast = self.config_manager.get('processing', 'fast_pptx_extraction')
+        return read_pptx_frames(pptx_path, fast=fast is not False)
+
+    def _correct_frames_batch(self, documents: dict):
+        return self._run(self._acorrect_frames_batch(documents))
+
+    def _spell_flags(self, documents: dict) -> dict:
+        use_prepass = self.config_manager.get('processing', 'spell_prepass') is not False
+        return {
+            name: [[not use_prepass or self.spell_prepass.needs_correction(frame) for frame in slide_frames] for slide_frames in slides]
+            for name, slides in documents.items()
+        }
+
+    @tracer.traced("llm.correct_frames")
+    async def _acorrect_frames_batch(self, documents: dict):
+        """Correct the frames of several documents in one deduplicated, concurrent pass and rebuild each text.
+        Frames the local spell pre-pass finds clean keep their text and never reach the LLM.
+        Returns ({name: text}, frame stats of this pass)."""
+        flags = await asyncio.to_thread(self._spell_flags, documents)
+        flagged_frames = [
+            frame
+            for name, slides in documents.items()
+            for slide_frames, slide_flags in zip(slides, flags[name])
+            for frame, flagged in zip(slide_frames, slide_flags) if flagged
+        ]
+        corrected, dedup_stats = await self.frame_deduplicator.acorrect_all(flagged_frames)
+        corrected = iter(corrected)
+        
+        texts, document_stats = {}, {}
+        for name, slides in documents.items():
+            texts[name] = self._join_frames(slides, flags[name], corrected)
+            document_stats[name] = stats = self._document_stats(slides, flags[name])
+            logger.info("Spell pre-pass for %s: %s of %s frames flagged, %s LLM calls avoided", name, stats['flagged_frames'], stats['frames'], stats['llm_calls_avoided'])
+        total_frames = sum(stats["frames"] for stats in document_stats.values())
+        return texts, {
+            "total_frames": total_frames,
+            "flagged_frames": dedup_stats["total_frames"],
+            "unique_frames": dedup_stats["unique_frames"],
+            "llm_calls_avoided": total_frames - dedup_stats["unique_frames"],
+            "documents": document_stats,
+        }
     
+    @staticmethod
+    def _join_frames(slides, flags, corrected) -> str:
+        """A document's text, taking each flagged frame's correction from the corrected iterator in order"""
+        all_text = []
+        for slide_frames, slide_flags in zip(slides, flags):
+            slide_text = [next(corrected) if flagged else frame for frame, flagged in zip(slide_frames, slide_flags)]
+            if slide_text:
+                all_text.append("\n".join(slide_text))
+        return "\n\n".join(all_text)
+
+    @staticmethod
+    def _document_stats(slides, flags) -> dict:
+        frame_count = sum(len(slide_frames) for slide_frames in slides)
+        flagged_count = sum(sum(slide_flags) for slide_flags in flags)
+        return {"frames": frame_count, "flagged_frames": flagged_count, "llm_calls_avoided": frame_count - flagged_count}
+
     def spelling_and_grammar_check(self, text: str):
-        logger.debug(f"Checking spelling and grammar")
+        return self._run(self.aspelling_and_grammar_check(text))
+
+    @tracer.traced("llm.spelling_and_grammar_check")
+    async def aspelling_and_grammar_check(self, text: str):
+        logger.debug("Checking spelling and grammar", sample=25)
         
         prompt = """
             Correct the spelling and grammar of the following text from a CV. Return ONLY the corrected text, no explanation is needed.
@@ -239,10 +572,24 @@ class LLMHandler:
             Return: 'Kandidat One'          
         """.format(text)
         
-        return self.response(prompt)
+        return await self.aresponse(prompt)
+
+    def extract_pdf_tables(self, pdf_path: str) -> list:
+        return self._run(self.aextract_pdf_tables(pdf_path))
+
+    async def aextract_pdf_tables(self, pdf_path: str) -> list:
+        """Tables of a PDF, taken from speculative preprocessing when the upload was already read"""
+        prepared = await self.speculation.prepared(pdf_path)
+        if "tables" in prepared:
+            return prepared["tables"]
+        return await asyncio.to_thread(extract_tables, pdf_path)
 
     def table_analysis(self, tables: list) -> str:
-        logger.info(f"Analyzing {len(tables)} tables")
+        return self._run(self.atable_analysis(tables))
+
+    @tracer.traced("llm.table_analysis")
+    async def atable_analysis(self, tables: list) -> str:
+        logger.info("Analyzing %s tables", len(tables))
         
         # Convert table objects to string representation
         table_strings = []
@@ -256,17 +603,18 @@ class LLMHandler:
             The list must have 'must' and 'should' criteria. Make the listing 500 characters or less.
         """.format("\n\n".join(table_strings))
         
-        return self.response(prompt)
+        return await self.aresponse(prompt)
 
+    @tracer.traced("llm.process_message_intent")
     async def _process_message_intent(self, user_message,file_handler: FileHandler):
         user_message_lower = user_message.lower()
         
         if "create listing" in user_message_lower or "job listing" in user_message_lower:
             # Look for listing type in message
             if "senior" in user_message_lower or "experienced" in user_message_lower:
-                return self.create_listing("highly experienced (senior)")
+                return await self.acreate_listing("highly experienced (senior)")
             else:
-                return self.create_listing("generic")
+                return await self.acreate_listing("generic")
                 
         elif "review" in user_message_lower or "resume" in user_message_lower:
             if not file_handler.get_uploaded_file_path():
@@ -274,23 +622,23 @@ class LLMHandler:
             
             # Extract CV text
             try:
-                cv_text = self.extract_text_from_pptx(file_handler.get_uploaded_file_path())
-                listing = self.create_listing("generic")  # Create a generic listing
-                result = self.review_cv(cv_text, listing)
+                cv_text, doc_stats = await self.aextract_text_and_stats(file_handler.get_uploaded_file_path())
+                listing = await self.acreate_listing("generic")  # Create a generic listing
+                result = await self.areview_cv(cv_text, listing)
                 file_handler.reset_uploaded_file_path()
-                return result
+                return result + self._format_document_stats(doc_stats)
             except Exception as e:
-                logger.error(f"Error processing CV: {str(e)}")
+                logger.error("Error processing CV: %s", e)
                 return f"Error processing the CV: {str(e)}"
                 
         elif "process cv batch" in user_message_lower or "batch process" in user_message_lower:
-            # Get directory from the uploaded file's directory
-            if not file_handler.get_uploaded_file_path():
+            # The registered batch, else the uploaded file's directory
+            directory, cv_files = file_handler.batch_source()
+            if not directory:
                 return "Please upload at least one CV file first."
                 
-            directory = os.path.dirname(file_handler.get_uploaded_file_path())
             try:
-                results, listings = self.process_cv_batch(directory)
+                results, listings, stats = await self.aprocess_cv_batch(directory, cv_files=cv_files)
                 
                 # Save results to download directory
                 result_text = "Batch Processing Results:\n\n"
@@ -299,30 +647,31 @@ class LLMHandler:
                     for listing_name, review in cv_results.items():
                         result_text += f"- {listing_name}: {review}\n"
                     result_text += "\n"
+                result_text += self._format_batch_stats(stats)
                 
                 result_file = os.path.join(file_handler.storage_directory, f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-                with open(result_file, "w") as f:
+                with tracer.span("file.write_batch_results"), open(result_file, "w") as f:
                     f.write(result_text)
                 
                 self.downloaded_file_path = result_file
                 return f"Batch processing completed. Results saved to {os.path.basename(result_file)}"
             except Exception as e:
-                logger.error(f"Error in batch processing: {str(e)}")
+                logger.error("Error in batch processing: %s", e)
                 return f"Error in batch processing: {str(e)}"
                 
         elif any(keyword in user_message_lower for keyword in ["spell","spelling", "grammar", "correction","correct","spellings","mistakes"]):
             if not file_handler.get_uploaded_file_path():
                 return "Please upload a CV file first."
             try:
-                cv_text = self.extract_text_from_pptx(file_handler.get_uploaded_file_path())
-                result = self.spelling_and_grammar_check(cv_text)
-                created = create_file(f"outputs", result)
+                cv_text, doc_stats = await self.aextract_text_and_stats(file_handler.get_uploaded_file_path())
+                result = await self.aspelling_and_grammar_check(cv_text)
+                created = await asyncio.to_thread(create_file, f"outputs", result)
                 if created:
                     file_handler.download_file(f"outputs")
                 file_handler.reset_uploaded_file_path()
-                return result
+                return result + self._format_document_stats(doc_stats)
             except Exception as e:
-                logger.error(f"Error processing CV: {str(e)}")
+                logger.error("Error processing CV: %s", e)
                 return f"Error processing the CV: {str(e)}"
             
         elif "table analysis" in user_message_lower or "analyze table" in user_message_lower:
@@ -330,13 +679,13 @@ class LLMHandler:
                 return "Please upload a PDF file containing tables first."
                 
             try:
-                tables = extract_tables(file_handler.get_uploaded_file_path())
+                tables = await self.aextract_pdf_tables(file_handler.get_uploaded_file_path())
                 if not tables:
                     return "No tables found in the uploaded PDF."
-                analysis = self.table_analysis(tables)
+                analysis = await self.atable_analysis(tables)
                 return analysis
             except Exception as e:
-                logger.error(f"Error analyzing tables: {str(e)}")
+                logger.error("Error analyzing tables: %s", e)
                 return f"Error analyzing tables: {str(e)}"
         
-        return self.response(user_message)
\ No newline at end of file
+        return await self.achat(user_message)
\ No newline at end of file
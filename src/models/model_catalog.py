@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from utils.helpers import fetch_models
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class ModelCatalog:
+    """Model lists per (base_url, API key fingerprint), fetched off the UI thread.
+
+    Requests are debounced so typing an endpoint or key fetches once, after the last keystroke.
+    Lists are cached for ttl seconds in cache_path so startup does not wait for the endpoint; a
+    stale entry is returned right away and refreshed in the background. Only the most recent
+    request's callback is called, so results for a half-typed URL are dropped.
+    """
+    def __init__(self, cache_path="model_catalog.json", ttl=3600, debounce=0.6, timeout=10):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.debounce = debounce
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._timer = None
+        self._generation = 0
+        self._cache = self._load_cache()
+
+    @staticmethod
+    def cache_key(base_url, api_key):
+        fingerprint = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return f"{base_url.rstrip('/')}|{fingerprint}"
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable model catalog cache %s: %s", self.cache_path, e)
+            return {}
+
+    def _save_cache(self):
+        temp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f, indent=4)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.error("Error saving model catalog cache: %s", e)
+
+    def cached(self, base_url, api_key):
+        """(models, fresh) from the cache, or (None, False) if this endpoint and key were never listed"""
+        entry = self._cache.get(self.cache_key(base_url, api_key))
+        if not entry:
+            return None, False
+        return entry["models"], time.time() - entry["fetched_at"] < self.ttl
+
+    def get_models(self, base_url, api_key, callback):
+        """callback(models) is called with the cached list if there is one, and again from a
+        background thread when a fetch for an uncached or stale entry completes"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        models, fresh = self.cached(base_url, api_key)
+        if models is not None:
+            callback(models)
+            if fresh:
+                return
+        # Cached lists refresh right away; new endpoints wait until typing pauses
+        delay = 0 if models is not None else self.debounce
+        with self._lock:
+            self._timer = threading.Timer(delay, self._fetch, args=(generation, base_url, api_key, callback, models is not None))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fetch(self, generation, base_url, api_key, callback, has_cached):
+        start = time.perf_counter()
+        models = fetch_models(base_url, api_key, timeout=self.timeout)
+        logger.debug("Fetched %s models from %s in %.2fs", len(models), base_url, time.perf_counter() - start)
+        with self._lock:
+            if models:
+                self._cache[self.cache_key(base_url, api_key)] = {"fetched_at": time.time(), "models": models}
+                self._save_cache()
+            if generation != self._generation:
+                return  # the endpoint or key changed again while fetching
+        if models or not has_cached:
+            callback(models)  # a failed refresh keeps showing the cached list
@@ -5,22 +5,24 @@ class SettingsModel:
         self.config_manager = config_manager
 
     def get_api_config(self):
+        api_config = self.config_manager.get("api_config")
         return {
-            "base_url": self.config_manager.get("api_config", "base_url"),
-            "api_key": self.config_manager.get("api_config", "api_key"),
-            "model": self.config_manager.get("api_config", "model"),
-            "temperature": self.config_manager.get("api_config", "temperature"),
-            "top_p": self.config_manager.get("api_config", "top_p"),
-            "max_tokens": self.config_manager.get("api_config", "max_tokens"),
-            "stream": self.config_manager.get("api_config", "stream"),
+            "base_url": api_config.get("base_url"),
+            "api_key": api_config.get("api_key"),
+            "model": api_config.get("model"),
+            "temperature": api_config.get("temperature"),
+            "top_p": api_config.get("top_p"),
+            "max_tokens": api_config.get("max_tokens"),
+            "stream": api_config.get("stream"),
         }
 
     def get_app_settings(self):
+        app_settings = self.config_manager.get("app_settings")
         return {
-            "theme": self.config_manager.get("app_settings", "theme"),
-            "font_size_sm": self.config_manager.get("app_settings", "font_size"),
-            "font_style": self.config_manager.get("app_settings", "font_style"),
-            "font_color": self.config_manager.get("app_settings", "font_color"),
-            "width": self.config_manager.get("app_settings", "width"),
-            "height": self.config_manager.get("app_settings", "height"),
+            "theme": app_settings.get("theme"),
+            "font_size_sm": app_settings.get("font_size"),
+            "font_style": app_settings.get("font_style"),
+            "font_color": app_settings.get("font_color"),
+            "width": app_settings.get("width"),
+            "height": app_settings.get("height"),
         }
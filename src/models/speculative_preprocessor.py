@@ -0,0 +1,155 @@
+import asyncio
+import os
+from collections import OrderedDict
+from utils.cancellation import CancellationToken, OperationCancelled, cancellation_scope, check_cancelled
+from utils.helpers import extract_tables
+from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+logger = get_logger()
+
+PREPARED_FIELDS = ("frames", "text", "tables", "document_stats")
+
+class SpeculativePreprocessor:
+    """Prepares uploaded files in the background, before the user asks for anything: PowerPoint
+    frames are read (and, for a single upload, corrected) and PDF tables extracted, so a following
+    review, spelling check or table analysis starts from ready data.
+
+    The work is bounded by the "speculation" settings: at most max_files per upload, no files over
+    max_file_mb, one file at a time, and correction only when it needs at most
+    max_correction_frames LLM calls, llm_calls of them at once, so requests the user makes keep
+    the other LLM slots. A new upload, Stop or timeout_s cancels the unfinished work. Results live
+    on the LLM loop in an LRU cache keyed by file identity, shared by hard links of one upload,
+    and are dropped by invalidate() when the model or endpoint changes.
+    """
+    def __init__(self, llm_handler):
+        self.llm_handler = llm_handler
+        self.loop = llm_handler.loop
+        self._entries = OrderedDict()  # (device, inode, size, mtime) -> entry; only touched on the LLM loop
+        self._token = None
+
+    @staticmethod
+    def _key(path):
+        stat = os.stat(path)
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def schedule(self, paths):
+        """Start preparing freshly uploaded files, cancelling what is left of the previous upload"""
+        settings = self.llm_handler.config_manager.get('speculation') or {}
+        if not paths or settings.get('enabled') is False:
+            return None
+        self.cancel()
+        self._token = token = CancellationToken(timeout=settings.get('timeout_s'), name="speculative preprocessing")
+        return asyncio.run_coroutine_threadsafe(self._speculate(list(paths), settings, token), self.loop)
+
+    def cancel(self):
+        token, self._token = self._token, None
+        if token is not None:
+            token.cancel()
+
+    def invalidate(self):
+        """Stop and forget everything prepared, e.g. text corrected by a model that is no longer configured"""
+        self.cancel()
+        self.loop.call_soon_threadsafe(self._entries.clear)
+
+    async def prepared(self, path):
+        """What speculation has ready for path, as a dict with any of "frames", "text" (with its
+        "document_stats") and "tables".
+        Work in progress is awaited; work not started yet is left to the caller."""
+        if asyncio.get_running_loop() is not self.loop:
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self.prepared(path), self.loop))
+        try:
+            key = self._key(path)
+        except OSError:
+            return {}
+        entry = self._entries.get(key)
+        if entry is not None and entry["state"] == "queued":
+            entry["state"] = "claimed"
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            metrics.increment("speculation_misses")
+            return {}
+        entry["wanted"] = True
+        await entry["done"].wait()
+        self._entries.move_to_end(key)
+        prepared = {field: entry[field] for field in PREPARED_FIELDS if entry.get(field) is not None}
+        metrics.increment("speculation_hits" if prepared else "speculation_misses")
+        return prepared
+
+    async def _speculate(self, paths, settings, token):
+        with cancellation_scope(token), tracer.span("speculation.upload", files=len(paths)):
+            max_bytes = (settings.get('max_file_mb') or 25) * 1024 * 1024
+            entries = []
+            for path in paths[:settings.get('max_files') or 20]:
+                if not path.lower().endswith((".pptx", ".pdf")):
+                    continue
+                try:
+                    key = self._key(path)
+                except OSError:
+                    continue
+                if key[2] > max_bytes:
+                    logger.info("Not preparing %s: larger than %s MB", os.path.basename(path), settings.get('max_file_mb'))
+                    continue
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    continue
+                entry = {"state": "queued", "done": asyncio.Event()}
+                self._entries[key] = entry
+                entries.append((path, key, entry))
+            self._evict(settings.get('cache_entries') or 64)
+
+            # Several files are most likely a batch, which corrects all frames in one deduplicated pass anyway
+            correct = settings.get('correct') is not False and len(paths) == 1
+            for path, key, entry in entries:
+                if token.cancelled:
+                    break
+                if entry["state"] != "queued":
+                    continue
+                entry["state"] = "running"
+                try:
+                    await self._prepare(path, entry, correct, settings)
+                except OperationCancelled as e:
+                    metrics.increment("speculation_cancelled")
+                    logger.info("Speculative preprocessing of %s stopped: %s", os.path.basename(path), e)
+                except Exception as e:
+                    logger.warning("Speculative preprocessing of %s failed: %s", os.path.basename(path), e)
+                finally:
+                    entry["state"] = "done"
+                    entry["done"].set()
+            # Files never started are dropped, so a later request does the work itself
+            for path, key, entry in entries:
+                if entry["state"] == "queued" and self._entries.get(key) is entry:
+                    del self._entries[key]
+
+    async def _prepare(self, path, entry, correct, settings):
+        if path.lower().endswith(".pdf"):
+            entry["tables"] = await asyncio.to_thread(extract_tables, path)
+            return
+        entry["frames"] = frames = await asyncio.to_thread(self.llm_handler._read_pptx_frames, path)
+        if not correct:
+            return
+        flags = (await asyncio.to_thread(self.llm_handler._spell_flags, {path: frames}))[path]
+        flagged = [frame for slide_frames, slide_flags in zip(frames, flags) for frame, is_flagged in zip(slide_frames, slide_flags) if is_flagged]
+        if len(flagged) > (settings.get('max_correction_frames') or 40):
+            logger.info("Not correcting %s speculatively: %s frames need the LLM", os.path.basename(path), len(flagged))
+            return
+        # A few calls at a time so Stop takes effect between them; once a request is waiting for this
+        # file the rest go at full speed. The text is built from the corrections returned here, since
+        # the deduplicator may evict or clear them before a rebuild could read them back.
+        corrected = []
+        while len(corrected) < len(flagged):
+            check_cancelled()
+            step = len(flagged) if entry.get("wanted") else max(1, settings.get('llm_calls') or 1)
+            corrected += (await self.llm_handler.frame_deduplicator.acorrect_all(flagged[len(corrected):len(corrected) + step]))[0]
+        check_cancelled()  # invalidated while the last calls ran: their corrections are stale
+        entry["text"] = self.llm_handler._join_frames(frames, flags, iter(corrected))
+        entry["document_stats"] = self.llm_handler._document_stats(frames, flags)
+        logger.info("Prepared %s ahead of use: %s frames corrected", os.path.basename(path), len(flagged))
+
+    def _evict(self, max_entries):
+        for key in [key for key, entry in self._entries.items() if entry["state"] == "done"]:
+            if len(self._entries) <= max_entries:
+                break
+            del self._entries[key]
@@ -0,0 +1,110 @@
+import os
+import re
+import threading
+from utils.helpers import get_resource_path
+from utils.logger import get_logger
+
+logger = get_logger()
+
+DICTIONARY_DIR = "resources/dictionaries"
+DICTIONARY_FILES = ("en_words.txt", "tech_vocabulary.txt")
+
+class SpellPrepass:
+    """Local dictionary check deciding which text frames are worth an LLM correction.
+
+    Lowercase words missing from the dictionary are flagged. Capitalized words are usually
+    names, companies or places, so they are only flagged when a symmetric-delete lookup finds
+    a dictionary word one edit away (e.g. "Automationi"). Tokens with digits, acronyms and
+    camel-cased product names are never flagged.
+    """
+    _token = re.compile(r"[^\W\d_][\w'’.@/+#-]*")
+    _camel_case = re.compile(r"[a-z][A-Z]")
+
+    def __init__(self, dictionary_paths=None):
+        self.dictionary_paths = dictionary_paths or [os.path.join(get_resource_path(DICTIONARY_DIR), name) for name in DICTIONARY_FILES]
+        self._words = set()
+        self._deletes = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        self._ensure_loaded()
+        return bool(self._words)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for path in self.dictionary_paths:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            word = line.strip().lower()
+                            if word and not word.startswith("#"):
+                                self._words.add(word)
+                except OSError as e:
+                    logger.warning("Spell pre-pass dictionary not loaded from %s: %s", path, e)
+            for word in self._words:
+                for deleted in self._single_deletes(word):
+                    self._deletes.setdefault(deleted, []).append(word)
+            self._loaded = True
+            logger.debug("Spell pre-pass loaded %s words", len(self._words))
+
+    @staticmethod
+    def _single_deletes(word: str) -> set:
+        return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+    @staticmethod
+    def _within_one_edit(a: str, b: str) -> bool:
+        if a == b:
+            return True
+        if abs(len(a) - len(b)) > 1:
+            return False
+        if len(a) == len(b):
+            diffs = [i for i in range(len(a)) if a[i] != b[i]]
+            if len(diffs) == 1:
+                return True
+            # adjacent transposition
+            return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+        shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+        return any(longer[:i] + longer[i + 1:] == shorter for i in range(len(longer)))
+
+    def suggestions(self, word: str) -> list:
+        """Dictionary words within one edit of word, found through the symmetric-delete index"""
+        self._ensure_loaded()
+        word = word.lower()
+        candidates = set()
+        for key in self._single_deletes(word) | {word}:
+            candidates.update(self._deletes.get(key, ()))
+            if key in self._words:
+                candidates.add(key)
+        return sorted(candidate for candidate in candidates if self._within_one_edit(word, candidate))
+
+    def _is_checkable(self, token: str) -> bool:
+        if len(token) <= 2 or not token.isascii() or not token.isalpha():
+            return False
+        if token.isupper() or self._camel_case.search(token):
+            return False
+        return True
+
+    def suspicious_words(self, text: str) -> list:
+        self._ensure_loaded()
+        flagged = []
+        for match in self._token.finditer(text):
+            raw = match.group(0)
+            if "@" in raw or "/" in raw:
+                continue
+            for token in re.split(r"[-.+#]", re.sub(r"['’]s?$", "", raw)):
+                if not self._is_checkable(token) or token.lower() in self._words:
+                    continue
+                if token[0].islower() or self.suggestions(token):
+                    flagged.append(token)
+        return flagged
+
+    def needs_correction(self, text: str) -> bool:
+        if not self.available:
+            return True  # without a dictionary every frame goes to the LLM, as before
+        return bool(self.suspicious_words(text))
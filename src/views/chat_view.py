@@ -1,4 +1,6 @@
+import itertools
 import tkinter as tk
+from collections import deque
 import ttkbootstrap as ttk
 from config import ConfigManager
 from datetime import datetime
@@ -7,20 +9,73 @@ from utils.logger import get_logger
 logger = get_logger()
 
 class ChatView:
-    def __init__(self, notebook: ttk.Notebook, config_manager: ConfigManager, upload_callback, send_callback):
+    SEARCH_SENDERS = ["All", "You", "Agent", "System", "Review"]
+    SEARCH_PERIODS = {"Any time": None, "Today": 0, "Last 7 days": 7, "Last 30 days": 30, "Last 365 days": 365}
+
+    def __init__(self, notebook: ttk.Notebook, config_manager: ConfigManager, upload_callback, send_callback, search_callback=None,
+                 load_older_callback=None, load_newer_callback=None, reload_latest_callback=None, stop_callback=None, upload_folder_callback=None):
         logger.debug("Initializing ChatView")
         self.notebook = notebook
         self.config_manager = config_manager
         self.font = config_manager.get('app_settings', 'font_style')
         self.font_size = config_manager.get('app_settings', 'font_size')
         self.upload_callback = upload_callback
+        self.upload_folder_callback = upload_folder_callback
         self.send_callback = send_callback
+        self.search_callback = search_callback
+        self.load_older_callback = load_older_callback
+        self.load_newer_callback = load_newer_callback
+        self.reload_latest_callback = reload_latest_callback
+        self.stop_callback = stop_callback
+        # Only a window of the history lives in the Text widget; older/newer pages are loaded on scroll
+        self.max_rendered_messages = config_manager.get('chat_settings', 'max_rendered_messages') or 300
+        self._rendered = deque()  # (message_id, mark) of each rendered message, oldest first
+        self._mark_ids = itertools.count()
+        self._has_older = False
+        self._has_newer = False
+        self._loading_page = False
         self.frame = ttk.Frame(self.notebook)
         self.notebook.add(self.frame, text="Chat")
+        if self.search_callback:
+            self._create_search_bar(self.frame)
         self.chat_history = self._create_chat_history(self.frame)
         self.input_area = self._create_input_area(self.frame)
         self._configure_chat_tags()
     
+    def _create_search_bar(self, parent):
+        logger.debug("Creating search bar")
+        frame = ttk.Frame(parent)
+        frame.pack(padx=10, pady=(10, 0), fill=tk.X)
+        self.search_var = tk.StringVar()
+        self.search_sender_var = tk.StringVar(value=self.SEARCH_SENDERS[0])
+        self.search_period_var = tk.StringVar(value=next(iter(self.SEARCH_PERIODS)))
+        search_entry = ttk.Entry(frame, textvariable=self.search_var, font=(self.font, self.font_size))
+        search_entry.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 5))
+        search_entry.bind('<Return>', lambda event: self._on_search())
+        ttk.Combobox(frame, textvariable=self.search_sender_var, values=self.SEARCH_SENDERS, state="readonly", width=8).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Combobox(frame, textvariable=self.search_period_var, values=list(self.SEARCH_PERIODS), state="readonly", width=13).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(frame, text="Search", command=self._on_search, bootstyle="secondary-outline").pack(side=tk.LEFT)
+
+    def _on_search(self):
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        sender = self.search_sender_var.get()
+        self.search_callback(query, None if sender == "All" else sender, self.SEARCH_PERIODS.get(self.search_period_var.get()))
+
+    def show_search_results(self, query, results, elapsed_ms):
+        window = tk.Toplevel(self.frame)
+        window.title(f"Search: {query}")
+        window.geometry("800x400")
+        ttk.Label(window, text=f"{len(results)} results in {elapsed_ms:.1f} ms", font=(self.font, self.font_size - 2, 'italic')).pack(anchor=tk.W, padx=10, pady=5)
+        table = ttk.Treeview(window, columns=("Date", "Time", "Sender", "Match"), show="headings")
+        for column, width in (("Date", 90), ("Time", 80), ("Sender", 70), ("Match", 540)):
+            table.heading(column, text=column)
+            table.column(column, width=width, anchor="w", stretch=column == "Match")
+        for result in results:
+            table.insert("", "end", values=(result["date"], result["timestamp"], result["sender"], " ".join(result["snippet"].split())))
+        table.pack(padx=10, pady=(0, 10), fill=tk.BOTH, expand=True)
+
     def _create_chat_history(self, parent):
         logger.debug("Creating chat history area")
         frame = ttk.Frame(parent)
@@ -29,10 +84,29 @@ class ChatView:
         canvas_frame.pack(fill=tk.BOTH, expand=True)
         scrollbar = ttk.Scrollbar(canvas_frame)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        text_widget = tk.Text(canvas_frame,height=20,width=50,state='disabled',wrap=tk.WORD,font=(self.font, self.font_size),bg="#f9f9f9",padx=15,pady=15,yscrollcommand=scrollbar.set,borderwidth=0,highlightthickness=0)
+        text_widget = tk.Text(canvas_frame,height=20,width=50,state='disabled',wrap=tk.WORD,font=(self.font, self.font_size),bg="#f9f9f9",padx=15,pady=15,yscrollcommand=self._on_history_scroll,borderwidth=0,highlightthickness=0)
         text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=text_widget.yview)
+        self.scrollbar = scrollbar
         return text_widget
+
+    def _on_history_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._loading_page or not self._rendered:
+            return
+        if float(first) <= 0.0 and self._has_older and self.load_older_callback:
+            self._request_page(self.load_older_callback, self._rendered[0][0])
+        elif float(last) >= 1.0 and self._has_newer and self.load_newer_callback:
+            self._request_page(self.load_newer_callback, self._rendered[-1][0])
+
+    def _request_page(self, callback, message_id):
+        self._loading_page = True
+        def load():
+            try:
+                callback(message_id)
+            finally:
+                self._loading_page = False
+        self.frame.after_idle(load)
     
     def _configure_chat_tags(self):
         self.chat_history.config(state='normal')
@@ -52,36 +126,136 @@ class ChatView:
         frame.pack(padx=10, pady=5, fill=tk.X)
         upload_btn = ttk.Button(frame, text="Upload", command=self.upload_callback, bootstyle="secondary-outline")
         upload_btn.pack(side=tk.LEFT, padx=(0, 5))
+        if self.upload_folder_callback:
+            folder_btn = ttk.Button(frame, text="Folder", command=self.upload_folder_callback, bootstyle="secondary-outline")
+            folder_btn.pack(side=tk.LEFT, padx=(0, 5))
         entry_container = ttk.Frame(frame, bootstyle="light")
         entry_container.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 5))
         message_entry = ttk.Entry(entry_container, font=(self.font, self.font_size))
         message_entry.pack(side=tk.LEFT, expand=True, fill=tk.X, ipady=3)
         send_btn = ttk.Button( frame, text="Send", command=self.send_callback, bootstyle="primary")
         send_btn.pack(side=tk.LEFT)
+        stop_btn = ttk.Button(frame, text="Stop", command=self.stop_callback, bootstyle="danger-outline", state="disabled")
+        stop_btn.pack(side=tk.LEFT, padx=(5, 0))
         message_entry.bind('<Return>', lambda event: self.send_callback())
         typing_status = ttk.Label(parent, text="", font=(self.font, self.font_size - 2, 'italic'), foreground="#757575")
         typing_status.pack(anchor=tk.W, padx=15, pady=(0, 5))
         self.message_entry = message_entry
         self.typing_status = typing_status
+        self.stop_button = stop_btn
     
-    def add_message_to_history(self, message, sender="You", timestamp=None):
-        logger.debug(f"Adding message to history: {message} from {sender}")
-        self.chat_history.config(state='normal')
-        if timestamp is None:
-            timestamp = datetime.now().strftime("[%H:%M:%S]")
-        if self.chat_history.index('end-1c') != '1.0':
-            self.chat_history.insert(tk.END, "\n")
+    def _message_chunks(self, message, sender, timestamp):
+        """Text.insert arguments rendering one message: its timestamp line and its bubble"""
         if sender == "You":
-            self.chat_history.insert(tk.END, f"You {timestamp}\n", "user_timestamp")
-            self.chat_history.insert(tk.END, f"{message}\n", "user_bubble")
+            return (f"You {timestamp}\n", "user_timestamp", f"{message}\n", "user_bubble")
         elif sender == "Agent":
-            self.chat_history.insert(tk.END, f"DESH Agent {timestamp}\n", "agent_timestamp")
-            self.chat_history.insert(tk.END, f"{message}\n", "agent_bubble")
-        else:
-            self.chat_history.insert(tk.END, f"{timestamp}\n", "system_timestamp")
-            self.chat_history.insert(tk.END, f"{message}\n", "system_bubble")
+            return (f"DESH Agent {timestamp}\n", "agent_timestamp", f"{message}\n", "agent_bubble")
+        return (f"{timestamp}\n", "system_timestamp", f"{message}\n", "system_bubble")
+
+    def _insert_messages(self, index, messages):
+        """Insert stored messages in order at index (a mark with right gravity, or END) in one Text.insert
+        call and return their (id, mark) pairs. Messages are separated by a blank line that precedes
+        each message's mark, so the history never starts or ends with one."""
+        if not messages:
+            return []
+        start = self.chat_history.index("end-1c" if index == tk.END else index)
+        text_before = self.chat_history.compare(start, ">", "1.0")
+        text_after = index != tk.END and self.chat_history.compare(start, "<", "end-1c")
+        chunks, line_offsets, lines = [], [], 0
+        for message_data in messages:
+            if chunks or text_before:
+                chunks += ["\n", ()]
+                lines += 1
+            line_offsets.append(lines)  # every chunk ends with a newline, so each message starts a line
+            message_chunks = self._message_chunks("\n".join(message_data["content"]), message_data["sender"], message_data["timestamp"])
+            chunks += message_chunks
+            lines += sum(text.count("\n") for text in message_chunks[::2])
+        if text_after:
+            chunks += ["\n", ()]
+        self.chat_history.insert(index, *chunks)
+        rendered = []
+        for message_data, line_offset in zip(messages, line_offsets):
+            mark = f"message_{next(self._mark_ids)}"
+            self.chat_history.mark_set(mark, f"{start} + {line_offset} lines")
+            rendered.append((message_data.get("id"), mark))
+        return rendered
+
+    def _trim_oldest(self, count):
+        if count <= 0:
+            return
+        self.chat_history.delete("1.0", self._rendered[count][1])
+        for _ in range(count):
+            self.chat_history.mark_unset(self._rendered.popleft()[1])
+        self._has_older = self._rendered[0][0] is not None
+
+    def _trim_newest(self, count):
+        if count <= 0:
+            return
+        # The separator before the first removed message goes too, so no blank line is left at the end
+        start = self._rendered[-count][1] if count >= len(self._rendered) else f"{self._rendered[-count][1]} - 1c"
+        self.chat_history.delete(start, "end-1c")
+        for _ in range(count):
+            self.chat_history.mark_unset(self._rendered.pop()[1])
+        self._has_newer = True
+
+    def render_messages(self, messages, has_older=False):
+        """Replace the rendered history with messages in one pass"""
+        logger.debug("Rendering %s messages", len(messages))
+        self.chat_history.config(state='normal')
+        self.chat_history.delete("1.0", tk.END)
+        for _, mark in self._rendered:
+            self.chat_history.mark_unset(mark)
+        self._rendered = deque(self._insert_messages(tk.END, messages))
+        self._trim_oldest(len(self._rendered) - self.max_rendered_messages)
+        self._has_older = has_older or (len(messages) > len(self._rendered))
+        self._has_newer = False
         self.chat_history.see(tk.END)
         self.chat_history.config(state='disabled')
+
+    def prepend_messages(self, messages, has_older):
+        logger.debug("Loading %s older messages", len(messages))
+        self._has_older = has_older and bool(messages)
+        if not messages:
+            return
+        self.chat_history.config(state='normal')
+        previous_top = self._rendered[0][1] if self._rendered else None
+        self.chat_history.mark_set("page_insert", "1.0")
+        self.chat_history.mark_gravity("page_insert", tk.RIGHT)
+        self._rendered.extendleft(reversed(self._insert_messages("page_insert", messages)))
+        self.chat_history.mark_unset("page_insert")
+        self._trim_newest(len(self._rendered) - self.max_rendered_messages)
+        if previous_top:
+            self.chat_history.yview(previous_top)  # keep the message the user was looking at in place
+        self.chat_history.config(state='disabled')
+
+    def append_messages(self, messages, has_newer):
+        logger.debug("Loading %s newer messages", len(messages))
+        self._has_newer = has_newer and bool(messages)
+        if not messages:
+            return
+        self.chat_history.config(state='normal')
+        previous_bottom = self._rendered[-1][1] if self._rendered else None
+        self._rendered.extend(self._insert_messages(tk.END, messages))
+        self._trim_oldest(len(self._rendered) - self.max_rendered_messages)
+        if previous_bottom:
+            self.chat_history.see(previous_bottom)
+        self.chat_history.config(state='disabled')
+
+    def add_message_to_history(self, message, sender="You", timestamp=None, message_id=None):
+        logger.debug("Adding %d character message from %s", len(message), sender)
+        if self._has_newer and self.reload_latest_callback:
+            # The newest messages were trimmed while browsing older history; jump back to the latest page
+            self.reload_latest_callback()
+            return
+        if timestamp is None:
+            timestamp = datetime.now().strftime("[%H:%M:%S]")
+        at_bottom = float(self.chat_history.yview()[1]) >= 1.0
+        self.chat_history.config(state='normal')
+        self._rendered.extend(self._insert_messages(tk.END, [{"id": message_id, "sender": sender, "timestamp": timestamp, "content": [message]}]))
+        self._trim_oldest(len(self._rendered) - self.max_rendered_messages)
+        if at_bottom or sender == "You":
+            self.chat_history.see(tk.END)
+        self.chat_history.config(state='disabled')
     
     def get_message(self):
         return self.message_entry.get().strip()
@@ -91,3 +265,6 @@ class ChatView:
     
     def set_typing_status(self, status):
         self.typing_status.config(text=status)
+    
+    def set_stop_enabled(self, enabled):
+        self.stop_button.config(state="normal" if enabled else "disabled")
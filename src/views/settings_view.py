@@ -1,12 +1,12 @@
 import tkinter as tk
 import ttkbootstrap as ttk
 from config import ConfigManager
-from utils.helpers import get_system_info,fetch_models
+from utils.helpers import get_system_info
 from utils.logger import get_logger
 
 logger = get_logger()
 class SettingsView:
-    def __init__(self, notebook: ttk.Notebook, config_manager: ConfigManager,save_callback,reload_model_callback):
+    def __init__(self, notebook: ttk.Notebook, config_manager: ConfigManager,save_callback,reload_model_callback,model_options_callback=None):
         self.notebook = notebook
         self.config_manager = config_manager
 
@@ -31,6 +31,7 @@ class SettingsView:
         self.font_styles = ['Arial', 'Courier', 'Comic Sans MS', 'Fixedsys', 'MS Sans Serif', 'MS Serif', 'Symbol', 'System', 'Times New Roman', 'Verdana']
         self.save_action = save_callback
         self.reload_model = reload_model_callback
+        self.model_options_callback = model_options_callback
         self._create_ui()
 
     def toggle_api_key_visibility(self):
@@ -92,10 +93,10 @@ class SettingsView:
         model_frame = ttk.LabelFrame(frame, text="Model Configuration")
         model_frame.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
         model_frame.grid_columnconfigure(1, weight=1)
-        model_options = self._fetch_model_options()
         ttk.Label(model_frame, text="Model: ").pack(anchor="w", padx=10, pady=2)
-        self.models_dropdown = ttk.Combobox(model_frame, textvariable=self.model_var, values=model_options, state="readonly", width=45)
+        self.models_dropdown = ttk.Combobox(model_frame, textvariable=self.model_var, values=["loading..."], state="readonly", width=45)
         self.models_dropdown.pack(fill="x", padx=10, pady=2)
+        self._request_model_options()
 
         self._add_labeled_entry(model_frame, "Temperature:", self.temperature_var, width=10)
         self._add_labeled_entry(model_frame, "Top P:", self.top_p_var, width=10)
@@ -105,23 +106,24 @@ class SettingsView:
         reload_btn.pack(anchor="w", padx=10, pady=10)
 
     def on_change(self, *args):
-        logger.info(f"settings changed: {args}")
-        if self.config_manager.get('api_config', 'model') != self.model_var.get():
-            self.config_manager.update_from_ui('api_config', 'model', self.model_var.get())
-        if self.config_manager.get('api_config', 'base_url') != self.base_url_var.get():
-            self.config_manager.update_from_ui('api_config', 'base_url', self.base_url_var.get())
-            self.models_dropdown.configure(values=self._fetch_model_options())
-        if self.config_manager.get('api_config', 'api_key') != self.api_key_var.get():
-            self.config_manager.update_from_ui('api_config', 'api_key', self.api_key_var.get())
-            self.models_dropdown.configure(values=self._fetch_model_options())
-        if self.config_manager.get('api_config', 'temperature') != self.temperature_var.get():
-            self.config_manager.update_from_ui('api_config', 'temperature', self.temperature_var.get())
-        if self.config_manager.get('api_config', 'top_p') != self.top_p_var.get():
-            self.config_manager.update_from_ui('api_config', 'top_p', self.top_p_var.get())
-        if self.config_manager.get('api_config', 'max_tokens') != self.max_tokens_var.get():
-            self.config_manager.update_from_ui('api_config', 'max_tokens', self.max_tokens_var.get())
-        if self.config_manager.get('api_config', 'stream') != self.stream_var.get():
-            self.config_manager.update_from_ui('api_config', 'stream', self.stream_var.get())
+        logger.info("settings changed: %s", args)
+        api_config = self.config_manager.get('api_config')
+        if api_config['model'] != self.model_var.get():
+            self.config_manager.update_from_ui('api_config', 'model', self.model_var.get(), debounce=True)
+        if api_config['base_url'] != self.base_url_var.get():
+            self.config_manager.update_from_ui('api_config', 'base_url', self.base_url_var.get(), debounce=True)
+            self._request_model_options()
+        if api_config['api_key'] != self.api_key_var.get():
+            self.config_manager.update_from_ui('api_config', 'api_key', self.api_key_var.get(), debounce=True)
+            self._request_model_options()
+        if api_config['temperature'] != self.temperature_var.get():
+            self.config_manager.update_from_ui('api_config', 'temperature', self.temperature_var.get(), debounce=True)
+        if api_config['top_p'] != self.top_p_var.get():
+            self.config_manager.update_from_ui('api_config', 'top_p', self.top_p_var.get(), debounce=True)
+        if api_config['max_tokens'] != self.max_tokens_var.get():
+            self.config_manager.update_from_ui('api_config', 'max_tokens', self.max_tokens_var.get(), debounce=True)
+        if api_config['stream'] != self.stream_var.get():
+            self.config_manager.update_from_ui('api_config', 'stream', self.stream_var.get(), debounce=True)
 
     def _add_labeled_entry(self, parent, label, var, width=45, show=None):
         ttk.Label(parent, text=label).pack(anchor="w", padx=10, pady=2)
@@ -129,14 +131,21 @@ class SettingsView:
         entry.pack(fill="x", padx=10, pady=2)
         return entry
 
-    def _fetch_model_options(self):
-        if self.config_manager.get("api_config", "base_url") and self.config_manager.get("api_config", "api_key"):
-            return fetch_models(self.config_manager.get("api_config", "base_url"), self.config_manager.get("api_config", "api_key"))
-        return ["empty"]
+    def _request_model_options(self):
+        api_config = self.config_manager.get("api_config")
+        if not (api_config["base_url"] and api_config["api_key"] and self.model_options_callback):
+            self._set_model_options([])
+            return
+        # Results may arrive on a worker thread; the dropdown is only touched from the Tk thread
+        self.model_options_callback(api_config["base_url"], api_config["api_key"],
+                                    lambda models: self.notebook.after(0, lambda: self._set_model_options(models)))
+
+    def _set_model_options(self, models):
+        self.models_dropdown.configure(values=models or ["empty"])
             
     def create_system_info_section(self,frame):
         ttk.Label(frame, text="System Info", font=("Arial", 12, "bold")).pack(anchor="w", padx=10, pady=5)
-        table = ttk.Treeview(frame, columns=("Property", "Value"), show="headings", height=8)
+        table = ttk.Treeview(frame, columns=("Property", "Value"), show="headings", height=14)
         table.heading("Property", text="Property")
         table.heading("Value", text="Value")
         table.column("Property", anchor="w")
@@ -144,9 +153,17 @@ class SettingsView:
         
         for key, value in get_system_info().items():
             formatted_key = key.replace("_", " ")
-            table.insert("", "end", values=(formatted_key, value))
+            table.insert("", "end", iid=key, values=(formatted_key, value))
         
         table.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        self.system_info_table = table
+
+    def update_system_info(self, values):
+        for key, value in values.items():
+            if self.system_info_table.exists(key):
+                self.system_info_table.set(key, "Value", value)
+            else:
+                self.system_info_table.insert("", "end", iid=key, values=(key.replace("_", " "), value))
 
     def create_app_settings_section(self,frame):
         main_frame = ttk.Frame(frame)
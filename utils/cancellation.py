@@ -0,0 +1,95 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class OperationCancelled(BaseException):
+    """Raised inside an operation whose token was cancelled. Like asyncio.CancelledError it derives
+    from BaseException, so the `except Exception` fallbacks in the intent handlers let it through."""
+
+class DeadlineExceeded(OperationCancelled):
+    pass
+
+class CancellationToken:
+    """Cancellation flag and optional deadline shared by everything one request does.
+    on_cancel callbacks (e.g. closing an HTTP stream) run on the thread that cancels."""
+    def __init__(self, timeout=None, name="request"):
+        self.name = name
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._cancelled = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set() or self.expired
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self, limit=None):
+        """Seconds left before the deadline, capped at limit; None when neither is set"""
+        if self.deadline is None:
+            return limit
+        remaining = max(0.0, self.deadline - time.monotonic())
+        return min(remaining, limit) if limit else remaining
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        logger.info("Cancelling %s", self.name)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Cancellation callback failed: %s", e)
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise OperationCancelled(f"{self.name} was cancelled")
+        if self.expired:
+            raise DeadlineExceeded(f"{self.name} exceeded its {self.timeout}s deadline")
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """Run callback if the token is cancelled while the block runs"""
+        with self._lock:
+            run_now = self._cancelled.is_set()
+            if not run_now:
+                self._callbacks.append(callback)
+        if run_now:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+_current_token = contextvars.ContextVar("desh_cancellation_token", default=None)
+
+def current_token():
+    return _current_token.get()
+
+def check_cancelled():
+    """Raise if the operation running in this context was cancelled or ran out of time"""
+    token = _current_token.get()
+    if token is not None:
+        token.check()
+
+@contextmanager
+def cancellation_scope(token):
+    """Make token the current one for this context, including tasks and asyncio.to_thread calls started in it"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
@@ -8,6 +8,7 @@ import pandas as pd
 import json
 import requests
 from utils.logger import get_logger
+from utils.tracing import tracer
 logger = get_logger()
 
 def get_resource_path(relative_path: str) -> str:
@@ -18,27 +19,27 @@ def get_resource_path(relative_path: str) -> str:
             base_path = os.path.abspath(".")
         return os.path.join(base_path, relative_path)
     except Exception as e:
-        logger.error(f"Error getting resource path for {relative_path}: {e}")
+        logger.error("Error getting resource path for %s: %s", relative_path, e)
         return ""
 
 def create_directory(path: str) -> bool:
     abs_path = get_resource_path(path)
     try:
         os.makedirs(abs_path, exist_ok=True)
-        logger.info(f"Directory created: {abs_path}")
+        logger.info("Directory created: %s", abs_path)
         return True
     except OSError as e:
-        logger.error(f"Error creating directory {abs_path}: {e}")
+        logger.error("Error creating directory %s: %s", abs_path, e)
         return False
 
 def delete_directory(path: str) -> bool:
     abs_path = get_resource_path(path)
     try:
         shutil.rmtree(abs_path)
-        logger.info(f"Directory deleted: {abs_path}")
+        logger.info("Directory deleted: %s", abs_path)
         return True
     except OSError as e:
-        logger.error(f"Error deleting directory {abs_path}: {e}")
+        logger.error("Error deleting directory %s: %s", abs_path, e)
         return False
 
 def pretty_print_json(json_data) -> None:
@@ -46,31 +47,32 @@ def pretty_print_json(json_data) -> None:
         pretty_json = json.dumps(json_data, indent=4, sort_keys=True)
         logger.debug(pretty_json)
     except ValueError as e:
-        logger.error(f"Error parsing JSON: {e}")
+        logger.error("Error parsing JSON: %s", e)
 
+@tracer.traced("file.create")
 def create_file(path: str, content: str = "") -> bool:
     abs_path = get_resource_path(path)
     try:
         os.makedirs(os.path.dirname(abs_path), exist_ok=True)
         with open(abs_path, 'w') as file:
             file.write(content)
-        logger.info(f"File created: {abs_path}")
+        logger.info("File created: %s", abs_path)
         return True
     except OSError as e:
-        logger.error(f"Error creating file {abs_path}: {e}")
+        logger.error("Error creating file %s: %s", abs_path, e)
         return False
 
 def delete_file(path: str) -> bool:
     abs_path = get_resource_path(path)
     try:
         os.remove(abs_path)
-        logger.info(f"File deleted: {abs_path}")
+        logger.info("File deleted: %s", abs_path)
         return True
     except FileNotFoundError:
-        logger.warning(f"File {abs_path} not found.")
+        logger.warning("File %s not found.", abs_path)
         return False
     except OSError as e:
-        logger.error(f"Error deleting file {abs_path}: {e}")
+        logger.error("Error deleting file %s: %s", abs_path, e)
         return False
 
 def is_empty(d: dict) -> bool:
@@ -81,7 +83,7 @@ def is_empty(d: dict) -> bool:
 def get_system_info():
     system_info = {
         'cpu_architecture': platform.machine(),
-        'cpu_usage_percent': round(psutil.cpu_percent(interval=1), 2),
+        'cpu_usage_percent': round(psutil.cpu_percent(interval=None), 2),  # live values come from ResourceMonitor
         'num_cores': psutil.cpu_count(logical=True),
         'available_ram_gb': round(psutil.virtual_memory().available / (1024 ** 3), 2),  # Convert bytes to GB
         'total_ram_gb': round(psutil.virtual_memory().total / (1024 ** 3), 2),  # Convert bytes to GB
@@ -101,6 +103,7 @@ def get_system_info():
 
     return system_info
 
+@tracer.traced("pdf.extract_tables")
 def extract_tables(pdf_path) -> list:
     tables = []
     with pdfplumber.open(pdf_path) as pdf:
@@ -111,19 +114,19 @@ def extract_tables(pdf_path) -> list:
                 tables.append(df)
     return tables
 
-def fetch_models(api_url, auth_token):
+def fetch_models(api_url, auth_token, timeout=10):
     headers = {"Authorization": f"Bearer {auth_token}"}
     try:
-        response = requests.get(api_url+"/models", headers=headers)
+        response = requests.get(api_url.rstrip("/")+"/models", headers=headers, timeout=timeout)
         response.raise_for_status()
         json_response = response.json()
         return [item["id"] for item in json_response.get("data", []) if "id" in item]
     except requests.exceptions.HTTPError as http_err:
-        logger.error(f"HTTP error occurred: {http_err}")
+        logger.error("HTTP error occurred: %s", http_err)
     except requests.exceptions.ConnectionError as conn_err:
-        logger.error(f"Connection error occurred: {conn_err}")
+        logger.error("Connection error occurred: %s", conn_err)
     except requests.exceptions.Timeout as timeout_err:
-        logger.error(f"Timeout error occurred: {timeout_err}")
+        logger.error("Timeout error occurred: %s", timeout_err)
     except requests.exceptions.RequestException as req_err:
-        logger.error(f"An error occurred: {req_err}")
+        logger.error("An error occurred: %s", req_err)
     return []
\ No newline at end of file
@@ -1,11 +1,25 @@
+import atexit
+import json
 import logging
+import queue
 import threading
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 from typing import Optional
 
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
-class ColoredFormatter(logging.Formatter):
+MAX_MESSAGE_LENGTH = 2000
+
+def _format_fields(record) -> str:
+    fields = getattr(record, 'fields', None)
+    return " " + " ".join(f"{key}={value}" for key, value in fields.items()) if fields else ""
+
+class FieldsFormatter(logging.Formatter):
+    """Text formatter that appends structured fields (operation=..., duration_ms=...) to the message"""
+    def format(self, record):
+        return super().format(record) + _format_fields(record)
+
+class ColoredFormatter(FieldsFormatter):
     """Custom formatter to add color to log messages."""
     COLORS = {
         'DEBUG': '\033[94m',    # Blue
@@ -20,10 +34,53 @@ class ColoredFormatter(logging.Formatter):
         color = self.COLORS.get(record.levelname, self.RESET)
         return f"{color}{super().format(record)}{self.RESET}"
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the structured fields as top-level keys"""
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class TruncatingFilter(logging.Filter):
+    """Cuts prompts, CV text and responses down to max_length characters before they are formatted"""
+    def __init__(self, max_length: int = MAX_MESSAGE_LENGTH):
+        super().__init__()
+        self.max_length = max_length
+
+    def _truncate(self, value):
+        if isinstance(value, str) and self.max_length and len(value) > self.max_length:
+            return f"{value[:self.max_length]}... [{len(value) - self.max_length} more chars]"
+        return value
+
+    def filter(self, record):
+        if not record.args:
+            record.msg = self._truncate(record.msg)
+        elif isinstance(record.args, tuple):
+            record.args = tuple(self._truncate(arg) for arg in record.args)
+        elif isinstance(record.args, dict):
+            record.args = {key: self._truncate(value) for key, value in record.args.items()}
+        return True
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues the record as it is; the stock prepare() formats the message on the calling thread
+    and drops exc_info, which would leave JsonFormatter's "exception" key empty"""
+    def prepare(self, record):
+        return record
+
 # a function to get Logger instance
-def get_logger(log_level: int = logging.DEBUG, log_file: str = 'desh.log') -> 'Logger':
+def get_logger(log_level: int = logging.INFO, log_file: str = 'desh.log') -> 'Logger':
     return Logger(log_level, log_file)
 class Logger:
+    """Calls only enqueue the record; a QueueListener thread formats and writes it to the log
+    file and stdout. Messages take %-style arguments, formatted on that thread, so arguments must
+    not be mutated after the call. Keyword arguments become structured fields, except exc_info."""
     _instance: Optional['Logger'] = None
     _lock = threading.Lock()
 
@@ -38,35 +95,69 @@ class Logger:
     def _initialize_logger(self, log_level: int, log_file: str) -> None:
         self.logger_instance = logging.getLogger(__name__)
         self.logger_instance.setLevel(log_level)
+        self._sample_counts = {}
+        self._sample_lock = threading.Lock()
 
-        file_handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=30)
-        file_handler.setLevel(log_level)
-        file_formatter = logging.Formatter(LOG_FORMAT)
-        file_handler.setFormatter(file_formatter)
-        self.logger_instance.addHandler(file_handler)
+        # Handlers accept everything; the level is only checked on the logger, before the record is queued
+        self.file_handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=30)
+        file_formatter = FieldsFormatter(LOG_FORMAT)
+        self.file_handler.setFormatter(file_formatter)
 
-        stream_handler = logging.StreamHandler(sys.stdout)
-        stream_handler.setLevel(log_level)
+        self.stream_handler = logging.StreamHandler(sys.stdout)
         stream_formatter = ColoredFormatter(LOG_FORMAT)
-        stream_handler.setFormatter(stream_formatter)
-        self.logger_instance.addHandler(stream_handler)
+        self.stream_handler.setFormatter(stream_formatter)
+
+        self.truncating_filter = TruncatingFilter()
+        queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(self.truncating_filter)
+        self.logger_instance.addHandler(queue_handler)
+        self.listener = QueueListener(queue_handler.queue, self.file_handler, self.stream_handler)
+        self.listener.start()
+        atexit.register(self.listener.stop)  # drains the queue before the interpreter exits
 
     def set_log_level(self, log_level: int) -> None:
         self.logger_instance.setLevel(log_level)
-        for handler in self.logger_instance.handlers:
-            handler.setLevel(log_level)
-
-    def debug(self, message: str) -> None:
-        self.logger_instance.debug(message)
-    
-    def info(self, message: str) -> None:
-        self.logger_instance.info(message)
-    
-    def warning(self, message: str) -> None:
-        self.logger_instance.warning(message)
-    
-    def error(self, message: str) -> None:
-        self.logger_instance.error(message)
-
-    def critical(self, message: str) -> None:
-        self.logger_instance.critical(message)
+
+    def configure(self, level=None, json_file=None, max_message_length=None) -> None:
+        """Apply the "logging" config section; the log file switches to JSON lines when json_file is set"""
+        if level is not None:
+            self.set_log_level(logging.getLevelName(level.upper()) if isinstance(level, str) else level)
+        if json_file is not None:
+            self.file_handler.setFormatter(JsonFormatter() if json_file else FieldsFormatter(LOG_FORMAT))
+        if max_message_length is not None:
+            self.truncating_filter.max_length = max_message_length
+
+    def is_enabled_for(self, level: int) -> bool:
+        """Guard for log arguments that are costly to compute"""
+        return self.logger_instance.isEnabledFor(level)
+
+    def _log(self, level: int, message: str, args, fields) -> None:
+        if self.logger_instance.isEnabledFor(level):
+            exc_info = fields.pop('exc_info', None)
+            self.logger_instance.log(level, message, *args, exc_info=exc_info, extra={'fields': fields} if fields else None)
+
+    def _sampled(self, message: str, every: int) -> bool:
+        with self._sample_lock:
+            count = self._sample_counts.get(message, 0)
+            self._sample_counts[message] = count + 1
+        return count % every == 0
+
+    def debug(self, message: str, *args, sample: int = 1, **fields) -> None:
+        """sample=N logs only the first of every N calls with the same message template"""
+        if sample > 1:
+            if not self.logger_instance.isEnabledFor(logging.DEBUG) or not self._sampled(message, sample):
+                return
+            fields['sampled'] = f"1/{sample}"
+        self._log(logging.DEBUG, message, args, fields)
+
+    def info(self, message: str, *args, **fields) -> None:
+        self._log(logging.INFO, message, args, fields)
+
+    def warning(self, message: str, *args, **fields) -> None:
+        self._log(logging.WARNING, message, args, fields)
+
+    def error(self, message: str, *args, **fields) -> None:
+        self._log(logging.ERROR, message, args, fields)
+
+    def critical(self, message: str, *args, **fields) -> None:
+        self._log(logging.CRITICAL, message, args, fields)
@@ -0,0 +1,43 @@
+import threading
+from contextlib import contextmanager
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class AppMetrics:
+    """Process-wide counters (e.g. in-flight LLM requests) and gauges read on demand (e.g. queue depth)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def decrement(self, name, amount=1):
+        self.increment(name, -amount)
+
+    @contextmanager
+    def track(self, name):
+        """Count the block as in flight under name while it runs"""
+        self.increment(name)
+        try:
+            yield
+        finally:
+            self.decrement(name)
+
+    def register_gauge(self, name, read):
+        self._gauges[name] = read
+
+    def snapshot(self):
+        with self._lock:
+            values = dict(self._counters)
+        for name, read in list(self._gauges.items()):
+            try:
+                values[name] = read()
+            except Exception as e:
+                logger.error("Error reading metric %s: %s", name, e)
+        return values
+
+metrics = AppMetrics()
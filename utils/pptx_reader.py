@@ -0,0 +1,109 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from pptx import Presentation
+from utils.logger import get_logger
+from utils.tracing import tracer
+
+logger = get_logger()
+
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+SLIDE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+
+TAG_TEXT = f"{{{NS_A}}}t"
+TAG_BREAK = f"{{{NS_A}}}br"
+TAG_PARAGRAPH = f"{{{NS_A}}}p"
+TEXT_BODY_TAGS = (f"{{{NS_P}}}txBody", f"{{{NS_A}}}txBody")
+
+_slide_name = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+def read_pptx_frames(pptx_path: str, fast: bool = True) -> list:
+    """Return the non-empty text frames of each slide, falling back to python-pptx if the fast path fails"""
+    if fast:
+        try:
+            return read_frames_ooxml(pptx_path)
+        except Exception as e:  # whatever the fast path cannot parse, python-pptx gets a chance at
+            logger.warning("Fast PPTX extraction failed for %s, falling back to python-pptx: %s", pptx_path, e)
+    return read_frames_python_pptx(pptx_path)
+
+@tracer.traced("pptx.read_frames_python_pptx")
+def read_frames_python_pptx(pptx_path: str) -> list:
+    prs = Presentation(pptx_path)
+    slides = []
+
+    for slide_num, slide in enumerate(prs.slides):
+        logger.debug("Processing slide %d", slide_num + 1, sample=20)
+        slide_frames = []
+
+        for shape in slide.shapes:
+            if hasattr(shape, "text_frame") and shape.text_frame is not None:
+                text = shape.text_frame.text.strip()
+                if text:
+                    slide_frames.append(text)
+
+        slides.append(slide_frames)
+
+    return slides
+
+@tracer.traced("pptx.read_frames_ooxml")
+def read_frames_ooxml(pptx_path: str) -> list:
+    """Stream a:t runs out of the slide parts without building the python-pptx object model or touching media.
+    Every shape text body, including those in grouped shapes and table cells, is one frame."""
+    with zipfile.ZipFile(pptx_path) as archive:
+        slides = []
+        for slide_num, slide_part in enumerate(_ordered_slide_parts(archive)):
+            logger.debug("Processing slide %d", slide_num + 1, sample=20)
+            with archive.open(slide_part) as stream:
+                slides.append(_iter_text_frames(stream))
+        return slides
+
+def _iter_text_frames(stream) -> list:
+    frames = []
+    paragraphs = []
+    runs = []
+    for _, elem in ET.iterparse(stream, events=("end",)):
+        if elem.tag == TAG_TEXT:
+            runs.append(elem.text or "")
+        elif elem.tag == TAG_BREAK:
+            runs.append("\v")  # line break inside a paragraph, as python-pptx reports it
+        elif elem.tag == TAG_PARAGRAPH:
+            paragraphs.append("".join(runs))
+            runs = []
+            elem.clear()
+        elif elem.tag in TEXT_BODY_TAGS:
+            text = "\n".join(paragraphs).strip()
+            if text:
+                frames.append(text)
+            paragraphs = []
+            elem.clear()
+    return frames
+
+def _resolve_part(target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join("ppt", target))
+
+def _ordered_slide_parts(archive: zipfile.ZipFile) -> list:
+    """Slide part names in presentation order, read from the sldIdLst and its relationships"""
+    names = set(archive.namelist())
+    try:
+        with archive.open("ppt/_rels/presentation.xml.rels") as stream:
+            targets = {
+                rel.get("Id"): _resolve_part(rel.get("Target"))
+                for rel in ET.parse(stream).getroot().iter(f"{{{NS_PKG_REL}}}Relationship")
+                if rel.get("Type") == SLIDE_REL_TYPE and rel.get("Target")
+            }
+        with archive.open("ppt/presentation.xml") as stream:
+            slide_ids = ET.parse(stream).getroot().iter(f"{{{NS_P}}}sldId")
+            ordered = [targets[slide_id.get(f"{{{NS_R}}}id")] for slide_id in slide_ids]
+        if all(part in names for part in ordered):
+            return ordered
+    except KeyError:
+        pass
+    # No usable presentation part: fall back to the slideN numbering
+    numbered = [(int(match.group(1)), name) for name in names if (match := _slide_name.match(name))]
+    return [name for _, name in sorted(numbered)]
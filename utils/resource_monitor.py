@@ -0,0 +1,60 @@
+import os
+import threading
+import psutil
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger()
+
+class ResourceMonitor:
+    """Samples system and process resources plus the app metrics every interval seconds on a
+    daemon thread and hands each sample to the listeners. CPU percentages are measured over the
+    interval between samples, so no call ever blocks to measure them."""
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self.listeners = []
+        self.latest = {}
+        self._process = psutil.Process(os.getpid())
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback):
+        """callback(sample) runs on the monitor thread"""
+        self.listeners.append(callback)
+
+    def start(self):
+        if self._thread is None:
+            # The first non-blocking reading only sets the baseline for the next one
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+            self._thread = threading.Thread(target=self._run, name="ResourceMonitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def sample(self):
+        memory = psutil.virtual_memory()
+        with self._process.oneshot():
+            values = {
+                'cpu_usage_percent': psutil.cpu_percent(interval=None),
+                'available_ram_gb': round(memory.available / (1024 ** 3), 2),
+                'process_cpu_percent': self._process.cpu_percent(interval=None),
+                'process_rss_mb': round(self._process.memory_info().rss / (1024 ** 2), 1),
+                'process_threads': self._process.num_threads(),
+            }
+        values.update(metrics.snapshot())
+        return values
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.latest = self.sample()
+            except Exception as e:
+                logger.error("Resource sampling failed: %s", e)
+                continue
+            for listener in self.listeners:
+                try:
+                    listener(self.latest)
+                except Exception as e:
+                    logger.error("Resource monitor listener failed: %s", e)
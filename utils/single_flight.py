@@ -0,0 +1,27 @@
+import asyncio
+import contextvars
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger()
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution on the running loop.
+
+    The shared work runs in its own task with an empty context, so one caller's cancellation
+    token, trace or disconnect does not fail the others; waiters are shielded from it as well.
+    Results are not cached, only shared while the work is in flight.
+    """
+    def __init__(self):
+        self._in_flight = {}
+
+    async def run(self, key, factory):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = contextvars.Context().run(asyncio.get_running_loop().create_task, factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            metrics.increment("single_flight_shared")
+            logger.debug("Joining in-flight work for %s", key, sample=10)
+        return await asyncio.shield(task)
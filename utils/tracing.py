@@ -0,0 +1,148 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from utils.logger import get_logger
+
+logger = get_logger()
+
+class _Trace:
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+        self.lock = threading.Lock()
+        self.thread_names = {}
+
+class _Span:
+    __slots__ = ("trace", "name", "args", "start_ns")
+
+    def __init__(self, trace, name, args):
+        self.trace = trace
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        thread = threading.current_thread()
+        event = {
+            "name": self.name, "cat": "desh", "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+            "ts": self.start_ns / 1000, "dur": (end_ns - self.start_ns) / 1000,
+        }
+        if self.args or exc_type:
+            event["args"] = dict(self.args, **({"error": repr(exc)} if exc_type else {}))
+        with self.trace.lock:
+            self.trace.events.append(event)
+            self.trace.thread_names[thread.ident] = thread.name
+        return False
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+_current_trace = contextvars.ContextVar("desh_trace", default=None)
+
+class Tracer:
+    """Lightweight span tracing written as Chrome/Perfetto trace JSON (chrome://tracing, ui.perfetto.dev).
+
+    trace(name) starts a trace for a request or batch; span(name) inside it records a timed slice on
+    the current thread. The active trace lives in a context variable, so it follows asyncio tasks and
+    asyncio.to_thread; plain threads pick it up through propagate(). While tracing is disabled both
+    return a shared no-op context manager.
+    """
+    def __init__(self, directory="traces", enabled=False):
+        self.directory = directory
+        self.enabled = enabled
+
+    def configure(self, enabled=None, directory=None):
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if directory:
+            self.directory = directory
+
+    def span(self, name, **args):
+        trace = _current_trace.get()
+        if trace is None:
+            return _NOOP
+        return _Span(trace, name, args)
+
+    def trace(self, name, **args):
+        """Root span of a request; nested calls become plain spans of the enclosing trace"""
+        if not self.enabled:
+            return _NOOP
+        if _current_trace.get() is not None:
+            return self.span(name, **args)
+        return _TraceScope(self, name, args)
+
+    def traced(self, name=None):
+        """Decorator recording every call of a function or coroutine function as a span"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def propagate(func):
+        """Wrap a thread target so it runs inside the caller's trace context"""
+        context = contextvars.copy_context()
+        return functools.partial(context.run, func)
+
+    def export(self, trace):
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]+", "_", trace.name)
+        path = os.path.join(self.directory, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{safe_name}.json")
+        with trace.lock:
+            events = list(trace.events)
+            thread_names = dict(trace.thread_names)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_name}}
+                    for tid, thread_name in thread_names.items()]
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+            logger.info("Trace written to %s", path, operation="trace_export", spans=len(events))
+        except OSError as e:
+            logger.error("Error writing trace %s: %s", path, e)
+        return path
+
+class _TraceScope:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.trace = _Trace(name)
+        self.root = _Span(self.trace, name, args)
+
+    def __enter__(self):
+        self._token = _current_trace.set(self.trace)
+        self.root.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.root.__exit__(exc_type, exc, tb)
+        _current_trace.reset(self._token)
+        self.tracer.export(self.trace)
+        return False
+
+tracer = Tracer()